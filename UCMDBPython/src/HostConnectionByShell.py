@@ -517,7 +517,7 @@ def doDiscovery(Framework, shell, client, ip, codepage, connectedShellCredId = N
     shellObj = createShellObj(shell, client, ip, langBund, languageName, codepage, mac_address, connectedShellCredId)
 
     #NAT
-    natIPs = getNatIPFromConfigurationFile()
+    natIPs = ip_addr.compileRangeList(getNatIPFromConfigurationFile())
 
     uduid = None
     if not isinstance(shell, shellutils.NexusShell):
@@ -172,8 +172,22 @@ def DiscoveryMain(Framework):
             )
             jmsTopologyReporter = jms.TopologyReporter(jms.TopologyBuilder())
 
+        # additional connections to execute batched JMX queries in parallel
+        additionalClients = []
+        try:
+            jmxQueryParallelism = int(Framework.getParameter('jmxQueryParallelism') or 1)
+        except ValueError:
+            logger.warn('Invalid value of jmxQueryParallelism parameter, 1 is used')
+            jmxQueryParallelism = 1
         try:
             jmxProvider = jmx.Provider(client)
+            for i in range(1, jmxQueryParallelism):
+                try:
+                    additionalClients.append(Framework.createClient(properties))
+                except (Exception, JException):
+                    logger.warnException('Failed to establish additional connection')
+                    break
+            jmxProvider.addAgents(*additionalClients)
 
             # create platform trait based on server version
             platformTrait = jee_discoverer.getPlatformTrait(version, platform)
@@ -340,6 +354,9 @@ def DiscoveryMain(Framework):
         except (Exception, JException), exc:
             logger.warnException("Failed to discover")
             jee_connection.reportError(Framework, str(exc), platform.getName())
+        finally:
+            for additionalClient in additionalClients:
+                additionalClient.close()
     return resultVector#ObjectStateHolderVector()
 
 def discoverDomainAdministrativeIps(allservers, dnsResolver):
@@ -46,6 +46,15 @@ class ConnectionDao(Dao):
         return uniqueIps.toArray()
 
     def getConnections(self, srcIps=None, hostId=None, protocol=6):
+        selectBuilder = self._buildConnectionsQuery(srcIps, hostId, protocol)
+        connectionDetails = self._sqlClient.execute(selectBuilder)
+        return connectionDetails
+
+    def iterateConnections(self, fetchSize, hostId=None, protocol=6):
+        '''Reads all connections in single scan, yields pages of at most fetchSize connections'''
+        return self._sqlClient.iterate(self._buildConnectionsQuery(None, hostId, protocol), fetchSize)
+
+    def _buildConnectionsQuery(self, srcIps, hostId, protocol):
         srcIps = srcIps or []
 
         selectBuilder = SelectSqlBuilder('Agg_V5', 'hostId',
@@ -63,15 +72,31 @@ class ConnectionDao(Dao):
         hostId and andClauses.append("hostId='%s'" % hostId)
 
         selectBuilder.where(and_(*andClauses))
-
-        connectionDetails = self._sqlClient.execute(selectBuilder)
-        return connectionDetails
+        return selectBuilder
 
 
 class ProcessDao(Dao):
 
     def getProcesses(self, ips=None, hostId=None):
+        entries = self._sqlClient.execute(self._buildProcessesQuery(ips, hostId))
+
+        processes = {}
+        for process in entries:
+            logger.debug('Got process: ', (process.ip, process.port))
+            processes[(process.ip, process.port)] = process
+
+        return processes
+
+    def getAllProcesses(self, fetchSize):
+        '''Reads all processes in single scan
+        -> dict((ip, port), ProcessDetails)'''
+        processes = {}
+        for entries in self._sqlClient.iterate(self._buildProcessesQuery(), fetchSize):
+            for process in entries:
+                processes[(process.ip, process.port)] = process
+        return processes
 
+    def _buildProcessesQuery(self, ips=None, hostId=None):
         args = ['Port_Process.ipaddress as ip', 'Port_Process.port as port', 'Port_Process.Protocol as protocol', 'Port_Process.listen as isListen',
                   'Processes.pid as pid', 'Processes.name as name', 'cmdline', 'params', 'path', 'owner', 'startuptime', 'Port_Process.hostid as hostId']
         kwargs = {'dataObjectClass':ProcessDetails}
@@ -86,14 +111,7 @@ class ProcessDao(Dao):
         hostId and andClauses.append("hostId='%s'" % hostId)
 
         selectJoinBuilder.where(and_(*andClauses))
-        entries = self._sqlClient.execute(selectJoinBuilder)
-
-        processes = {}
-        for process in entries:
-            logger.debug('Got process: ', (process.ip, process.port))
-            processes[(process.ip, process.port)] = process
-
-        return processes
+        return selectJoinBuilder
 
 class DiscoveryContext:
     def __init__(self, connectionDao, processDao, servers=None, clients=None, scope=None):
@@ -138,6 +156,7 @@ def splitToPages(items, maxPageSize):
 
 MAX_IPS_PAGE_SIZE = 100
 MAX_CONNECTIONS_COUNT_IN_PAGE = 30000
+DEFAULT_FETCH_SIZE = 5000
 
 
 def _is_ipv4(address):
@@ -155,6 +174,8 @@ def DiscoveryMain(Framework):
         acceptedServices = Framework.getParameter('acceptedServices')
         includeOutscopeServers = _parseBoolean(Framework.getParameter('includeOutscopeServers'))
         includeOutscopeClients = _parseBoolean(Framework.getParameter('includeOutscopeClients'))
+        singleScan = _parseBoolean(Framework.getParameter('singleScan'))
+        fetchSize = int(Framework.getParameter('fetchSize') or DEFAULT_FETCH_SIZE)
 
         descriptorFilePath = Framework.getParameter('discoveryDescriptorFile')
         descriptorFilePath = descriptorFilePath.replace(r'%%PROBE_MGR_CONFIGFILES_DIR%%', CollectorsParameters.PROBE_MGR_CONFIGFILES_DIR)
@@ -218,28 +239,10 @@ def DiscoveryMain(Framework):
                     ACCEPTOR_BUILDERS, REPORTER_BUILDERS, APPROACH_BUILDERS)
 
         try:
-            ips = connectionDao.getUniqueSrcIps()
-            ips = filter(_is_ipv4, ips)
-            logger.debug("Unique ip count: %s" % len(ips))
-            ipChunks = splitToPages(ips, MAX_IPS_PAGE_SIZE)
-            logger.debug("page count %s" % len(ipChunks))
-
-            is_ipv4_connection = lambda connection: _is_ipv4(connection.dstIp)
-            for discoveryScope in discoveryScopes:
-                for nr, ipChunk in enumerate(ipChunks):
-                    logger.debug('page number:%s' % nr)
-                    try:
-                        connections = discoveryContext.connectionDao.getConnections(srcIps=ipChunk)
-                        connections = filter(is_ipv4_connection, connections)
-                        for connections in splitToPages(connections,
-                                                     MAX_CONNECTIONS_COUNT_IN_PAGE):
-
-                            OSHVResult = _discoverChunk(connections, discoveryScope, discoveryContext)
-                            Framework.sendObjects(OSHVResult)
-                            Framework.flushObjects()
-                            discoveryScope.reset()
-                    except:
-                        logger.warnException('')
+            if singleScan:
+                _discoverInSingleScan(Framework, discoveryScopes, discoveryContext, fetchSize)
+            else:
+                _discoverByIpChunks(Framework, discoveryScopes, discoveryContext)
 
             logger.debug("Query count: %d" % sqlClient.queryCount)
         finally:
@@ -251,6 +254,69 @@ def DiscoveryMain(Framework):
         logger.reportErrorObject(errobj)
 
 
+def _discoverByIpChunks(Framework, discoveryScopes, discoveryContext):
+    ips = discoveryContext.connectionDao.getUniqueSrcIps()
+    ips = filter(_is_ipv4, ips)
+    logger.debug("Unique ip count: %s" % len(ips))
+    ipChunks = splitToPages(ips, MAX_IPS_PAGE_SIZE)
+    logger.debug("page count %s" % len(ipChunks))
+
+    is_ipv4_connection = lambda connection: _is_ipv4(connection.dstIp)
+    for discoveryScope in discoveryScopes:
+        for nr, ipChunk in enumerate(ipChunks):
+            logger.debug('page number:%s' % nr)
+            try:
+                connections = discoveryContext.connectionDao.getConnections(srcIps=ipChunk)
+                connections = filter(is_ipv4_connection, connections)
+                for connections in splitToPages(connections,
+                                             MAX_CONNECTIONS_COUNT_IN_PAGE):
+
+                    OSHVResult = _discoverChunk(connections, discoveryScope, discoveryContext)
+                    Framework.sendObjects(OSHVResult)
+                    Framework.flushObjects()
+                    discoveryScope.reset()
+            except:
+                logger.warnException('')
+
+
+def _discoverInSingleScan(Framework, discoveryScopes, discoveryContext, fetchSize):
+    '''Port_Process and Agg_V5 are read once through server-side cursor,
+    every page of connections is evaluated by all discovery scopes while it is in memory'''
+    processes = discoveryContext.processDao.getAllProcesses(fetchSize)
+    logger.debug("processes count %s" % len(processes))
+
+    ipv4ByIp = {}
+    def is_ipv4(ip):
+        isIpv4 = ipv4ByIp.get(ip)
+        if isIpv4 is None:
+            isIpv4 = ipv4ByIp[ip] = _is_ipv4(ip)
+        return isIpv4
+
+    def discoverPage(connections, nr):
+        logger.debug('page number:%s, connections count %s' % (nr, len(connections)))
+        for discoveryScope in discoveryScopes:
+            try:
+                OSHVResult = _discoverConnections(connections, processes, discoveryScope)
+                Framework.sendObjects(OSHVResult)
+                Framework.flushObjects()
+            except:
+                logger.warnException('')
+            discoveryScope.reset()
+
+    page = []
+    pageCount = 0
+    for connections in discoveryContext.connectionDao.iterateConnections(fetchSize):
+        for connection in connections:
+            if is_ipv4(connection.srcIp) and is_ipv4(connection.dstIp):
+                page.append(connection)
+        if len(page) >= MAX_CONNECTIONS_COUNT_IN_PAGE:
+            discoverPage(page, pageCount)
+            page = []
+            pageCount += 1
+    if page:
+        discoverPage(page, pageCount)
+
+
 def __getConnectionsIps(connections):
     res = HashSet()
     for connection in connections:
@@ -260,13 +326,17 @@ def __getConnectionsIps(connections):
 
 
 def _discoverChunk(connections, discoveryScope, discoveryContext):
-    OSHVResult = ObjectStateHolderVector()
 #    servers, clients = discoveryContext.servers, discoveryContext.clients
 
     ips = __getConnectionsIps(connections)
 
     processes = discoveryContext.processDao.getProcesses(ips=ips)
     logger.debug("processes count %s" % len(processes))
+    return _discoverConnections(connections, processes, discoveryScope)
+
+
+def _discoverConnections(connections, processes, discoveryScope):
+    OSHVResult = ObjectStateHolderVector()
     interactions = []
     for connection in connections:
         srcNode = Node()
@@ -5,6 +5,7 @@ import sys
 import os, sys
 from stat import *
 import time
+import threading
 # Since the enriched xml files define the encoding UTF-8,
 # need to switch from the default encoding of python ASCII to UTF-8.
 reload(sys)
@@ -35,11 +36,17 @@ from java.lang import Integer
 from java.text import SimpleDateFormat
 from java.util import Date
 from java.net import InetAddress
+from java.lang import System
+from java.util.concurrent import Callable
+from java.util.concurrent import Executors
+from java.util.concurrent import ExecutorCompletionService
 
 #xml related
 from org.w3c.dom import Document
 from javax.xml.xpath import *
 from javax.xml.parsers import DocumentBuilderFactory
+from javax.xml.stream import XMLInputFactory
+from javax.xml.stream import XMLStreamConstants
 from javax.xml.parsers import ParserConfigurationException
 from javax.xml.namespace import QName
 from javax.xml.transform import *
@@ -135,13 +142,11 @@ def parseFile(Framework, filePath, isManual=None, reportWarning=None):
         Framework.setStepExecutionStatus(WorkflowStepStatus.FAILURE)
         return
     else:
-        fis = None
-        _input = None
+        initScanFileMappingConfig()
         try:
             try:
-                fis = FileInputStream(filePath)
-                _input = GZIPInputStream(fis)
-                vector = domParse(_input, Framework, isManual, reportWarning, filePath)
+                result = readEnrichedScanFile(filePath, loadMappingConfig(Framework))
+                vector = reportScanFile(Framework, result, isManual, reportWarning)
                 if vector and vector.size() > 0:
                     # sending results
                     logger.debug("Sending objects...")
@@ -162,16 +167,118 @@ def parseFile(Framework, filePath, isManual=None, reportWarning=None):
                     Framework.reportError(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_EXECUTE_STEP, [Framework.getState().getCurrentStepName(), errorMessage])
                     Framework.setStepExecutionStatus(WorkflowStepStatus.FATAL_FAILURE)
         finally:
-            if fis:
-                fis.close()
-            if _input:
-                _input.close()
-
-        #remove xsf file from storage
-        if File(filePath).delete():
-            logger.debug("Downloadable scan file [" + filePath + "] was deleted successfully")
-        else:
-            logger.debug("Failed to delete downloadable xsf file[" + filePath + "]")
+            deleteEnrichedScanFile(filePath)
+
+
+def loadMappingConfig(Framework):
+    return MappingConfigurationUtil.loadMappingConfiguration(Framework.getParameter('MappingConfiguration'))
+
+
+def readEnrichedScanFile(filePath, mappingConfig):
+    '''Parse scan file without using Framework, safe to call from parsing workers
+    @types: str, MappingConfiguration -> ScanFileParseResult
+    '''
+    fis = None
+    _input = None
+    try:
+        fis = FileInputStream(filePath)
+        _input = GZIPInputStream(fis)
+        return parseScanFile(_input, mappingConfig, filePath)
+    finally:
+        if fis:
+            fis.close()
+        if _input:
+            _input.close()
+
+
+def deleteEnrichedScanFile(filePath):
+    #remove xsf file from storage
+    if File(filePath).delete():
+        logger.debug("Downloadable scan file [" + filePath + "] was deleted successfully")
+    else:
+        logger.debug("Failed to delete downloadable xsf file[" + filePath + "]")
+
+
+class ScanFileParseTask(Callable):
+    '''Parses scan file to ScanFileParseResult, Framework is not shared with workers'''
+    def __init__(self, filePath, mappingConfig):
+        self.filePath = filePath
+        self.mappingConfig = mappingConfig
+
+    def call(self):
+        result = None
+        try:
+            result = readEnrichedScanFile(self.filePath, self.mappingConfig)
+        except:
+            errorMessage = str(sys.exc_info()[1])
+            logger.debug('Failed parsing file: ' + self.filePath)
+            logger.debugException(errorMessage)
+        return (self.filePath, result)
+
+
+def parseFiles(Framework, filePaths, threadsNumber=1, sendBatchSize=10000, isManual=None, reportWarning=None):
+    '''Parse enriched scan files in parallel by a pool of threadsNumber workers.
+    Workers only map XML to objects. Steps using Framework (application signature,
+    process to process correlation, reporting) are done by the calling thread
+    one file at a time. Results are sent by the calling thread, objects of several files are
+    accumulated till sendBatchSize is reached. A file is deleted after its
+    results are sent or if it produced no results.
+    @types: Framework, list(str), int, int, bool, bool -> int
+    @return: number of files which produced results
+    '''
+    filesNumber = len(filePaths)
+    if not filesNumber:
+        return 0
+    threadsNumber = max(1, min(threadsNumber, filesNumber))
+    logger.debug('Parsing %s scan file(s) using %s thread(s)' % (filesNumber, threadsNumber))
+    # mapping config is loaded once and only read by workers
+    initScanFileMappingConfig()
+    mappingConfig = loadMappingConfig(Framework)
+    executor = Executors.newFixedThreadPool(threadsNumber)
+    startTime = System.currentTimeMillis()
+    processedNumber = 0
+    succeededNumber = 0
+    sentObjectsNumber = 0
+    batch = ObjectStateHolderVector()
+    batchFiles = []
+
+    def sendBatch():
+        if batch.size():
+            logger.debug('Sending %s objects of %s scan file(s)' % (batch.size(), len(batchFiles)))
+            Framework.sendObjects(batch)
+            Framework.flushObjects()
+            batch.clear()
+        for batchFile in batchFiles:
+            deleteEnrichedScanFile(batchFile)
+        del batchFiles[:]
+
+    try:
+        completionService = ExecutorCompletionService(executor)
+        for filePath in filePaths:
+            completionService.submit(ScanFileParseTask(filePath, mappingConfig))
+        while processedNumber < filesNumber:
+            filePath, result = completionService.take().get()
+            vector = None
+            if result is None:
+                Framework.reportWarning(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [filePath])
+            else:
+                vector = reportScanFile(Framework, result, isManual, reportWarning)
+            processedNumber += 1
+            batchFiles.append(filePath)
+            if vector and vector.size() > 0:
+                succeededNumber += 1
+                sentObjectsNumber += vector.size()
+                batch.addAll(vector)
+            if batch.size() >= sendBatchSize:
+                sendBatch()
+            elapsedSeconds = max(1, (System.currentTimeMillis() - startTime) / 1000)
+            logger.debug('Scan files processed: %s, succeeded: %s, in queue: %s, throughput: %.2f files/min' % (processedNumber, succeededNumber, filesNumber - processedNumber, processedNumber * 60.0 / elapsedSeconds))
+        sendBatch()
+    finally:
+        executor.shutdownNow()
+    elapsedSeconds = max(1, (System.currentTimeMillis() - startTime) / 1000)
+    logger.debug('Parsed %s scan file(s) in %s s, %s succeeded, %s objects sent' % (processedNumber, elapsedSeconds, succeededNumber, sentObjectsNumber))
+    return succeededNumber
 
 
 def isEnrichedScanFileReady(enrichedScanFileName):
@@ -183,35 +290,159 @@ def isEnrichedScanFileReady(enrichedScanFileName):
     return 0
 
 
-def domParse(_input, Framework, isManual, reportWarning, filePath):
+HARDWARE_SECTION_ELEMENT = "hardwaredata"
+
+
+class ScanFileElement:
+    '''Attributes of the streamed scan file element.
+    Provides the part of org.w3c.dom.Element API used by mapping functions'''
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def getAttribute(self, attributeName):
+        return self.attributes.get(attributeName, '')
+
+    def hasAttribute(self, attributeName):
+        return self.attributes.has_key(attributeName)
+
+
+class ScanFileSoftwareData:
+    '''Handlers of the software sections. Elements of these sections are not kept in DOM,
+    applications are kept in document order, user names by id and usages by application version id'''
+    def __init__(self):
+        self.applications = []
+        self.partialApplications = []
+        self.userNamesById = {}
+        self.usagesByVersionId = {}
+
+    def handleApplication(self, element):
+        self.applications.append(element)
+
+    def handlePartialApplication(self, element):
+        self.partialApplications.append(element)
+
+    def handleUser(self, element):
+        userId = element.getAttribute("id")
+        if not self.userNamesById.has_key(userId):
+            self.userNamesById[userId] = element.getAttribute("name").strip()
+
+    def handleUsage(self, element):
+        versionId = element.getAttribute("versionid").strip()
+        self.usagesByVersionId.setdefault(versionId, []).append(element)
+
+    def getHandlers(self):
+        return {"application": self.handleApplication,
+                "partialapp": self.handlePartialApplication,
+                "user": self.handleUser,
+                "used": self.handleUsage}
+
+
+def _createXmlInputFactory():
+    factory = XMLInputFactory.newInstance()
+    factory.setProperty(XMLInputFactory.IS_COALESCING, Boolean.TRUE)
+    factory.setProperty(XMLInputFactory.SUPPORT_DTD, Boolean.FALSE)
     try:
-        dbf = DocumentBuilderFactory.newInstance()
-        db = dbf.newDocumentBuilder()
-        doc = db.parse(_input)
-        OSHVResult = ObjectStateHolderVector()
+        factory.setProperty(XMLInputFactory.IS_NAMESPACE_AWARE, Boolean.FALSE)
+    except:
+        logger.debug('StAX implementation does not support non namespace aware mode')
+    return factory
+
+
+def _getQualifiedName(prefix, localName):
+    if prefix:
+        return prefix + ':' + localName
+    return localName
+
+
+def readScanFile(_input, handlers):
+    '''Read the scan file in a single pass with StAX parser.
+    Elements with names from handlers outside of the hardware section are passed to
+    the corresponding handler as ScanFileElement and are not kept in memory by the reader.
+    All other content is built into DOM document as DocumentBuilder would do, so
+    hardware mapping (including XPath based one) works unchanged.
+    Software elements inside the hardware section are both kept in DOM and passed to handlers.
+    @types: InputStream, dict(str, callable) -> org.w3c.dom.Document
+    '''
+    doc = DocumentBuilderFactory.newInstance().newDocumentBuilder().newDocument()
+    reader = _createXmlInputFactory().createXMLStreamReader(_input)
+    try:
+        currentNode = doc
+        hardwareDepth = 0
+        # depth of the skipped software element, its content is not needed
+        skippedDepth = 0
+        while reader.hasNext():
+            event = reader.next()
+            if event == XMLStreamConstants.START_ELEMENT:
+                if skippedDepth:
+                    skippedDepth += 1
+                    continue
+                tagName = _getQualifiedName(reader.getPrefix(), reader.getLocalName())
+                handler = handlers.get(tagName)
+                if handler:
+                    attributes = {}
+                    for i in range(reader.getAttributeCount()):
+                        attributes[_getQualifiedName(reader.getAttributePrefix(i), reader.getAttributeLocalName(i))] = reader.getAttributeValue(i)
+                    handler(ScanFileElement(attributes))
+                    if not hardwareDepth:
+                        skippedDepth = 1
+                        continue
+                element = doc.createElement(tagName)
+                for i in range(reader.getAttributeCount()):
+                    element.setAttribute(_getQualifiedName(reader.getAttributePrefix(i), reader.getAttributeLocalName(i)), reader.getAttributeValue(i))
+                currentNode.appendChild(element)
+                currentNode = element
+                if hardwareDepth or tagName == HARDWARE_SECTION_ELEMENT:
+                    hardwareDepth += 1
+            elif event == XMLStreamConstants.END_ELEMENT:
+                if skippedDepth:
+                    skippedDepth -= 1
+                    continue
+                currentNode = currentNode.getParentNode()
+                if hardwareDepth:
+                    hardwareDepth -= 1
+            elif skippedDepth or currentNode is doc:
+                continue
+            elif event in (XMLStreamConstants.CHARACTERS, XMLStreamConstants.SPACE):
+                currentNode.appendChild(doc.createTextNode(reader.getText()))
+            elif event == XMLStreamConstants.CDATA:
+                currentNode.appendChild(doc.createCDATASection(reader.getText()))
+    finally:
+        reader.close()
+    return doc
+
+
+class ScanFileParseResult:
+    '''Objects mapped from scan file by parseScanFile, mapping steps using Framework
+    are finished by reportScanFile'''
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.errors = None
+        self.failure = None
+        self.OSHVResult = None
+        self.rootNode = None
+        self.nodeOSH = None
+        self.processList = None
+        self.tcpList = None
+
+
+def parseScanFile(_input, mappingConfig, filePath):
+    '''Map scan file to objects without using Framework, so files can be parsed by several threads
+    @types: InputStream, MappingConfiguration, str -> ScanFileParseResult
+    '''
+    result = ScanFileParseResult(filePath)
+    try:
+        softwareData = ScanFileSoftwareData()
+        doc = readScanFile(_input, softwareData.getHandlers())
         rootNode = doc.getElementsByTagName("inventory").item(0)
         errors = getNodeValues("error", rootNode)[0]
         if len(errors):
-            logger.error(errors)
-            if reportWarning:
-                Framework.reportWarning(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [errors, filePath])
-            else:
-                Framework.reportError(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [errors, filePath])
-                Framework.setStepExecutionStatus(WorkflowStepStatus.FATAL_FAILURE)
-            return OSHVResult
+            result.errors = errors
+            return result
 
-        mappingConfigValue = Framework.getParameter('MappingConfiguration')
-        mappingConfig = MappingConfigurationUtil.loadMappingConfiguration(mappingConfigValue)
+        OSHVResult = ObjectStateHolderVector()
         # Node entity mapping
         # create OSH(Node)
-        initScanFileMappingConfig()
         nodeOSH = createNodeOSH(OSHVResult, rootNode)
-        if not isManual:
-            uduid = Framework.getProperty(InventoryUtils.ATTR_UD_UNIQUE_ID)
-            logger.debug("Will set uduid if not empty to node:", uduid)
-            if uduid:
-                nodeOSH.setStringAttribute(InventoryUtils.ATTR_UD_UNIQUE_ID, uduid)
-
         logger.debug("Node OSH created!")
         # create Cpu osh
         createCpuOSH(OSHVResult, rootNode, nodeOSH)
@@ -258,13 +489,9 @@ def domParse(_input, Framework, isManual, reportWarning, filePath):
         createInterfaceOSH(OSHVResult, rootNode, nodeOSH)
         logger.debug("Interface OSH created!")
         # software mapping
-        mapInstalledSoftware(OSHVResult, rootNode, nodeOSH, mappingConfig)
+        mapInstalledSoftware(OSHVResult, rootNode, nodeOSH, mappingConfig, softwareData)
         logger.debug("InstalledSoftware OSH created!")
-        mapRunningProcess(OSHVResult, rootNode, nodeOSH, Framework, isManual)
-        logger.debug("Running software OSH created!")
-        # inventory scanner mapping
-        createScannerOSH(Framework, OSHVResult, rootNode, nodeOSH, filePath)
-        logger.debug("InventoryScanner OSH created!")
+        result.processList, result.tcpList = parseRunningProcesses(rootNode)
         # create configuration Document
         if mappingConfig.configDocument:
             configurationStr = mapConfigurations(rootNode)
@@ -272,6 +499,47 @@ def domParse(_input, Framework, isManual, reportWarning, filePath):
             OSHVResult.add(cdOsh)
             logger.debug("ConfigurationDocument OSH created!")
         createMSCluster(OSHVResult, rootNode)
+        result.OSHVResult = OSHVResult
+        result.rootNode = rootNode
+        result.nodeOSH = nodeOSH
+    except:
+        logger.error("Failed parsing scan file...")
+        result.failure = str(sys.exc_info()[1])
+        logger.debugException(result.failure)
+    return result
+
+
+def reportScanFile(Framework, result, isManual, reportWarning):
+    '''Finish mapping of parsed scan file with steps using Framework: running processes
+    with application signature and process to process correlation, inventory scanner.
+    Framework is not thread-safe, so it is called by one thread for one file at a time
+    @types: Framework, ScanFileParseResult, bool, bool -> ObjectStateHolderVector or None
+    '''
+    if result.failure is not None:
+        Framework.reportError(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [result.failure])
+        return None
+    if result.errors:
+        logger.error(result.errors)
+        if reportWarning:
+            Framework.reportWarning(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [result.errors, result.filePath])
+        else:
+            Framework.reportError(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [result.errors, result.filePath])
+            Framework.setStepExecutionStatus(WorkflowStepStatus.FATAL_FAILURE)
+        return ObjectStateHolderVector()
+    try:
+        OSHVResult = result.OSHVResult
+        rootNode = result.rootNode
+        nodeOSH = result.nodeOSH
+        if not isManual:
+            uduid = Framework.getProperty(InventoryUtils.ATTR_UD_UNIQUE_ID)
+            logger.debug("Will set uduid if not empty to node:", uduid)
+            if uduid:
+                nodeOSH.setStringAttribute(InventoryUtils.ATTR_UD_UNIQUE_ID, uduid)
+        mapRunningProcess(OSHVResult, rootNode, nodeOSH, Framework, isManual, result.processList, result.tcpList)
+        logger.debug("Running software OSH created!")
+        # inventory scanner mapping
+        createScannerOSH(Framework, OSHVResult, rootNode, nodeOSH, result.filePath)
+        logger.debug("InventoryScanner OSH created!")
         mapNewCI(OSHVResult, rootNode, nodeOSH)
         return OSHVResult
     except:
@@ -282,7 +550,6 @@ def domParse(_input, Framework, isManual, reportWarning, filePath):
     return None
 
 
-# parse the value of a node
 def getNodeValues(tagName, element, defaultValue=['']):
     nodeList = element.getElementsByTagName(tagName)
     values = []
@@ -1063,12 +1330,12 @@ def mapOsArchitecture(root):
     return osArchitecture
 
 
-def mapInstalledSoftware(oshvresults, root, hostOsh, mappingConfig):
+def mapInstalledSoftware(oshvresults, root, hostOsh, mappingConfig, softwareData):
     logger.debug("Reports free software:" + str(mappingConfig.reportFreeSoftware()))
-    softwares = createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig)
+    softwares = createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, softwareData)
     createOsInstalledSoftware(oshvresults, root, hostOsh, mappingConfig)
     if mappingConfig.partiallyRecApp:
-        softwares.update(createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, partial=1))
+        softwares.update(createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, softwareData, partial=1))
     createSoftwareLink(oshvresults, softwares)
 
 
@@ -1080,19 +1347,17 @@ def mapInstalledSoftware(oshvresults, root, hostOsh, mappingConfig):
 # <applicationusage>
 #    <used versionid="1000" userid="0" .../>
 # </applicationusage>
-def createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, partial=None):
+def createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, softwareData, partial=None):
     dateFormatter = SimpleDateFormat("yyyy-MM-dd hh:mm:ss")
     bdnaDateFormatter = SimpleDateFormat("yyyy-MM-dd")
-    usagesArray = []
-    usersArray = []
+    usagesByVersionId = {}
+    userNamesById = {}
     softwares = {}
     userNumberThreshold = None
     if mappingConfig.softwareUtilization:
         userNumberThreshold = mappingConfig.numberOfUser
-        usages = root.getElementsByTagName("used")
-        usagesArray = nodeListToArray(usages)
-        users = root.getElementsByTagName("user")
-        usersArray = nodeListToArray(users)
+        usagesByVersionId = softwareData.usagesByVersionId
+        userNamesById = softwareData.userNamesById
     recognitionMethod = int(getNodeEnumAttribute(root, "hwRecognitionMethod", '1'))
     if recognitionMethod == 1 or recognitionMethod == 0:
         recognitionLevelStr = RECOGNITION_LEVEL_RAW
@@ -1100,10 +1365,9 @@ def createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, partial=None):
         recognitionLevelStr = RECOGNITION_LEVEL_NORMALIZED
     if partial:
         recognitionLevelStr = RECOGNITION_LEVEL_PARTIAL
-        applications = root.getElementsByTagName("partialapp")
+        applicationsArray = softwareData.partialApplications
     else:
-        applications = root.getElementsByTagName("application")
-    applicationsArray = nodeListToArray(applications)
+        applicationsArray = softwareData.applications
     for application in applicationsArray:
         name = getNodeAttribute(application, "name")
         vendor = getNodeAttribute(application, "publisher")
@@ -1183,7 +1447,7 @@ def createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, partial=None):
             softwareOsh.setFloatAttribute("infocus_usage_percent", float(getNodeAttribute(application, "usagepercentfoc", '0')))
             if len(getNodeAttribute(application, "usagedayslastmonth")):
                 softwareOsh.setDateAttribute("utilization_update_date", Date())
-            userlist = getUserList(application, usagesArray, usersArray)
+            userlist = getUserList(application, usagesByVersionId, userNamesById)
             softwareOsh.setListAttribute("utilization_user_list", userlist)
             # To avoid the capacity risk, set a threshold on the number of users as
             # we have no way to tell reliably if Terminal Services or Citrix is in use
@@ -1198,31 +1462,27 @@ def createSoftwareOSH(oshvresults, root, hostOsh, mappingConfig, partial=None):
                     softwares[int(versionid)] = newSoftwareEntry
             if userNumberThreshold and len(userlist) >= userNumberThreshold:
                 # versionid is connection between <applicationdata/> and <applicationusage/>
-                for usage in usagesArray:
-                    vid = getNodeAttribute  (usage, "versionid")
-                    if vid == versionid:
-                        createSoftwareUtilizationOSH(oshvresults, softwareOsh, usage, usersArray)
+                for usage in usagesByVersionId.get(versionid, []):
+                    createSoftwareUtilizationOSH(oshvresults, softwareOsh, usage, userNamesById)
             softwareOsh.setContainer(hostOsh)
             oshvresults.add(softwareOsh)
     return softwares
 
 
 # get list of users that use the current software
-def getUserList(application, usagesArray, usersArray):
+def getUserList(application, usagesByVersionId, userNamesById):
     userlist = []
     appVerId = getNodeAttribute(application, "versionid")
-    for usage in usagesArray:
-        vid = getNodeAttribute(usage, "versionid")
-        if vid == appVerId:
-            username = getUserName(usersArray, getNodeAttribute(usage, "userid"))
-            if not re.search('^ALL USERS', username, re.IGNORECASE):
-                userlist.append(username)
+    for usage in usagesByVersionId.get(appVerId, []):
+        username = getUserName(userNamesById, getNodeAttribute(usage, "userid"))
+        if not re.search('^ALL USERS', username, re.IGNORECASE):
+            userlist.append(username)
     return userlist
 
 
 # create per-user software utilization mapping
-def createSoftwareUtilizationOSH(oshvresults, softwareOsh, usage, usersArray):
-    username = getUserName(usersArray, getNodeAttribute(usage, "userid"))
+def createSoftwareUtilizationOSH(oshvresults, softwareOsh, usage, userNamesById):
+    username = getUserName(userNamesById, getNodeAttribute(usage, "userid"))
     if len(username) and not re.search('^ALL USERS', username, re.IGNORECASE):
         su = ObjectStateHolder("user_software_utilization")
         su.setStringAttribute("user_name", username)
@@ -1256,12 +1516,8 @@ def createSoftwareUtilizationOSH(oshvresults, softwareOsh, usage, usersArray):
         oshvresults.add(su)
 
 
-def getUserName(usersArray, userid):
-    for user in usersArray:
-        _id = user.getAttribute("id")
-        if userid == _id:
-            return user.getAttribute("name").strip()
-    return ''
+def getUserName(userNamesById, userid):
+    return userNamesById.get(userid, '')
 
 
 def createOsInstalledSoftware(oshvresults, root, hostOsh, mappingConfig):
@@ -1377,14 +1633,16 @@ def createInstalledSoftwareOsh(name, vendor=None, version=None, desc=None):
     return softwareOsh
 
 
-def mapRunningProcess(OSHVResult, root, nodeOSH, Framework, isManual):
+def parseRunningProcesses(root):
+    '''Parse running processes and their TCP connections, both are None if scan file has no processes
+    @types: Element -> (list, list)
+    '''
     processList = []
     tcpList = []
     runningProcessElements = root.getElementsByTagName('hwRunningProcess_value')
     if not runningProcessElements:
-        return
+        return None, None
 
-    #parsing...
     runningProcessArray = nodeListToArray(runningProcessElements)
     for runningProcess in runningProcessArray:
         process, tcps = parseProcessesAndTCPs(runningProcess, root)
@@ -1392,6 +1650,12 @@ def mapRunningProcess(OSHVResult, root, nodeOSH, Framework, isManual):
             processList.append(process)
         if tcps:
             tcpList.extend(tcps)
+    return processList, tcpList
+
+
+def mapRunningProcess(OSHVResult, root, nodeOSH, Framework, isManual, processList, tcpList):
+    if processList is None:
+        return
 
     #report...
     logger.debug('Start to report process...')
@@ -2459,11 +2723,20 @@ def formatNetmask(netmask):
 
 #===============For SCAN FILE MAPPING CONFIG================
 _mappingConfig = None
-_xPath = XPathFactory.newInstance().newXPath()
+# XPath objects are not thread-safe, each thread parsing scan files gets its own
+_xPathHolder = threading.local()
+
+
+def _getXPath():
+    xPath = getattr(_xPathHolder, 'xPath', None)
+    if xPath is None:
+        xPath = XPathFactory.newInstance().newXPath()
+        _xPathHolder.xPath = xPath
+    return xPath
 
 
 def __getXPathValue__(path, node):
-    return _xPath.evaluate(path, node)
+    return _getXPath().evaluate(path, node)
 
 
 def getScanFileMappingConfig():
@@ -2549,7 +2822,7 @@ def canOverwrite(attr, currentOsh):
 
 def evaluateXPath(exp, targetNode):
     try:
-        return _xPath.evaluate(exp, targetNode)
+        return _getXPath().evaluate(exp, targetNode)
     except:
         logger.warn('Failed to evaluate xpath for:[%s]' % exp)
 
@@ -2642,7 +2915,7 @@ def mapNewCI(OSHVResult, rootNode, nodeOSH):
             elif ci.kind == CI.CI_MAPPING_KIND_MULTIPLE:
                 if ci.source:
                     scalarArray = getXPath(ci.source, 0)
-                    nodeList = _xPath.evaluate(scalarArray, hardwareNode, XPathConstants.NODESET)
+                    nodeList = _getXPath().evaluate(scalarArray, hardwareNode, XPathConstants.NODESET)
                     _len = nodeList.getLength()
                     idx = 0
                     while idx < _len:
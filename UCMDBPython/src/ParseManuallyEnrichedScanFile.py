@@ -20,6 +20,9 @@ from com.hp.ucmdb.discovery.probe.agents.probemgr.xmlenricher import XmlEnricher
 from com.hp.ucmdb.discovery.common import CollectorsConstants
 from java.io import FileFilter
 
+DEFAULT_PARSING_THREADS_NUMBER = 1
+DEFAULT_SEND_OBJECTS_BATCH_SIZE = 10000
+
 def StepMain(Framework):
 	Framework.setProperty(InventoryUtils.STATE_PROPERTY_PLATFORM_CONFIGFILE, CollectorsConstants.SCANNERSBYPLATFORM_FILE_NAME)
 	InventoryUtils.executeStep(Framework, processManuallyEnrichedScanFile, InventoryUtils.STEP_DOESNOT_REQUIRES_CONNECTION, InventoryUtils.STEP_DOESNOT_REQUIRES_LOCK)
@@ -32,25 +35,12 @@ def processManuallyEnrichedScanFile(Framework):
 		Framework.setStepExecutionStatus(WorkflowStepStatus.SUCCESS)
 		return
 
-	filesNum = len(files)
-	count = 0
-
-	noFileProcessedSuccess = filesNum
+	threadsNumber = getIntParameter(Framework, 'ParsingThreadsNumber', DEFAULT_PARSING_THREADS_NUMBER)
+	sendBatchSize = getIntParameter(Framework, 'SendObjectsBatchSize', DEFAULT_SEND_OBJECTS_BATCH_SIZE)
+	paths = [file.getAbsolutePath() for file in files]
 
-	while count < filesNum:
-		file = files[count]
-		count += 1
-		path = file.getAbsolutePath()
-		try:
-			logger.debug(file.getAbsolutePath())
-			ParseEnrichedScanFile.parseFile(Framework, path, isManual=1, reportWarning=1)
-			if Framework.getStepExecutionStatus()==WorkflowStepStatus.SUCCESS:
-				noFileProcessedSuccess = 0
-		except:
-			errorMessage = str(sys.exc_info()[1])
-			logger.debug('Failed parsing file: ' + path)
-			logger.debugException(errorMessage)
-			Framework.reportWarning(inventoryerrorcodes.INVENTORY_DISCOVERY_FAILED_PARSING, [path])
+	succeededNum = ParseEnrichedScanFile.parseFiles(Framework, paths, threadsNumber, sendBatchSize, isManual=1, reportWarning=1)
+	noFileProcessedSuccess = not succeededNum
 
 	logger.debug(noFileProcessedSuccess)
 	if noFileProcessedSuccess:
@@ -61,6 +51,13 @@ def processManuallyEnrichedScanFile(Framework):
 		logger.debug('OK, due to some files successed process, set the status as SUCCESS')
 		Framework.setStepExecutionStatus(WorkflowStepStatus.SUCCESS)
 
+def getIntParameter(Framework, name, defaultValue):
+	value = Framework.getParameter(name)
+	try:
+		return int(value)
+	except:
+		return defaultValue
+
 class XsfFilter(FileFilter):
 	def accept(self, filePath):
 		regex = InventoryUtils.AUTO_SCANFILE_PREFIX + CollectorsConstants.XMLENRICHER_FILENAME_SEPARATOR + ".*" + CollectorsConstants.XMLENRICHER_FILENAME_SEPARATOR + "[^_]+\\.xsf$"
@@ -45,6 +45,8 @@ def DiscoveryMain(Framework):
     UDPports = Framework.getParameter('UDPports') or None
     UDPports = UDPports and UDPports.strip()
     connectTimeOut = int(Framework.getParameter('connectTimeOut'))
+    maxConcurrentConnections = int(Framework.getParameter('maxConcurrentConnections') or netutils.DEFAULT_MAX_CONCURRENT_CONNECTIONS)
+    maxConnectsPerSecond = int(Framework.getParameter('maxConnectsPerSecond') or 0)
 
     #if we need to check host's reachability:
     if Framework.getParameter('checkIfIpIsReachable').lower() == 'true':
@@ -126,16 +128,20 @@ def DiscoveryMain(Framework):
 
     if useFallback or not useNMap:
         # Old flow supports only TCP ports
-        for port in portsToDiscover:
-            if port.isIpInRange(ipAddress):
-                if port.getProtocol() == PortType.UDP.getProtocol():
-                    logger.warn("UDP port scan is not supporting by default behavior. Skipping...")
-                elif port.getProtocol() == PortType.TCP.getProtocol() and (
-                netutils.checkTcpConnectivity(ipAddress, port.getPortNumber(), connectTimeOut)):
-                    OSHVResult.addAll(
-                        reportPort(hostOsh, ipAddress, [port.portName], port.getProtocol(), port.getPortNumber()))
-                    #we found one connected port -> we need to add hostOsh to OSHVResult
-                    isConnectedPortFound = True
+        portsInRange = [port for port in portsToDiscover if port.isIpInRange(ipAddress)]
+        tcpPortNumbers = [port.getPortNumber() for port in portsInRange
+                          if port.getProtocol() == PortType.TCP.getProtocol()]
+        connectedPortNumbers = netutils.checkTcpConnectivityBulk(ipAddress, tcpPortNumbers, connectTimeOut,
+                                                                 maxConcurrentConnections, maxConnectsPerSecond)
+        for port in portsInRange:
+            if port.getProtocol() == PortType.UDP.getProtocol():
+                logger.warn("UDP port scan is not supporting by default behavior. Skipping...")
+            elif port.getProtocol() == PortType.TCP.getProtocol() and (
+            port.getPortNumber() in connectedPortNumbers):
+                OSHVResult.addAll(
+                    reportPort(hostOsh, ipAddress, [port.portName], port.getProtocol(), port.getPortNumber()))
+                #we found one connected port -> we need to add hostOsh to OSHVResult
+                isConnectedPortFound = True
 
     #in case we didn't find any port, return nothing
     if not isConnectedPortFound:
@@ -137,6 +137,7 @@ DistributedVirtualPortGroupMapper = _vmware_vim_40.DistributedVirtualPortGroupMa
 
 _DEFAULT_PAGE_SIZE_DATACENTER = 50
 _DEFAULT_PAGE_SIZE_COMPUTE_RESOURCE = 50
+_DEFAULT_PAGE_SIZE_CONTAINER_VIEW = 1000
 _DEFAULT_PAGE_SIZE_HOST = 25
 _DEFAULT_PAGE_SIZE_VM = 25
 _DEFAULT_PAGE_SIZE_POOL = 50
@@ -246,6 +247,13 @@ class TopologyDiscoverer(_vmware_vim_40.TopologyDiscoverer):
     def _getDvPortGroupFromDatacenterQuery(self):
         return _vmware_vim_base.PagingProperyCollectorQuery(self.getClient(), self.getCrossClientHelper(), pageSize = _DEFAULT_PAGE_SIZE_DVPG)
 
+    def _isBulkRetrievalSupported(self):
+        return 1
+
+    def _getContainerViewQuery(self):
+        pageSize = self.config.getBulkRetrievalPageSize() or _DEFAULT_PAGE_SIZE_CONTAINER_VIEW
+        return _vmware_vim_base.PagingProperyCollectorQuery(self.getClient(), self.getCrossClientHelper(), pageSize = pageSize)
+
 
 
 class VirtualCenterDiscoverer(_vmware_vim_40.VirtualCenterDiscoverer):
@@ -25,6 +25,7 @@ import md5
 import shared_resources_util
 
 from java.util import HashSet
+from java.util import Hashtable
 from java.lang import Exception as JavaException
 from java.lang import Runnable
 from java.lang import Thread
@@ -32,6 +33,7 @@ from java.util import Calendar
 from java.util import GregorianCalendar
 from java.lang import Boolean
 from java.lang import Runtime
+from java.lang import System
 from java.util import ArrayList
 from javax.xml.datatype import DatatypeFactory
 
@@ -824,6 +826,26 @@ class FilterFactory(_HasClient, _HasCrossClientHelper):
         filterObject = builder.build()
         return [filterObject]
 
+    def createContainerViewFilter(self, viewReference, typeName, properties):
+        builder = self._createPropertiesFilterBuilder()
+        builder.properties(typeName, properties)
+        builder.startFrom(viewReference, PropertyFilterBuilder.SKIP_STARTING_OBJECT, ['view2objects'])
+        builder.addTraverseRule('view2objects', 'ContainerView', 'view')
+
+        filterObject = builder.build()
+        return [filterObject]
+
+    def createEntitiesFilter(self, references, typeName, properties):
+        '''
+        Filter for properties of known entities, references are ManagedObjectReferenceWrappers
+        '''
+        builder = self._createPropertiesFilterBuilder()
+        builder.properties(typeName, properties)
+        for reference in references:
+            builder.startFrom(reference.getReference(), PropertyFilterBuilder.DONT_SKIP_STARTING_OBJECT)
+
+        filterObject = builder.build()
+        return [filterObject]
 
 
 
@@ -896,6 +918,128 @@ class LicensingDiscoveryException(Exception):
     pass
 
 
+class _VmFilteringStats:
+    '''
+    Counters of VMs skipped during discovery
+    '''
+    def __init__(self):
+        self.total = 0
+        self.poweredOff = 0
+        self.noHostKey = 0
+
+    def log(self, reportedCount):
+        logger.debug(" ......... VMs total = %s, powered off = %s, no host key = %s, skipped = %s" % (self.total, self.poweredOff, self.noHostKey, self.total - reportedCount))
+
+
+class ContainerViewInventory:
+    '''
+    Inventory retrieved in bulk by container views, entities are grouped by
+    references of their parent entities
+    '''
+    def __init__(self):
+        self.datacentersByReference = {}
+        self.computeResourcesByDatacenterReference = {}
+        self.hostsByComputeResourceReference = {}
+        self.vmsByComputeResourceReference = {}
+        self.resourcePoolsByComputeResourceReference = {}
+
+    def releaseDatacenter(self, datacenterReference):
+        '''
+        Drop references to reported entities of datacenter to give a chance for GC
+        '''
+        computeResourcesByReference = self.computeResourcesByDatacenterReference.get(datacenterReference) or {}
+        for computeResourceReference in computeResourcesByReference.keys():
+            for entitiesByReference in (self.hostsByComputeResourceReference, self.vmsByComputeResourceReference, self.resourcePoolsByComputeResourceReference):
+                if entitiesByReference.has_key(computeResourceReference):
+                    del entitiesByReference[computeResourceReference]
+        if self.computeResourcesByDatacenterReference.has_key(datacenterReference):
+            del self.computeResourcesByDatacenterReference[datacenterReference]
+
+
+# key of vCenter -> TopologyUpdateState, kept between job runs for the probe lifetime
+VIM_TOPOLOGY_UPDATE_STATES = Hashtable()
+
+
+class TopologyUpdateState:
+    '''
+    State of incremental topology sync of vCenter: values of tracked properties and parent
+    references of entities by reference, compared with values of the next run to find changes.
+    State does not depend on the session it was read in.
+    '''
+    _RESOURCE_POOL_PROPERTIES = ['name', 'owner', 'config.cpuAllocation.reservation', 'config.cpuAllocation.limit', 'config.cpuAllocation.shares.shares',
+                                'config.memoryAllocation.reservation', 'config.memoryAllocation.limit', 'config.memoryAllocation.shares.shares']
+
+    # VMs in vApps refer to VirtualApp, a resource pool subtype, as their resource pool
+    TRACKED_PROPERTIES_BY_TYPE = {
+        'ComputeResource' : ['name', 'parent'],
+        'ResourcePool' : _RESOURCE_POOL_PROPERTIES,
+        'VirtualApp' : _RESOURCE_POOL_PROPERTIES,
+        'HostSystem' : ['name', 'parent', 'summary.runtime.connectionState', 'summary.runtime.inMaintenanceMode'],
+        'VirtualMachine' : ['name', 'resourcePool', 'config.changeVersion', 'runtime.powerState', 'runtime.host', 'guest.ipAddress', 'guest.hostName']
+    }
+
+    REFERENCE_PROPERTIES = ('parent', 'owner', 'resourcePool', 'runtime.host')
+
+    PARENT_PROPERTY_BY_TYPE = {
+        'VirtualMachine' : 'resourcePool',
+        'ResourcePool' : 'owner',
+        'VirtualApp' : 'owner',
+        'HostSystem' : 'parent'
+    }
+
+    def __init__(self):
+        self.fullSyncTime = System.currentTimeMillis()
+
+        self.valuesByReference = {}
+        self.parentReferenceByReference = {}
+        self.datacenterReferenceByComputeResourceReference = {}
+
+    def addEntity(self, typeName, resultObject):
+        '''
+        string, PropertyCollectorResultObject -> None
+        Remember tracked property values of entity, references are wrapped and other
+        values are kept as strings so they can be compared between sessions
+        '''
+        values = []
+        for propertyName in TopologyUpdateState.TRACKED_PROPERTIES_BY_TYPE[typeName]:
+            value = resultObject.properties.get(propertyName)
+            if value is not None:
+                if propertyName in TopologyUpdateState.REFERENCE_PROPERTIES:
+                    value = wrapMoref(value)
+                else:
+                    value = unicode(value)
+            values.append(value)
+        reference = resultObject.reference
+        self.valuesByReference[reference] = tuple(values)
+
+        propertyName = TopologyUpdateState.PARENT_PROPERTY_BY_TYPE.get(typeName)
+        parentReference = propertyName and resultObject.properties.get(propertyName)
+        if parentReference is not None:
+            self.parentReferenceByReference[reference] = wrapMoref(parentReference)
+
+    def getComputeResourceReferences(self):
+        ''' -> set(ManagedObjectReferenceWrapper) '''
+        return set([reference for reference in self.valuesByReference.keys()
+                    if not TopologyUpdateState.PARENT_PROPERTY_BY_TYPE.has_key(reference.getType())])
+
+    def getComputeResourceReference(self, reference):
+        '''
+        ManagedObjectReferenceWrapper -> ManagedObjectReferenceWrapper or None
+        Find compute resource of VM, resource pool or host by tracked parent references
+        '''
+        while reference is not None and TopologyUpdateState.PARENT_PROPERTY_BY_TYPE.has_key(reference.getType()):
+            reference = self.parentReferenceByReference.get(reference)
+        return reference
+
+    def getReferencesInComputeResources(self, typeName, computeResourceReferences):
+        ''' string, set(ManagedObjectReferenceWrapper) -> [ManagedObjectReferenceWrapper] '''
+        references = []
+        for reference, parentReference in self.parentReferenceByReference.items():
+            if reference.getType() == typeName and parentReference in computeResourceReferences:
+                references.append(reference)
+        return references
+
+
 class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
     """
     Base class for VMware topology discovery using VIM (web services) protocol
@@ -914,6 +1058,13 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
         self.topologyListener = None
         self.licensingDiscoverer = None
 
+        # inventory retrieved by container views, None if entities are queried level by level
+        self._inventory = None
+
+        # key of vCenter for incremental sync, None if incremental sync is not used
+        self._updateStateKey = None
+        self._updateState = None
+
     def setTopologyListener(self, topologyListener):
         ''' TopologyListener > None
         Set topology listener
@@ -928,6 +1079,13 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
         '''
         self.licensingDiscoverer = licensingDiscoverer
 
+    def setUpdateStateKey(self, updateStateKey):
+        '''
+        string -> None
+        Set key of vCenter the incremental sync state is kept by between runs
+        '''
+        self._updateStateKey = updateStateKey
+
     def getApiType(self):
         return self.apiType
 
@@ -972,6 +1130,9 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
 
     def getComputeResourcesInDatacenter(self, datacenter):
 
+        if self._inventory is not None:
+            return self._inventory.computeResourcesByDatacenterReference.get(datacenter.reference) or {}
+
         # query for ComputeResources returns both ComputeResources and all subclasses including ClusterComputeResources
         crMethodsByType = {
             'ComputeResource' : self._createComputeResource,
@@ -1033,6 +1194,13 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
 
     def getResourcePoolsInComputeResource(self, computeResource):
 
+        if self._inventory is not None:
+            resourcePoolsByReference = self._inventory.resourcePoolsByComputeResourceReference.get(computeResource.reference) or {}
+            for resourcePool in resourcePoolsByReference.values():
+                if resourcePool.reference == computeResource.rootResourcePoolReference:
+                    resourcePool._isRoot = 1
+            return resourcePoolsByReference
+
         resourcePoolsByReference = {}
         rpMapper = self._getResourcePoolMapper()
         rpProperties = rpMapper.getSupportedProperties()
@@ -1063,8 +1231,28 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
     def _getHostByComputeResourceQuery(self):
         return ProperyCollectorQuery(self.getClient(), self.getCrossClientHelper())
 
+    def _createHostFromResult(self, hostMapper, resultObject):
+        ''' Mapper, PropertyCollectorResultObject -> Host or None if host is skipped '''
+        host = self._createHost()
+        hostMapper.map(resultObject, host)
+
+        if not host._uuid:
+            logger.debug(" ......... Host '%s': cannot find UUID, Host is skipped" % host.name)
+            return None
+
+        self._processEsxCpuCores(host)
+
+        self._resolveEsxHostnameToIp(host)
+
+        self._resolveEsxIsManaged(host)
+
+        return host
+
     def getHostsInComputeResource(self, computeResource):
 
+        if self._inventory is not None:
+            return self._inventory.hostsByComputeResourceReference.get(computeResource.reference) or {}
+
         hostsByReference = {}
         hostMapper = self._getHostMapper()
         hostProperties = hostMapper.getSupportedProperties()
@@ -1075,20 +1263,9 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
         while hostQuery.hasNext():
             resultObject = hostQuery.next()
             if resultObject:
-                host = self._createHost()
-                hostMapper.map(resultObject, host)
-
-                if not host._uuid:
-                    logger.debug(" ......... Host '%s': cannot find UUID, Host is skipped" % host.name)
-                    continue
-
-                self._processEsxCpuCores(host)
-
-                self._resolveEsxHostnameToIp(host)
-
-                self._resolveEsxIsManaged(host)
-
-                hostsByReference[host.reference] = host
+                host = self._createHostFromResult(hostMapper, resultObject)
+                if host is not None:
+                    hostsByReference[host.reference] = host
 
         return hostsByReference
 
@@ -1101,8 +1278,35 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
     def _getVirtualMachineByRootPoolQuery(self):
         return ProperyCollectorQuery(self.getClient(), self.getCrossClientHelper())
 
+    def _createVirtualMachineFromResult(self, vmMapper, resultObject, vmStats):
+        ''' Mapper, PropertyCollectorResultObject, _VmFilteringStats -> VirtualMachine or None if VM is skipped '''
+        vmStats.total += 1
+        vm = self._createVirtualMachine()
+        vmMapper.map(resultObject, vm)
+
+        vm.findHostKey()
+        vm.findIfVmIsPowered()
+
+        if not vm._hostKey:
+            vmStats.noHostKey += 1
+            if _LOG_VERBOSE_FILTERING:
+                logger.debug(" ......... VM '%s': cannot find host key, VM is skipped" % vm.name)
+            return None
+
+        if not vm._vmIsPowered:
+            vmStats.poweredOff += 1
+            if not self.config.reportPoweredOffVms():
+                if _LOG_VERBOSE_FILTERING:
+                    logger.debug(" ......... VM '%s': powered off, VM is skipped" % vm.name)
+                return None
+
+        return vm
+
     def getVirtualMachinesInComputeResource(self, computeResource):
 
+        if self._inventory is not None:
+            return self._inventory.vmsByComputeResourceReference.get(computeResource.reference) or {}
+
         vmsByReference = {}
         vmMapper = self._getVirtualMachineMapper()
         vmProperties = vmMapper.getSupportedProperties()
@@ -1112,37 +1316,307 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
 
         vmQuery.execute(vmFilter)
 
-        _countPoweredOff = 0
-        _countNoHostKey = 0
-        _countTotal = 0
+        vmStats = _VmFilteringStats()
         while vmQuery.hasNext():
             resultObject = vmQuery.next()
             if resultObject:
-                _countTotal += 1
-                vm = self._createVirtualMachine()
-                vmMapper.map(resultObject, vm)
+                vm = self._createVirtualMachineFromResult(vmMapper, resultObject, vmStats)
+                if vm is not None:
+                    vmsByReference[vm.reference] = vm
+
+        vmStats.log(len(vmsByReference))
+
+        return vmsByReference
+
+    def _isBulkRetrievalSupported(self):
+        '''
+        Container views are available since API 4.0, paged retrieval since 4.1
+        '''
+        return 0
+
+    def _getContainerViewQuery(self):
+        return ProperyCollectorQuery(self.getClient(), self.getCrossClientHelper())
+
+    def _queryContainerView(self, typeName, properties, handler):
+        '''
+        Query properties of all entities of type in inventory using single recursive container view,
+        handler is called for each result object
+        '''
+        client = self.getClient()
+        service = client.getService()
+        viewManager = client.getServiceContent().getViewManager()
+        view = service.createContainerView(viewManager, client.getRootFolder(), self.getCrossClientHelper().toList([typeName]), Boolean.TRUE)
+        try:
+            viewFilter = self.filterFactory.createContainerViewFilter(view, typeName, properties)
+            query = self._getContainerViewQuery()
+            query.execute(viewFilter)
+            while query.hasNext():
+                resultObject = query.next()
+                if resultObject:
+                    handler(resultObject)
+        finally:
+            try:
+                service.destroyView(view)
+            except:
+                logger.debugException("Failed to destroy container view")
+
+    def _retrieveInventory(self):
+        '''
+        Retrieve datacenters, compute resources, hosts, resource pools and VMs with one
+        container view per type and assemble the inventory tree by parent references
+        -> ContainerViewInventory
+        '''
+        inventory = ContainerViewInventory()
+
+        parentReferenceByFolderReference = {}
+        def handleFolder(resultObject):
+            parentReference = resultObject.properties.get('parent')
+            if parentReference is not None:
+                parentReferenceByFolderReference[resultObject.reference] = wrapMoref(parentReference)
+        self._queryContainerView('Folder', ['parent'], handleFolder)
+
+        def findDatacenterReference(reference):
+            while reference is not None and reference.getType() != 'Datacenter':
+                reference = parentReferenceByFolderReference.get(reference)
+            return reference
+
+        dcMapper = self._getDatacenterMapper()
+        def handleDatacenter(resultObject):
+            datacenter = self._createDatacenter()
+            dcMapper.map(resultObject, datacenter)
+            inventory.datacentersByReference[datacenter.reference] = datacenter
+        self._queryContainerView('Datacenter', dcMapper.getSupportedProperties(), handleDatacenter)
+
+        crMethodsByType = {
+            'ComputeResource' : self._createComputeResource,
+            'ClusterComputeResource' : self._createClusterComputeResource
+        }
+        crMapper = self._getComputeResourceMapper()
+        def handleComputeResource(resultObject):
+            crFactoryMethod = crMethodsByType.get(resultObject.type)
+            if not crFactoryMethod:
+                logger.warn("Received unknown ComputeResource subclass: %s" % resultObject.type)
+                return
+            parentReference = resultObject.properties.get('parent')
+            datacenterReference = parentReference is not None and findDatacenterReference(wrapMoref(parentReference)) or None
+            if datacenterReference is None:
+                logger.debug("Cannot find datacenter of compute resource %s, skipped" % resultObject.reference)
+                return
+            computeResource = crFactoryMethod()
+            crMapper.map(resultObject, computeResource)
+            inventory.computeResourcesByDatacenterReference.setdefault(datacenterReference, {})[computeResource.reference] = computeResource
+        self._queryContainerView('ComputeResource', crMapper.getSupportedProperties() + ['parent'], handleComputeResource)
+
+        hostMapper = self._getHostMapper()
+        def handleHost(resultObject):
+            parentReference = resultObject.properties.get('parent')
+            if parentReference is not None:
+                host = self._createHostFromResult(hostMapper, resultObject)
+                if host is not None:
+                    inventory.hostsByComputeResourceReference.setdefault(wrapMoref(parentReference), {})[host.reference] = host
+        self._queryContainerView('HostSystem', hostMapper.getSupportedProperties() + ['parent'], handleHost)
+
+        # pools are always needed to find compute resource of VM, pool details only in advanced mode
+        rpMapper = None
+        rpProperties = ['owner']
+        if not self.config.reportBasicTopology():
+            rpMapper = self._getResourcePoolMapper()
+            rpProperties = rpMapper.getSupportedProperties() + rpProperties
+        ownerReferenceByPoolReference = {}
+        def handleResourcePool(resultObject):
+            ownerReference = resultObject.properties.get('owner')
+            if ownerReference is not None:
+                ownerReference = wrapMoref(ownerReference)
+                ownerReferenceByPoolReference[resultObject.reference] = ownerReference
+                if rpMapper is not None:
+                    resourcePool = self._createResourcePool()
+                    rpMapper.map(resultObject, resourcePool)
+                    inventory.resourcePoolsByComputeResourceReference.setdefault(ownerReference, {})[resourcePool.reference] = resourcePool
+        self._queryContainerView('ResourcePool', rpProperties, handleResourcePool)
+
+        vmMapper = self._getVirtualMachineMapper()
+        vmStats = _VmFilteringStats()
+        reportedVms = []
+        def handleVirtualMachine(resultObject):
+            # templates are not assigned to resource pools and are skipped as in traversal from root pool
+            poolReference = resultObject.properties.get('resourcePool')
+            ownerReference = poolReference is not None and ownerReferenceByPoolReference.get(wrapMoref(poolReference)) or None
+            if ownerReference is not None:
+                vm = self._createVirtualMachineFromResult(vmMapper, resultObject, vmStats)
+                if vm is not None:
+                    inventory.vmsByComputeResourceReference.setdefault(ownerReference, {})[vm.reference] = vm
+                    reportedVms.append(vm.reference)
+        self._queryContainerView('VirtualMachine', vmMapper.getSupportedProperties() + ['resourcePool'], handleVirtualMachine)
+        vmStats.log(len(reportedVms))
+
+        return inventory
+
+    def _isIncrementalSyncSupported(self):
+        '''
+        Container views and paged retrieval used to read tracked properties are available since API 4.1
+        '''
+        return self._isBulkRetrievalSupported()
+
+    def _queryEntities(self, references, typeName, properties, handler):
+        '''
+        Query properties of known entities, handler is called for each result object
+        '''
+        if not references:
+            return
+        entitiesFilter = self.filterFactory.createEntitiesFilter(references, typeName, properties)
+        query = self._getContainerViewQuery()
+        query.execute(entitiesFilter)
+        while query.hasNext():
+            resultObject = query.next()
+            if resultObject:
+                handler(resultObject)
 
-                vm.findHostKey()
-                vm.findIfVmIsPowered()
+    def _readUpdateState(self):
+        '''
+        -> TopologyUpdateState
+        Read tracked properties of compute resources, hosts, resource pools and VMs,
+        one container view per type
+        '''
+        state = TopologyUpdateState()
+        for typeName, properties in TopologyUpdateState.TRACKED_PROPERTIES_BY_TYPE.items():
+            def handleEntity(resultObject, typeName=typeName):
+                state.addEntity(typeName, resultObject)
+            self._queryContainerView(typeName, properties, handleEntity)
+        return state
+
+    def _retrieveChangedInventory(self, previousState, state):
+        '''
+        TopologyUpdateState, TopologyUpdateState -> ContainerViewInventory or None if full sync is required
+        Compare tracked properties with previous run and retrieve changed VMs with hosts, pools and
+        compute resources they belong to
+        '''
+        if previousState.getComputeResourceReferences() != state.getComputeResourceReferences():
+            logger.debug("Compute resources were added or removed, full sync is required")
+            return None
+
+        changedVmReferences = []
+        computeResourceReferences = set()
+        references = set(previousState.valuesByReference.keys())
+        references.update(state.valuesByReference.keys())
+        for reference in references:
+            values = state.valuesByReference.get(reference)
+            if values == previousState.valuesByReference.get(reference):
+                continue
+            if not TopologyUpdateState.PARENT_PROPERTY_BY_TYPE.has_key(reference.getType()):
+                computeResourceReferences.add(reference)
+                continue
+            if reference.getType() == 'VirtualMachine' and values is not None:
+                changedVmReferences.append(reference)
+            for computeResourceReference in (previousState.getComputeResourceReference(reference), state.getComputeResourceReference(reference)):
+                if computeResourceReference is not None:
+                    computeResourceReferences.add(computeResourceReference)
+
+        datacenterReferenceByComputeResourceReference = {}
+        for computeResourceReference in computeResourceReferences:
+            datacenterReference = state.datacenterReferenceByComputeResourceReference.get(computeResourceReference)
+            if datacenterReference is None:
+                logger.debug("Datacenter of compute resource %s is unknown, full sync is required" % computeResourceReference)
+                return None
+            datacenterReferenceByComputeResourceReference[computeResourceReference] = datacenterReference
+        logger.debug("Changed since previous run: %s VMs, %s compute resources" % (len(changedVmReferences), len(computeResourceReferences)))
+        inventory = ContainerViewInventory()
 
-                if not vm._hostKey:
-                    _countNoHostKey += 1
-                    if _LOG_VERBOSE_FILTERING:
-                        logger.debug(" ......... VM '%s': cannot find host key, VM is skipped" % vm.name)
-                    continue
+        dcMapper = self._getDatacenterMapper()
+        def handleDatacenter(resultObject):
+            datacenter = self._createDatacenter()
+            dcMapper.map(resultObject, datacenter)
+            inventory.datacentersByReference[datacenter.reference] = datacenter
+        datacenterReferences = set(datacenterReferenceByComputeResourceReference.values())
+        self._queryEntities(list(datacenterReferences), 'Datacenter', dcMapper.getSupportedProperties(), handleDatacenter)
 
-                if not vm._vmIsPowered:
-                    _countPoweredOff += 1
-                    if not self.config.reportPoweredOffVms():
-                        if _LOG_VERBOSE_FILTERING:
-                            logger.debug(" ......... VM '%s': powered off, VM is skipped" % vm.name)
-                        continue
+        crMethodsByType = {
+            'ComputeResource' : self._createComputeResource,
+            'ClusterComputeResource' : self._createClusterComputeResource
+        }
+        crMapper = self._getComputeResourceMapper()
+        def handleComputeResource(resultObject):
+            crFactoryMethod = crMethodsByType.get(resultObject.type)
+            if not crFactoryMethod:
+                logger.warn("Received unknown ComputeResource subclass: %s" % resultObject.type)
+                return
+            computeResource = crFactoryMethod()
+            crMapper.map(resultObject, computeResource)
+            datacenterReference = datacenterReferenceByComputeResourceReference[resultObject.reference]
+            inventory.computeResourcesByDatacenterReference.setdefault(datacenterReference, {})[computeResource.reference] = computeResource
+        self._queryEntities(list(computeResourceReferences), 'ComputeResource', crMapper.getSupportedProperties(), handleComputeResource)
 
-                vmsByReference[vm.reference] = vm
+        # all hosts of compute resource are needed to report VM to host assignments
+        hostMapper = self._getHostMapper()
+        def handleHost(resultObject):
+            host = self._createHostFromResult(hostMapper, resultObject)
+            if host is not None:
+                computeResourceReference = state.getComputeResourceReference(resultObject.reference)
+                inventory.hostsByComputeResourceReference.setdefault(computeResourceReference, {})[host.reference] = host
+        hostReferences = state.getReferencesInComputeResources('HostSystem', computeResourceReferences)
+        self._queryEntities(hostReferences, 'HostSystem', hostMapper.getSupportedProperties(), handleHost)
 
-        logger.debug(" ......... VMs total = %s, powered off = %s, no host key = %s, skipped = %s" % (_countTotal, _countPoweredOff, _countNoHostKey, _countTotal - len(vmsByReference)))
+        if not self.config.reportBasicTopology():
+            rpMapper = self._getResourcePoolMapper()
+            def handleResourcePool(resultObject):
+                resourcePool = self._createResourcePool()
+                rpMapper.map(resultObject, resourcePool)
+                computeResourceReference = state.getComputeResourceReference(resultObject.reference)
+                inventory.resourcePoolsByComputeResourceReference.setdefault(computeResourceReference, {})[resourcePool.reference] = resourcePool
+            poolReferences = (state.getReferencesInComputeResources('ResourcePool', computeResourceReferences)
+                              + state.getReferencesInComputeResources('VirtualApp', computeResourceReferences))
+            self._queryEntities(poolReferences, 'ResourcePool', rpMapper.getSupportedProperties(), handleResourcePool)
 
-        return vmsByReference
+        vmMapper = self._getVirtualMachineMapper()
+        vmStats = _VmFilteringStats()
+        reportedVms = []
+        def handleVirtualMachine(resultObject):
+            computeResourceReference = state.getComputeResourceReference(resultObject.reference)
+            if computeResourceReference is not None:
+                vm = self._createVirtualMachineFromResult(vmMapper, resultObject, vmStats)
+                if vm is not None:
+                    inventory.vmsByComputeResourceReference.setdefault(computeResourceReference, {})[vm.reference] = vm
+                    reportedVms.append(vm.reference)
+        self._queryEntities(changedVmReferences, 'VirtualMachine', vmMapper.getSupportedProperties(), handleVirtualMachine)
+        vmStats.log(len(reportedVms))
+
+        return inventory
+
+    def _isFullSyncDue(self, state):
+        intervalHours = self.config.getFullSyncIntervalHours()
+        return intervalHours and System.currentTimeMillis() - state.fullSyncTime >= intervalHours * 3600 * 1000
+
+    def _discoverIncrementally(self):
+        '''
+        Report only entities changed since previous run by comparing tracked properties,
+        otherwise make full discovery
+        '''
+        updateStateKey = self._updateStateKey
+
+        # tracked properties are read before discovery so changes made during discovery are found next time
+        state = self._readUpdateState()
+        previousState = VIM_TOPOLOGY_UPDATE_STATES.get(updateStateKey)
+        if previousState is not None:
+            VIM_TOPOLOGY_UPDATE_STATES.remove(updateStateKey)
+            inventory = None
+            if self._isFullSyncDue(previousState):
+                logger.debug("Full sync interval elapsed")
+            else:
+                state.fullSyncTime = previousState.fullSyncTime
+                state.datacenterReferenceByComputeResourceReference.update(previousState.datacenterReferenceByComputeResourceReference)
+                inventory = self._retrieveChangedInventory(previousState, state)
+            if inventory is not None:
+                self._inventory = inventory
+                self._updateState = state
+                self._discoverDatacenters()
+                VIM_TOPOLOGY_UPDATE_STATES.put(updateStateKey, state)
+                return
+            state.fullSyncTime = System.currentTimeMillis()
+            state.datacenterReferenceByComputeResourceReference.clear()
+
+        logger.debug("Full topology sync, inventory changes are found by comparing with this run from now on")
+        self._updateState = state
+        self._discoverDatacenters()
+        VIM_TOPOLOGY_UPDATE_STATES.put(updateStateKey, state)
 
     def _getNetworkMapper(self):
         raise NotImplemented, "_getNetworkMapper"
@@ -1286,7 +1760,14 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
         return partitionNumberToPartition
 
     def _discoverDatacenters(self):
-        datacentersByReference = self.getDatacenters()
+        if self._inventory is not None:
+            datacentersByReference = self._inventory.datacentersByReference
+        elif self._isBulkRetrievalSupported() and self.config.retrieveInventoryInBulk():
+            logger.debug("Retrieving inventory in bulk by container views")
+            self._inventory = self._retrieveInventory()
+            datacentersByReference = self._inventory.datacentersByReference
+        else:
+            datacentersByReference = self.getDatacenters()
 
         _dcCount = len(datacentersByReference)
         logger.debug("Found %s %s" % (_dcCount, _simplePlural('datacenter', _dcCount)))
@@ -1297,12 +1778,18 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
 
             self._discoverDatacenter(datacenter)
 
+            if self._updateState is not None:
+                for crRef in datacenter._computeResourcesByReference.keys():
+                    self._updateState.datacenterReferenceByComputeResourceReference[crRef] = dcRef
+
             self._filterVmsWithDuplicatingHostKeys(datacenter._computeResourcesByReference.values())
 
             self.topologyListener.onDatacenter(datacenter)
 
             # give a chance for GC
             del datacentersByReference[dcRef]
+            if self._inventory is not None:
+                self._inventory.releaseDatacenter(dcRef)
 
     def _discoverDatacenter(self, datacenter):
         logger.debug("Datacenter '%s'" % datacenter.name)
@@ -1479,7 +1966,10 @@ class TopologyDiscoverer(_HasClient, _HasCrossClientHelper):
         raise NotImplemented, "_createVirtualCenter"
 
     def discover(self):
-        self._discoverDatacenters()
+        if self._updateStateKey and self.config.syncTopologyIncrementally() and self._isIncrementalSyncSupported():
+            self._discoverIncrementally()
+        else:
+            self._discoverDatacenters()
 
 
 class TopologyListener:
@@ -2,6 +2,39 @@ import sys
 
 import logger
 import asm_signature_parser
+import asm_signature_processor
+
+from java.util import Hashtable
+
+# file name -> (file content, _IndexedSignatures), kept for the probe lifetime
+# and replaced when content of the file changes
+PARSED_SIGNATURES = Hashtable()
+
+
+class _IndexedSignatures(object):
+    """Parsed signatures with applications indexed by cit, product name and name"""
+
+    def __init__(self, signatures):
+        self.signatures = signatures
+        # value -> (position in file, application), first application wins as in linear scan
+        self.byProductName = {}
+        self.byName = {}
+        self.byCit = {}
+        for position, application in enumerate(getattr(signatures, 'children', None) or []):
+            for index, value in ((self.byProductName, application.productName),
+                                 (self.byName, application.name),
+                                 (self.byCit, application.cit)):
+                if value and not index.has_key(value):
+                    index[value] = (position, application)
+        asm_signature_processor.precompileRegexes(signatures)
+
+    def find(self, cit=None, productName=None, name=None):
+        found = []
+        for index, value in ((self.byProductName, productName), (self.byName, name), (self.byCit, cit)):
+            if value and index.has_key(value):
+                found.append(index[value])
+        if found:
+            return min(found)[1]
 
 
 class SignatureLoader(object):
@@ -9,15 +42,21 @@ class SignatureLoader(object):
 
     def __init__(self, Framework):
         try:
-            logger.debug("Start to parse configuration file signature")
             signFileContent = Framework.getConfigFile(self.CONFIGFILE_SIGNATURE_FILE_NAME).getText()
-            self.signatures = asm_signature_parser.parseString(signFileContent)
+            cached = PARSED_SIGNATURES.get(self.CONFIGFILE_SIGNATURE_FILE_NAME)
+            if cached and cached[0] == signFileContent:
+                logger.debug("Use configuration file signature parsed earlier")
+                self.indexedSignatures = cached[1]
+            else:
+                logger.debug("Start to parse configuration file signature")
+                self.indexedSignatures = _IndexedSignatures(asm_signature_parser.parseString(signFileContent))
+                PARSED_SIGNATURES.put(self.CONFIGFILE_SIGNATURE_FILE_NAME, (signFileContent, self.indexedSignatures))
+            self.signatures = self.indexedSignatures.signatures
         except:
             self.signatures = None
+            self.indexedSignatures = None
             raise SyntaxError, sys.exc_info()[1]
 
     def load(self, cit=None, productName=None, name=None):
         if self.signatures:
-            for application in self.signatures.children:
-                if (productName and application.productName == productName) or (name and application.name == name) or (cit and application.cit == cit):
-                    return application
+            return self.indexedSignatures.find(cit, productName, name)
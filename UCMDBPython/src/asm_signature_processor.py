@@ -13,6 +13,10 @@ from asm_signature_variable_resolver import VariableResolver, ExpressionResolver
 
 from appilog.common.system.types.vectors import ObjectStateHolderVector
 
+# (resolved pattern, flags) -> compiled regex or error of compilation, shared by jobs of the probe
+_COMPILED_REGEXES = {}
+MAX_COMPILED_REGEXES = 5000
+
 
 def process(Framework, configSignature, application, shell, processMap, hostIPs):
     OSHVResult = ObjectStateHolderVector()
@@ -214,7 +218,7 @@ def processRegex(regExpSignature, input, variableResolver):
         return
     flags = getFlags(regExpSignature)
     try:
-        compiledRegex = re.compile('(%s)' % pattern, flags)
+        compiledRegex = compileRegex(pattern, flags)
     except Exception, e:
         logger.debug('Skip %s because regex %s is invalid:' % (regExpSignature, ExpressionResolver.quote(pattern)), e)
         return
@@ -227,6 +231,44 @@ def processRegex(regExpSignature, input, variableResolver):
         logger.debug('No match string found for regex %s' % ExpressionResolver.quote(pattern))
 
 
+def compileRegex(pattern, flags):
+    """
+    Compile regex wrapped into group, result is memoized per resolved pattern and flags
+    @raise Exception: regex is invalid
+    """
+    key = (pattern, flags)
+    compiled = _COMPILED_REGEXES.get(key)
+    if compiled is None:
+        try:
+            compiled = re.compile('(%s)' % pattern, flags)
+        except Exception, e:
+            compiled = e
+        if len(_COMPILED_REGEXES) >= MAX_COMPILED_REGEXES:
+            _COMPILED_REGEXES.clear()
+        _COMPILED_REGEXES[key] = compiled
+    if isinstance(compiled, Exception):
+        raise compiled
+    return compiled
+
+
+def precompileRegexes(signatures):
+    """
+    Compile regexes of signatures which do not depend on variables
+    """
+    elements = [signatures]
+    while elements:
+        element = elements.pop()
+        children = getattr(element, 'children', None)
+        if children:
+            elements.extend(children)
+        expr = getattr(element, 'expr', None)
+        if element and element.getType() == TAG_REGEX and expr and not ExpressionResolver.extractVariable(expr):
+            try:
+                compileRegex(expr, getFlags(element))
+            except Exception, e:
+                logger.debug('Regex %s is invalid:' % ExpressionResolver.quote(expr), e)
+
+
 def getFlags(regExpSignature):
     flags = 0
     flagAttrValue = getattr(regExpSignature, ATTR_REGEX_FLAG, None)
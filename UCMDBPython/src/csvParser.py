@@ -209,8 +209,8 @@ class Parser:
         if delimiter is None:
             raise Exception, "Delimiter can not be None"
 
-        #try to make reader as BufferedReader
-        if isinstance(reader, BufferedReader):
+        #try to make reader as BufferedReader, line readers are used as is
+        if isinstance(reader, BufferedReader) or hasattr(reader, 'readLine'):
             self.__reader = reader
         else:
             self.__reader = BufferedReader(reader)
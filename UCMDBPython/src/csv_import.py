@@ -1,15 +1,13 @@
 #coding=utf-8
 from appilog.common.system.types.vectors import ObjectStateHolderVector
 from java.lang import Exception
-from java.io import InputStreamReader
-from java.io import ByteArrayInputStream
 import csvParser
 
 import errormessages
 import logger
 import import_utils
 
-from file_import import FileDataSource
+from file_import import StreamingFileDataSource
 
 #Job Parameters
 PARAM_CSV_FILE = "csvFile"
@@ -17,7 +15,7 @@ PARAM_CSV_FILE_DELIMITER = "delimiter"
 PARAM_ROW_TO_START_INDEX = "rowToStartIndex"
 PARAM_QUOTE_SYMBOL = 'quoteSymbol'
 
-class CsvFileDataSource(FileDataSource):
+class CsvFileDataSource(StreamingFileDataSource):
     """
     This implementation of DataSource uses Comma Separated Values (CSV) file
     as a source of information which should be mapped to CMDB
@@ -33,32 +31,38 @@ class CsvFileDataSource(FileDataSource):
     Note: All spaces in CSV file are treated as parts of CSV entry value.
     In other words spaces are not skipped by default for string attributes.
     Use "skipSpaces" converter in order to skip spaces for particular attribute.
+    
+    Rows are parsed one at a time while file is read, only current row is kept.
     """
     def __init__(self, csvFileName, delimiter, rowToStartIndex, Framework, fileEncoding=None):
-        FileDataSource.__init__(self, csvFileName, Framework, fileEncoding)
+        StreamingFileDataSource.__init__(self, csvFileName, Framework, fileEncoding)
         self.delimiter = delimiter
         self.rowToStartIndex = rowToStartIndex
         self.currentRowIndex = -1
+        self.currentRow = None
         self.quoteSymbol = None
+        self.parser = None
+
+    def openLineReader(self, lineReader):
+        self.parser = csvParser.Parser(lineReader, self.delimiter)
+        self.parser.setQuoteSymbol(self.quoteSymbol)
+        self.parser.setRowToStartIndex(self.rowToStartIndex)
 
     def next(self):
+        tokens = self.parser.parseNext()
+        # empty lines are skipped
+        while tokens is not None and not tokens:
+            tokens = self.parser.parseNext()
+        if tokens is None:
+            self.currentRow = None
+            return 0
         self.currentRowIndex += 1
-        return self.currentRowIndex < len(self.data)
+        self.currentRow = csvParser.Row([token.strip() for token in tokens])
+        return 1
         
     def getColumnValue(self, key):
-        row = self.data[self.currentRowIndex]   
         columnIndex = key.getName() 
-        return row.getString(int(columnIndex))
-    
-    def parseFileContent(self, bytes):
-        byteInputStream = ByteArrayInputStream(bytes)
-        reader = InputStreamReader(byteInputStream, self.encoding)
-        
-        parser = csvParser.Parser(reader, self.delimiter)
-        parser.setQuoteSymbol(self.quoteSymbol)
-        parser.setRowToStartIndex(self.rowToStartIndex)
-
-        return csvParser.Processor().processByParser(parser).getRows()
+        return self.currentRow.getString(int(columnIndex))
 
 def DiscoveryMain(Framework):
     OSHVResult = ObjectStateHolderVector()
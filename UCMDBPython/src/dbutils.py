@@ -211,6 +211,7 @@ def stripDomain(tns_name,db_domain):
 
 from com.ziclix.python.sql import PyConnection
 from java.sql import Connection
+from java.sql import ResultSet
 import re
 
 
@@ -223,6 +224,9 @@ class ResultItem:
     pass
 
 
+DEFAULT_FETCH_SIZE = 1000
+
+
 class SqlClient:
 
     def __init__(self, jConnection):
@@ -231,6 +235,7 @@ class SqlClient:
         """
         assert jConnection, 'Connection should not be None'
         wrapper = self.__getJdbcConnection(jConnection)
+        self._jdbcConnection = wrapper
         connection = PyConnection(wrapper)
         self._cursor = connection.cursor()
         self.queryCount = 0
@@ -253,6 +258,35 @@ class SqlClient:
         result = sqlBuilder.parseResults(result)
         return result
 
+    def iterate(self, sqlBuilder, fetchSize = DEFAULT_FETCH_SIZE):
+        """
+        Executes query through server-side cursor, so the whole result is never held in memory.
+        Results are yielded in pages of at most fetchSize items.
+        SqlBuilder, int -> generator(list(ResultItem))
+        """
+        self.queryCount +=1
+        query = sqlBuilder.getQuery()
+        logger.debug("Query: %s             Fetch size: %s" % (query, fetchSize))
+        autoCommit = self._jdbcConnection.getAutoCommit()
+        # PostgreSQL driver fetches rows by portions only outside of auto-commit mode
+        self._jdbcConnection.setAutoCommit(0)
+        statement = self._jdbcConnection.createStatement(ResultSet.TYPE_FORWARD_ONLY, ResultSet.CONCUR_READ_ONLY)
+        try:
+            statement.setFetchSize(fetchSize)
+            resultSet = statement.executeQuery(query)
+            columns = range(1, resultSet.getMetaData().getColumnCount() + 1)
+            entries = []
+            while resultSet.next():
+                entries.append([resultSet.getObject(column) for column in columns])
+                if len(entries) >= fetchSize:
+                    yield sqlBuilder.parseResults(entries)
+                    entries = []
+            if entries:
+                yield sqlBuilder.parseResults(entries)
+        finally:
+            statement.close()
+            self._jdbcConnection.setAutoCommit(autoCommit)
+
     def close(self):
         self._cursor.close()
 
@@ -6,12 +6,29 @@ import errorobject
 from java.sql import Types
 from java.util import HashMap
 
+from com.hp.ucmdb.discovery.library.communication.downloader.cfgfiles import GeneralSettingsConfigFile
+
+#maximal number of bind parameters in one PostgreSQL statement
+MAX_STATEMENT_PARAMETERS = 32767
+DEFAULT_BULK_CHUNK_SIZE = 1000
+
+def buildValuesRows(rowTemplate, rowsCount):
+	'str, int -> str'
+	return ','.join([rowTemplate] * rowsCount)
+
 class DiscoveryDbEntity:
 	def __init__(self): pass
 	def getEntityType(self): raise NotImplementedError,"getEntityType"
-	def setValues(self, statement): raise NotImplementedError,"setValues"
+	#offset is the number of parameters set by previous rows of multi-row statement
+	def setValues(self, statement, offset = 0): raise NotImplementedError,"setValues"
 	def getNewEntity(self, resultset): raise NotImplementedError,"getNewEntity"
 	def getInsertSQL(self, resultset): raise NotImplementedError,"getInsertSQL"
+	#set-based upsert of rowsCount entities in one statement, None if entity does not support it
+	def getBulkInsertSQL(self, rowsCount): return None
+	#unique key of the entity in the table, entities with the same key are merged before bulk upsert
+	def getKey(self): raise NotImplementedError,"getKey"
+	#merge with entity with the same key added to the bulk earlier
+	def merge(self, previous): return self
 	def setValue(self, st, index, value):
 		if value == None:
 			st.setNull(index, Types.VARCHAR)
@@ -23,6 +40,7 @@ class DiscoveryDbUtils:
 		self.Framework = Framework
 		self.conn = self.Framework.getProbeDatabaseConnection(context)
 		self.typeBulks = HashMap()
+		self.bulkChunkSize = GeneralSettingsConfigFile.getInstance().getPropertyIntegerValue('probeDbBulkChunkSize', DEFAULT_BULK_CHUNK_SIZE)
 
 	def close(self):
 		self.conn.close()
@@ -41,6 +59,9 @@ class DiscoveryDbUtils:
 			del entitiesbulk[:]
 				
 	def insertEntitiesProbeDb(self, entitiesbulk):
+		if self.bulkChunkSize > 1 and entitiesbulk[0].getBulkInsertSQL(1):
+			self.upsertEntitiesProbeDb(entitiesbulk)
+			return
 		st = None
 		try:
 			try:
@@ -58,6 +79,51 @@ class DiscoveryDbUtils:
 		finally:
 			self.closeStatement(st)
 				
+	def upsertEntitiesProbeDb(self, entitiesbulk):
+		'''Set-based upsert: entities are merged by key and sent in chunks,
+		each chunk is upserted by a single multi-row statement'''
+		statements = {}
+		try:
+			try:
+				entities = self.mergeEntities(entitiesbulk)
+				paramsPerRow = entities[0].getBulkInsertSQL(1).count('?')
+				chunkSize = min(self.bulkChunkSize, MAX_STATEMENT_PARAMETERS / paramsPerRow)
+				for chunkStart in range(0, len(entities), chunkSize):
+					chunk = entities[chunkStart:chunkStart + chunkSize]
+					st = statements.get(len(chunk))
+					if st is None:
+						st = self.conn.prepareStatement(chunk[0].getBulkInsertSQL(len(chunk)))
+						statements[len(chunk)] = st
+					offset = 0
+					for entity in chunk:
+						entity.setValues(st, offset)
+						offset += paramsPerRow
+					st.executeUpdate()
+				logger.debug('Upserted ', len(entities), ' entities of type ', entities[0].getEntityType(), ' in chunks of ', chunkSize)
+			except:
+				error = 'Failed to add entities of type ' + str(entitiesbulk[0].getEntityType()) + ' to Probe database'
+				logger.errorException(error)
+				errobj = errorobject.createError(errorcodes.FAILED_ADDING_ENTITIES_TO_PROBE_DB, [str(entitiesbulk[0].getEntityType())], error)
+				logger.reportErrorObject(errobj)
+		finally:
+			for st in statements.values():
+				self.closeStatement(st)
+
+	def mergeEntities(self, entitiesbulk):
+		'''Multi-row upsert can not update the row inserted by the same statement,
+		so entities with the same key are merged keeping the order of the first one'''
+		keys = []
+		entitiesByKey = {}
+		for entity in entitiesbulk:
+			key = entity.getKey()
+			previous = entitiesByKey.get(key)
+			if previous is None:
+				keys.append(key)
+				entitiesByKey[key] = entity
+			else:
+				entitiesByKey[key] = entity.merge(previous)
+		return [entitiesByKey[key] for key in keys]
+
 	def executeUpdate(self, sql):
 		st = None
 		try:
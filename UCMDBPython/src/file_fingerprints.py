@@ -0,0 +1,192 @@
+#coding=utf-8
+'''
+Fingerprints of remote file contents.
+Fingerprints of many files are calculated on destination by single command and
+compared with fingerprints of contents reported earlier by the same job for
+the same document, so content of unchanged files is not transferred to the
+Probe again.
+'''
+import re
+
+import logger
+
+from java.lang import String
+from java.lang import System
+from java.util import Hashtable
+from java.util import UUID
+
+# 'host id|job id|container|document name|path' -> (fingerprint, report time in milliseconds),
+# kept for the probe lifetime
+REPORTED_FINGERPRINTS = Hashtable()
+
+DEFAULT_RESEND_INTERVAL_HOURS = 24
+
+_MARKER_PREFIX = 'DDM_FP_'
+
+
+def _createMarker():
+    r'@types: -> str'
+    return '%s%s:' % (_MARKER_PREFIX, str(UUID.randomUUID()).replace('-', '')[:12])
+
+
+def _unquote(path):
+    r'@types: str -> str'
+    return path.strip().strip('"')
+
+
+def _getContainerId(container):
+    r'''Identity of document container, OSH is identified by its content
+    @types: ObjectStateHolder or str or None -> str
+    '''
+    if container is None:
+        return ''
+    if isinstance(container, basestring):
+        return container
+    return str(UUID.nameUUIDFromBytes(String(container.toXmlString()).getBytes('UTF-8')))
+
+
+class FingerprintDiscoverer:
+    'Base class for discoverers of file content fingerprints'
+
+    # amount of files in one command, limits length of command line
+    PATHS_PER_COMMAND = 50
+
+    def __init__(self, shell):
+        r'@types: shellutils.Shell'
+        self._shell = shell
+
+    def getFingerprints(self, paths):
+        r'''Calculate fingerprints of files, files which failed to be read are missing in result
+        @types: list(str) -> dict(str, str)
+        '''
+        fingerprintByPath = {}
+        for index in range(0, len(paths), self.PATHS_PER_COMMAND):
+            try:
+                fingerprintByPath.update(self._getFingerprints(paths[index:index + self.PATHS_PER_COMMAND]))
+            except:
+                logger.debugException('Failed to get fingerprints of files')
+        return fingerprintByPath
+
+    def _getFingerprints(self, paths):
+        r'@types: list(str) -> dict(str, str)'
+        raise NotImplementedError()
+
+
+class UnixFingerprintDiscoverer(FingerprintDiscoverer):
+    r'''Uses POSIX cksum, CRC and size of file are taken as fingerprint
+    @command: cksum "<path>" "<path>" ...
+    '''
+    def _getFingerprints(self, paths):
+        output = self._shell.execCmd('cksum %s' % ' '.join(['"%s"' % path for path in paths]))
+        pathSet = dict(map(lambda path: (path, 1), paths))
+        fingerprintByPath = {}
+        # errors for missing files are skipped, they do not match the line format
+        for line in (output or '').splitlines():
+            tokens = line.strip().split(None, 2)
+            if len(tokens) == 3 and tokens[0].isdigit() and tokens[1].isdigit() and pathSet.has_key(tokens[2]):
+                fingerprintByPath[tokens[2]] = '%s/%s' % (tokens[0], tokens[1])
+        return fingerprintByPath
+
+
+class WindowsFingerprintDiscoverer(FingerprintDiscoverer):
+    r'''Uses certutil, MD5 hash of file is taken as fingerprint
+    @command: echo <marker><index> & certutil -hashfile "<path>" MD5 & ...
+    '''
+    COMMAND_SEPARATOR = ' & '
+
+    MD5_PATTERN = re.compile(r'^\s*((?:[0-9a-fA-F]{2} ?){16})\s*$', re.M)
+
+    def _getFingerprints(self, paths):
+        marker = _createMarker()
+        commands = []
+        for index in range(len(paths)):
+            commands.append('echo %s%d' % (marker, index))
+            commands.append('certutil -hashfile "%s" MD5' % paths[index])
+        output = self._shell.execCmd(self.COMMAND_SEPARATOR.join(commands))
+        fingerprintByPath = {}
+        for block in (output or '').split(marker)[1:]:
+            lines = block.split('\n', 1)
+            index = lines[0].strip()
+            matcher = len(lines) > 1 and self.MD5_PATTERN.search(lines[1])
+            if index.isdigit() and int(index) < len(paths) and matcher:
+                fingerprintByPath[paths[int(index)]] = matcher.group(1).replace(' ', '').lower()
+        return fingerprintByPath
+
+
+class PowerShellFingerprintDiscoverer(WindowsFingerprintDiscoverer):
+    'PowerShell separates commands with semicolon'
+    COMMAND_SEPARATOR = '; '
+
+
+def createFingerprintDiscoverer(shell):
+    r'@types: shellutils.Shell -> FingerprintDiscoverer'
+    if shell.isWinOs():
+        if shell.getClientType() == 'powershell':
+            return PowerShellFingerprintDiscoverer(shell)
+        return WindowsFingerprintDiscoverer(shell)
+    return UnixFingerprintDiscoverer(shell)
+
+
+class ContentFingerprints:
+    r'''Tells whether content of file on host is unchanged since it was reported last time.
+    Content is reported again after resendIntervalHours even if it is unchanged.
+    Reported fingerprints are kept per job, container and name of the document,
+    so the same file reported as another document gets its content.
+    '''
+    def __init__(self, shell, hostId, resendIntervalHours=DEFAULT_RESEND_INTERVAL_HOURS, jobId=None):
+        r'@types: shellutils.Shell, str, int, str'
+        if not hostId:
+            raise ValueError('hostId is empty')
+        self.__discoverer = createFingerprintDiscoverer(shell)
+        self.__hostId = hostId
+        self.__jobId = jobId or ''
+        self.__resendIntervalMillis = resendIntervalHours * 3600 * 1000
+        self.__currentByPath = {}
+        self.__pendingPaths = []
+
+    def __getKey(self, path, container, documentName):
+        return '%s|%s|%s|%s|%s' % (self.__hostId, self.__jobId, _getContainerId(container),
+                                   documentName or '', path)
+
+    def prefetch(self, paths):
+        r'''Calculate current fingerprints of files in bulk
+        @types: list(str) -> None
+        '''
+        paths = [_unquote(path) for path in paths if path and not self.__currentByPath.has_key(_unquote(path))]
+        if paths:
+            self.__currentByPath.update(self.__discoverer.getFingerprints(paths))
+
+    def isUnchanged(self, path, container=None, documentName=None):
+        r'@types: str, ObjectStateHolder, str -> bool'
+        path = _unquote(path)
+        if not self.__currentByPath.has_key(path):
+            self.prefetch([path])
+        fingerprint = self.__currentByPath.get(path)
+        reported = fingerprint and REPORTED_FINGERPRINTS.get(self.__getKey(path, container, documentName))
+        return (reported and reported[0] == fingerprint
+                and System.currentTimeMillis() - reported[1] < self.__resendIntervalMillis)
+
+    def markReported(self, path, container=None, documentName=None):
+        r'''Remember fingerprint of content, has to be called after content is sent
+        @types: str, ObjectStateHolder, str -> None
+        '''
+        path = _unquote(path)
+        fingerprint = self.__currentByPath.get(path)
+        if fingerprint:
+            REPORTED_FINGERPRINTS.put(self.__getKey(path, container, documentName),
+                                      (fingerprint, System.currentTimeMillis()))
+
+    def addPending(self, path, container=None, documentName=None):
+        r'''Content of file is added to results which are not sent yet
+        @types: str, ObjectStateHolder, str -> None
+        '''
+        # container identity is taken now, OSH may be changed before results are sent
+        self.__pendingPaths.append((path, _getContainerId(container), documentName))
+
+    def markPendingReported(self):
+        r'''Remember fingerprints of pending contents once results are sent
+        @types: -> None
+        '''
+        for path, containerId, documentName in self.__pendingPaths:
+            self.markReported(path, containerId, documentName)
+        self.__pendingPaths = []
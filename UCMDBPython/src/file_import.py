@@ -1,9 +1,16 @@
 #coding=utf-8
 from java.lang import String
+from java.io import BufferedReader
+from java.io import FileInputStream
+from java.io import InputStreamReader
+from java.io import StringReader
+from java.util import UUID
 from com.hp.ucmdb.discovery.library.common import CollectorsParameters
+from com.hp.ucmdb.discovery.library.clients import ClientsConsts
 
 from import_utils import DataSource
 
+import logger
 import shellutils
 
 class FileDataSource(DataSource):
@@ -61,3 +68,106 @@ class FileDataSource(DataSource):
     def parseFileContent(self, bytes):
         "Each file-based DataSource should parse file content. File content if of java.lang.String type"       
         raise NotImplementedError, "parseContent"
+
+
+def _quoteUnixPath(path):
+    "Wrap path with single quotes so shell does not expand or split it"
+    return "'%s'" % path.replace("'", "'\\''")
+
+
+class ShellFileLineReader:
+    """
+    Reads lines of file on Unix destination in chunks of 'chunkSize' lines,
+    so only one chunk is kept in memory.
+    Has readLine and close methods like java.io.BufferedReader
+    """
+    DEFAULT_CHUNK_SIZE = 5000
+
+    def __init__(self, shell, fileName, chunkSize = DEFAULT_CHUNK_SIZE):
+        self.shell = shell
+        self.fileName = shell.rebuildPath(fileName)
+        self.chunkSize = chunkSize
+        self.nextLineNumber = 1
+        self.lines = []
+        self.index = 0
+        self.isEndOfFile = 0
+        # marker tells trailing empty lines of the chunk from trimmed command output
+        self.marker = 'DDM_EOC_%s' % str(UUID.randomUUID()).replace('-', '')[:12]
+
+    def readLine(self):
+        "Return next line without line terminator or None at the end of file"
+        if self.index >= len(self.lines):
+            if self.isEndOfFile:
+                return None
+            self.lines = self.readChunk()
+            self.index = 0
+            if not self.lines:
+                return None
+        line = self.lines[self.index]
+        self.index += 1
+        return line
+
+    def readChunk(self):
+        firstLine = self.nextLineNumber
+        lastLine = firstLine + self.chunkSize - 1
+        cmd = "sed -n '%d,%dp;%dq' %s && echo %s" % (firstLine, lastLine, lastLine, _quoteUnixPath(self.fileName), self.marker)
+        output = self.shell.execCmd(cmd)
+        markerIndex = output.rfind(self.marker)
+        if markerIndex == -1:
+            logger.warn('Failed getting lines %d-%d of %s file' % (firstLine, lastLine, self.fileName))
+            raise Exception('Failed getting contents of file')
+        lines = output[:markerIndex].splitlines()
+        self.nextLineNumber = lastLine + 1
+        if len(lines) < self.chunkSize:
+            self.isEndOfFile = 1
+        return lines
+
+    def close(self):
+        self.lines = []
+        self.isEndOfFile = 1
+
+
+class StreamingFileDataSource(FileDataSource):
+    """
+    Base class for file based DataSources which parse file row by row while it is read,
+    so memory consumption does not depend on file size.
+    File on the Probe is read from disk, file on Unix destination is read in chunks of lines,
+    on other destinations whole file content is read at once.
+    Unlike FileDataSource the client is kept open until data source is closed.
+    """
+    def __init__(self, fileName, Framework, fileEncoding=None, chunkSize=ShellFileLineReader.DEFAULT_CHUNK_SIZE):
+        FileDataSource.__init__(self, fileName, Framework, fileEncoding)
+        self.chunkSize = chunkSize
+        self.client = None
+        self.lineReader = None
+
+    def open(self):
+        self.client = self.Framework.createClient()
+        self.lineReader = self.createLineReader(self.client)
+        self.openLineReader(self.lineReader)
+
+    def createLineReader(self, client):
+        "Return reader of file lines with readLine method"
+        if client.getClientType() == ClientsConsts.LOCAL_SHELL_PROTOCOL_NAME:
+            return BufferedReader(InputStreamReader(FileInputStream(self.fileName), self.encoding))
+        shell = shellutils.ShellUtils(client)
+        if shell.isWinOs():
+            return BufferedReader(StringReader(self.getFileContent(shell, self.fileName)))
+        return ShellFileLineReader(shell, self.fileName, self.chunkSize)
+
+    def close(self):
+        try:
+            if self.lineReader:
+                self.lineReader.close()
+                self.lineReader = None
+        finally:
+            if self.client:
+                self.client.close()
+                self.client = None
+
+    """
+    Abstract method which should be implemented by derived classes
+    """
+    def openLineReader(self, lineReader):
+        "Each streaming DataSource should prepare parsing of lines read by lineReader"
+        raise NotImplementedError, "openLineReader"
@@ -118,6 +118,19 @@ for $file (glob($d)){
     %(fileAttrs)s
 }' "%(path)s"'''
 
+    FIND_FILES_PERL_RECURSIVELY = r'''perl -e '
+use File::Basename;
+use File::Find;
+$d = shift;
+-d $d || print("Path not found\n") && exit 1;
+find({no_chdir => 1, wanted => sub {
+    $file = $File::Find::name;
+    -f $file || return;
+    print "%(fileDelimiter)s\n";
+    @Stat = stat $file;
+    %(fileAttrs)s
+}}, $d);' "%(path)s"'''
+
     ATTRS_MAPPING = {
           FileAttrs.NAME:    r'printf("%%s %s\n", basename($file));' % _FILE_ATTR_DELIMITER,
           FileAttrs.PERMS:   r'printf("%%04o %s\n" , ($Stat[2]) & 07777);' % _FILE_ATTR_DELIMITER,
@@ -134,9 +147,10 @@ for $file (glob($d)){
     def _getFileAttributeMap(self):
         return UnixFileInfoDiscovererByPerl.ATTRS_MAPPING
 
-    def buildQuery(self, path):
+    def buildQuery(self, path, isRecursive=0):
         '''Builds command line to execute depending on requested file attributes.
-        str -> str
+        If isRecursive is set, command lists regular files in the whole tree of path.
+        str, bool -> str
         '''
         attrsMapping = self._getFileAttributeMap()
         attrs = []
@@ -148,17 +162,19 @@ for $file (glob($d)){
         queryParameters['fileAttrs'] = '\n'.join(attrs)
         queryParameters['fileDelimiter'] = _FILE_DELIMITER
 
+        if isRecursive:
+            return UnixFileInfoDiscovererByPerl.FIND_FILES_PERL_RECURSIVELY % queryParameters
         return UnixFileInfoDiscovererByPerl.LIST_FILES_PERL_GLOB % queryParameters
 
-    def __list(self, path):
+    def __list(self, path, isRecursive=0):
         ''' Make listing of files at specified path
-        str -> list(File)
+        str, bool -> list(File)
         @raise PerlDiscoveryFsException: script execution failed
         @raise PerlDiscoveryFsException: output is not valid
         @raise PathNotFoundException: path is not valid
         '''
 
-        query = self.buildQuery(path)
+        query = self.buildQuery(path, isRecursive)
         output = self._shell.execCmd(query)
 
         if not self._shell.getLastCmdReturnCode():
@@ -244,6 +260,16 @@ for $file (glob($d)){
                                 self.__list(r'%s/.*' % path)))
         return fileList
 
+    def getFilesRecursively(self, path):
+        ''' Retrieves list of regular files in the whole tree of path
+        with single command
+        str - > list(File)
+        @raise PathNotFoundException: if path not valid
+        @raise PerlDiscoveryFsException: script execution failed
+                                        or retrieved output is invalid
+        '''
+        return self.__list(path, isRecursive=1)
+
     def exists(self, path):
         '''Checks whether path exists or not.
         str -> bool
@@ -428,14 +454,14 @@ class WindowsFileInfoDiscovererByBatch(FileInfoDiscoverer):
         if matcher:
             return matcher.group(1).strip()
 
-    def __list(self, path, listDirectoriesOnly=0):
-        '''Shell, str, str - > list(File)
+    def __list(self, path, listDirectoriesOnly=0, isRecursive=0):
+        '''Shell, str, str, bool - > list(File)
         Executes target script and parses retrieved csv output,
         converting it to File DO.
         @raise BatchDiscoveryFsException: on script execution failure
                                         or if retrieved csv is invalid
         '''
-        batchQuery = self.buildQuery(path,
+        batchQuery = self.buildQuery(path, isRecursive=isRecursive,
                                     listDirectoriesOnly=listDirectoriesOnly)
         output = self._shell.execCmd(batchQuery)
         if not self._shell.getLastCmdReturnCode():
@@ -480,6 +506,17 @@ class WindowsFileInfoDiscovererByBatch(FileInfoDiscoverer):
         result.extend(self.__list('*', listDirectoriesOnly=1))
         return result
 
+    def getFilesRecursively(self, path):
+        '''Shell, str - > list(File)
+        Retrieves list of files in the whole tree of path with single
+        'for /R' loop
+        @raise PathNotFoundException: if path not valid
+        @raise BatchDiscoveryFsException: on script execution failure or
+                                        if retrieved output is invalid
+        '''
+        self.cd(path)
+        return self.__list('*', isRecursive=1)
+
     def getFile(self, path):
         '''Shell, str - > File
         Retrieves file by path.
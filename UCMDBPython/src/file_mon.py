@@ -50,6 +50,7 @@ def DiscoveryMain(Framework):
                     filesList = fileMonitor.getFiles(None, folder, None, 0)
                     if filesList:
                         files.extend(filesList)
+            fileMonitor.prefetchContentFingerprints(files)
             # Report each file
             for file in files:
                 if not file.isDirectory:
@@ -59,6 +60,8 @@ def DiscoveryMain(Framework):
                     except Exception, reportFileExc:
                         logger.debugException(reportFileExc.getMessage())
                         logger.reportWarning("Failed to report ConfigurationDocument CI. Details: %s" % reportFileExc.getMessage())
+            if fileMonitor.contentFingerprints is not None:
+                fileMonitor.sendResults(OSHVResult)
         except Exception, ex:
             exInfo = ex.getMessage()
             errormessages.resolveAndReport(exInfo, protocol, Framework)
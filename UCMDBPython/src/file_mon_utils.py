@@ -31,9 +31,10 @@ from jregex import Pattern
 from jregex import REFlags
 from file_system import ExtensionsFilter, createFileSystem
 from file_info_discoverers import PathNotFoundException
-from file_topology import FileAttrs
+from file_topology import FileAttrs, FsException
 import file_topology
 import file_system
+import file_fingerprints
 
 ######## FileMonitor ###################################################################################
 class FileMonitor:
@@ -49,6 +50,17 @@ class FileMonitor:
         self.protocol = shellUtils.getClientType()
         self.recursive = Boolean.parseBoolean(self.Framework.getParameter('recursively'))
 
+        # content of files not changed since previous report is not transferred
+        self.contentFingerprints = None
+        if self.hostId and Boolean.parseBoolean(self.Framework.getParameter('skipUnchangedFileContent')):
+            resendIntervalHours = file_fingerprints.DEFAULT_RESEND_INTERVAL_HOURS
+            try:
+                resendIntervalHours = int(self.Framework.getParameter('fileContentResendIntervalHours'))
+            except:
+                pass
+            self.contentFingerprints = file_fingerprints.ContentFingerprints(shellUtils, self.hostId, resendIntervalHours,
+                                                                             self.Framework.getDiscoveryJobId())
+
         self.extensions = self.__parseExtensions(extensions)
         self.binaryExtensions = self.__parseExtensions(binaryExtensions)
 
@@ -260,20 +272,50 @@ class FileMonitor:
 
     def __reportFiles(self, parentOSH, files):
         res = None
+        self.prefetchContentFingerprints(files)
         for file in files :
             self.reportFile(parentOSH, file)
         return res
 
+    def prefetchContentFingerprints(self, files):
+        """
+        Calculate fingerprints of files to be reported with single command
+        list(File) -> None
+        """
+        if self.contentFingerprints is not None:
+            self.contentFingerprints.prefetch([file.path for file in files if file.path and not file.isDirectory])
+
     def reportFile(self, parentOSH, file):
         if not self.isInExtensions(file.ext, self.binaryExtensions):
-            f = self.__fileSystem.getFile(file.path, [FileAttrs.CONTENT, FileAttrs.VERSION])
-            file.content = f.content
-            file.version = f.version
+            if self.contentFingerprints is not None and self.contentFingerprints.isUnchanged(file.path, parentOSH, file.getName()):
+                # document is still reported to keep it from aging, stored content stays as is
+                logger.debug('Content of %s is not changed since previous report' % file.path)
+            else:
+                f = self.__fileSystem.getFile(file.path, [FileAttrs.CONTENT, FileAttrs.VERSION])
+                file.content = f.content
+                file.version = f.version
+                if self.contentFingerprints is not None:
+                    self.contentFingerprints.addPending(file.path, parentOSH, file.getName())
 
         documentOSH = modeling.createConfigurationDocumentOshByFile(file, parentOSH)
         self.addResult(documentOSH)
+        if self.recursive and self.contentFingerprints is not None:
+            # sent right away by addResult
+            self.contentFingerprints.markPendingReported()
         return documentOSH
 
+    def sendResults(self, OSHVResult):
+        """
+        Send results and remember fingerprints of file contents they carry,
+        so content is skipped next time only if it was delivered
+        ObjectStateHolderVector -> None
+        """
+        self.Framework.sendObjects(OSHVResult)
+        self.Framework.flushObjects()
+        OSHVResult.clear()
+        if self.contentFingerprints is not None:
+            self.contentFingerprints.markPendingReported()
+
     def _findUnixHiddenFilesRecursively(self, path):
         findCommand = 'find "%s" -type f -name ".*"' % path
 
@@ -313,6 +355,32 @@ class FileMonitor:
                 return map(string.strip, output.strip().split('\n'))
             return []
 
+    def _getFilesRecursivelyByPaths(self, path, requiredAttributes):
+        r'''Finds candidate paths by extensions and retrieves each file separately
+        @types: str, list(str) -> list(File)
+        '''
+        paths = []
+        # Looking for file candidates based on some pattern in name to make
+        # deeper discovery using file_system
+        for ext in self.extensions:
+            if len(ext) == 0:
+                #get files without extension
+                paths.extend(self._findFilesWithoutExtensionRecursively(path))
+            else:
+                paths.extend(self._findFilesRecursively(path, '.%s' % ext))
+
+        if not self.shellUtils.isWinOs() and self.discoverUnixHiddenFiles:
+            paths.extend(self._findUnixHiddenFilesRecursively(path))
+        files = []
+        for path in paths:
+            if self.shellUtils.isWinOs():
+                file = self.__fileSystem.getFile(path, fileAttrs = [file_topology.FileAttrs.NAME, file_topology.FileAttrs.IS_DIRECTORY])
+                if file.isDirectory:
+                    continue
+            file = self.__fileSystem.getFile(path, fileAttrs = requiredAttributes)
+            files.append(file)
+        return files
+
     def getFiles(self, parentOSH, path, fileName = None, reportFiles = 1):
         '''Obtains files by specified path. There are two scenario possible:
         1. Specified fileName is not empty or None - only target file if it is found returned.
@@ -354,29 +422,16 @@ class FileMonitor:
             if (not file or file.isDirectory):
                 extFilter = file_system.ExtensionsFilter(self.extensions)
                 if self.recursive:
-                    paths = []
-                    # Looking for file candidates based on some pattern in name to make
-                    # deeper discovery using file_system
-                    
-                    for ext in self.extensions:
-                        if len(ext) == 0:
-                            #get files without extension
-                            paths.extend(self._findFilesWithoutExtensionRecursively(path))
-                        else:
-                            paths.extend(self._findFilesRecursively(path, '.%s' % ext))
-
-                    
-#                    for extension in map(lambda ext: '.%s' % ext, self.extensions):
-#                        paths.extend(self._findFilesRecursively(path, extension))
-                    if not self.shellUtils.isWinOs() and self.discoverUnixHiddenFiles:
-                        paths.extend(self._findUnixHiddenFilesRecursively(path))
-                    for path in paths:
-                        if self.shellUtils.isWinOs():
-                            file = self.__fileSystem.getFile(path, fileAttrs = [file_topology.FileAttrs.NAME, file_topology.FileAttrs.IS_DIRECTORY])
-                            if file.isDirectory:
-                                continue
-                        file = self.__fileSystem.getFile(path, fileAttrs = requiredAttributes)
-                        files.append(file)
+                    # whole tree with attributes is listed by single command,
+                    # file by file discovery is used if listing fails
+                    try:
+                        files = self.__fileSystem.getFilesRecursively(path, fileAttrs = requiredAttributes)
+                    except PathNotFoundException, ex:
+                        raise ex
+                    except FsException:
+                        logger.debugException('Failed to list files recursively, files are discovered one by one')
+                        files = self._getFilesRecursivelyByPaths(path, requiredAttributes)
+                    files = filter(lambda f: not f.isDirectory, files)
 
                 else:
                     files = self.__fileSystem.getFiles(path, self.recursive, fileAttrs = requiredAttributes)
@@ -1080,8 +1135,16 @@ class FileMonitorEx:
 
     def createCF(self, container, path, fileContent = None, fileNameToBe = None):
         logger.debug('Creating configuration file ', path)
+        contentFingerprints = self.fileMonitor.contentFingerprints
         if fileContent is None:
+            documentName = fileNameToBe or self.getFileName(path)
+            if contentFingerprints is not None and contentFingerprints.isUnchanged(path, container, documentName):
+                # reported without content, stored content stays as is
+                logger.debug('Content of %s is not changed since previous report' % path)
+                return modeling.createConfigurationDocumentOSH(documentName, path, None, container, None, None, None, None, 'UTF-8')
             fileContent = self.fileMonitor.getFileContent(path)
+            if fileContent is not None and contentFingerprints is not None:
+                contentFingerprints.addPending(path, container, documentName)
         if fileContent is None:
             return None
         fileName = fileNameToBe
@@ -139,6 +139,16 @@ class FileSystem:
         '''
         raise NotImplemented
 
+    def getFilesRecursively(self, path, filters=[], fileAttrs=[]):
+        '''Returns all regular files in the whole tree of specified path accepted by filters.
+        Files with their attributes are listed by single command.
+
+        str, list(FileFilter), list(FileAttrs) -> list(File)
+        @raises PathNotFoundException if specified path is not valid
+        @raises FsException if error occurs while retrieving files
+        '''
+        raise NotImplemented
+
     def getFile(self, path, fileAttrs=[], includeAll=0):
         '''Returns file by specified path.
         Only specified file attributes are discovered.
@@ -243,6 +253,17 @@ class UnixFileSystem(FileSystem):
         files = perlFileDiscoverer.getFiles(path)
         return self.filter(files,  filters)
 
+    def getFilesRecursively(self, path, filters=[], fileAttrs=[]):
+        '''Retrieves list of regular files in the tree of specified path.
+        str, list(FileFilter), list(FileAttrs) -> list(File)
+        @raises PathNotFoundException if specified path is not valid
+        @raises FsException if error occurs while retrieving files
+        '''
+        perlFileDiscoverer = self.__discovererType(self._shell, fileAttrs)
+        path = self.__normalizePath(path)
+        files = perlFileDiscoverer.getFilesRecursively(path)
+        return self.filter(files,  filters)
+
     def getFile(self, path, fileAttrs=[], includeAll=0):
         '''Retrieves file by specified path
         str -> File
@@ -307,6 +328,19 @@ class WindowsFileSystem(FileSystem):
             return self.filter(files,  filters)
         raise PathNotFoundException(path)
 
+    def getFilesRecursively(self, path, filters=[], fileAttrs=[]):
+        '''Retrieves list of files in the tree of specified path.
+        str, list(FileFilter), list(FileAttrs) -> list(File)
+        @raises PathNotFoundException if specified path is not valid
+        @raises FsException if error occurs while retrieving files
+        '''
+        batchFileRetriever = WindowsFileInfoDiscovererByBatch(self._shell, fileAttrs)
+        path = self.__normalizePath(path)
+        if (batchFileRetriever.exists(path)):
+            files = batchFileRetriever.getFilesRecursively(path)
+            return self.filter(files,  filters)
+        raise PathNotFoundException(path)
+
     def getFile(self, path, fileAttrs=[], includeAll=0):
         '''Retrieves file by specified path
         str -> File
@@ -0,0 +1,112 @@
+# coding=utf-8
+'''
+HTTP requests over persistent connections and concurrent calls with limited parallelism.
+Connections are kept alive by JDK HttpURLConnection and reused by following requests
+to the same host, amount of idle connections kept per host is limited by
+http.maxConnections system property (5 by default).
+'''
+import urllib2
+from StringIO import StringIO
+
+import logger
+
+from java.io import ByteArrayOutputStream
+from java.lang import String
+from java.net import URL
+from java.util.concurrent import Callable, Executors, ExecutionException
+from javax.net.ssl import HttpsURLConnection, HostnameVerifier
+import jarray
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+
+_BUFFER_SIZE = 8192
+
+
+class _TrustAllHostnames(HostnameVerifier):
+    def verify(self, hostname, session):
+        return 1
+
+_TRUST_ALL_HOSTNAMES = _TrustAllHostnames()
+
+
+def _readFully(stream):
+    r'@types: java.io.InputStream -> str'
+    if stream is None:
+        return ''
+    content = ByteArrayOutputStream()
+    buffer = jarray.zeros(_BUFFER_SIZE, 'b')
+    try:
+        read = stream.read(buffer)
+        while read != -1:
+            content.write(buffer, 0, read)
+            read = stream.read(buffer)
+    finally:
+        # closed stream returns connection to keep-alive cache
+        stream.close()
+    return content.toByteArray().tostring()
+
+
+def request(method, url, data=None, headers=None, trustAllSocketFactory=None, followRedirects=True):
+    r'''Send request and read whole response body.
+    Response with error code raises urllib2.HTTPError as urllib2.urlopen does,
+    redirect is reported as error too when it is not followed.
+    @param trustAllSocketFactory: factory to use for HTTPS instead of default one,
+        host names are not verified when it is set. The same factory instance has to be
+        passed with every request, connections are reused per factory.
+    @types: str, str, str, dict, javax.net.ssl.SSLSocketFactory, bool -> str
+    '''
+    connection = URL(url).openConnection()
+    if trustAllSocketFactory and isinstance(connection, HttpsURLConnection):
+        connection.setSSLSocketFactory(trustAllSocketFactory)
+        connection.setHostnameVerifier(_TRUST_ALL_HOSTNAMES)
+    connection.setRequestMethod(method)
+    connection.setInstanceFollowRedirects(followRedirects)
+    for name, value in (headers or {}).items():
+        connection.setRequestProperty(str(name), str(value))
+    if data:
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        connection.setDoOutput(1)
+        output = connection.getOutputStream()
+        try:
+            output.write(String(data).getBytes('ISO-8859-1'))
+        finally:
+            output.close()
+    code = connection.getResponseCode()
+    if code >= 400 or (code >= 300 and not followRedirects):
+        body = _readFully(connection.getErrorStream())
+        raise urllib2.HTTPError(url, code, connection.getResponseMessage(), None, StringIO(body))
+    return _readFully(connection.getInputStream())
+
+
+class _Call(Callable):
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+
+    def call(self):
+        return self.fn(*self.args)
+
+
+def callConcurrently(fn, argsList, maxConcurrency=DEFAULT_MAX_CONCURRENT_REQUESTS):
+    r'''Call fn with each tuple of arguments, at most maxConcurrency calls run at once.
+    Failure of any call is raised after other calls are cancelled.
+    @types: callable, list(tuple), int -> list
+    @return: results in order of argsList
+    '''
+    if maxConcurrency <= 1 or len(argsList) <= 1:
+        return [fn(*args) for args in argsList]
+    threads = min(maxConcurrency, len(argsList))
+    logger.debug('Running %s calls in %s threads' % (len(argsList), threads))
+    executor = Executors.newFixedThreadPool(threads)
+    try:
+        futures = [executor.submit(_Call(fn, args)) for args in argsList]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.get())
+            except ExecutionException, ex:
+                raise ex.getCause() or ex
+        return results
+    finally:
+        executor.shutdownNow()
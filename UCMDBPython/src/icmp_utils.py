@@ -11,6 +11,164 @@ from appilog.common.system.types.vectors import ObjectStateHolderVector
 from com.hp.ucmdb.discovery.library.scope import DomainScopeManager
 from java.util.regex import Pattern
 from java.lang import String
+from bisect import bisect_right
+
+
+class IpIntervalSet:
+    '''Sorted set of disjoint inclusive IPv4 intervals, addresses are kept as longs'''
+    def __init__(self, intervals=None):
+        self.__starts = []
+        self.__ends = []
+        if intervals:
+            self.addAll(intervals)
+
+    def addAll(self, intervals):
+        '''Add intervals merging overlapping and adjacent ones
+        list((long, long)) -> None
+        '''
+        merged = []
+        for start, end in sorted(self.getIntervals() + list(intervals)):
+            if merged and start <= merged[-1][1] + 1:
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        self.__starts = [interval[0] for interval in merged]
+        self.__ends = [interval[1] for interval in merged]
+
+    def getSpanEnd(self, value):
+        '''Return the last address of interval containing value
+        long -> long or None
+        '''
+        index = bisect_right(self.__starts, value) - 1
+        if index >= 0 and value <= self.__ends[index]:
+            return self.__ends[index]
+        return None
+
+    def getIntervals(self):
+        return zip(self.__starts, self.__ends)
+
+    def __len__(self):
+        return len(self.__starts)
+
+    def __repr__(self):
+        return 'IpIntervalSet(%s)' % ', '.join(['%s-%s' % (longToIpv4(start), longToIpv4(end))
+                                                for start, end in self.getIntervals()])
+
+
+class ExcludePatterns(list):
+    '''Compiled exclude patterns.
+    The list itself holds regular expressions for all wildcards, wildcards which
+    are exact IPv4 addresses or end with single '*' are also compiled to intervals,
+    so only remaining expressions have to be matched against IPv4 addresses
+    '''
+    def __init__(self):
+        list.__init__(self)
+        self.intervals = IpIntervalSet()
+        self.ipv4Patterns = []
+
+    def isExcluded(self, ipStr):
+        value = ipv4ToLong(ipStr)
+        if value is None:
+            return _matchesAny(self, ipStr)
+        return self.intervals.getSpanEnd(value) is not None or _matchesAny(self.ipv4Patterns, ipStr)
+
+
+def ipv4ToLong(ipStr):
+    '''Convert IPv4 address in dotted decimal notation to long
+    str -> long or None if address is not IPv4
+    '''
+    parts = ipStr.split('.')
+    if len(parts) != 4:
+        return None
+    value = 0L
+    for part in parts:
+        if not _isOctet(part):
+            return None
+        value = (value << 8) | int(part)
+    return value
+
+
+def longToIpv4(value):
+    return '%d.%d.%d.%d' % ((value >> 24) & 0xFF, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+
+def _isOctet(part):
+    return part.isdigit() and str(int(part)) == part and int(part) <= 255
+
+
+def _getOctetRuns(prefix):
+    '''Return runs of octet values which decimal notation starts with prefix
+    str -> list((int, int))
+    '''
+    runs = []
+    for value in xrange(256):
+        if str(value).startswith(prefix):
+            if runs and runs[-1][1] == value - 1:
+                runs[-1] = (runs[-1][0], value)
+            else:
+                runs.append((value, value))
+    return runs
+
+
+def wildcardToIntervals(wildcard):
+    '''Convert exclude wildcard to IPv4 intervals matched by it.
+    Only exact addresses and wildcards with single trailing '*' are converted
+    str -> list((long, long)) or None if wildcard can't be converted
+    '''
+    while wildcard.find('**') != -1:
+        wildcard = wildcard.replace('**', '*')
+    starCount = wildcard.count('*')
+    if wildcard.find('?') != -1 or starCount > 1 or (starCount and not wildcard.endswith('*')):
+        return None
+    parts = wildcard.rstrip('*').split('.')
+    lastPart = None
+    if starCount:
+        lastPart = parts.pop()
+        if len(parts) > 3:
+            return []
+    elif len(parts) != 4:
+        return []
+    base = 0L
+    for part in parts:
+        if not _isOctet(part):
+            return []
+        base = (base << 8) | int(part)
+    if lastPart is None:
+        return [(base, base)]
+    shift = 8 * (3 - len(parts))
+    return [(((base << 8) | low) << shift, ((((base << 8) | high) << shift) | ((1L << shift) - 1)))
+            for low, high in _getOctetRuns(lastPart)]
+
+
+def _matchesAny(patterns, ipStr):
+    if patterns:
+        ipString = String(ipStr)
+        for pattern in patterns:
+            if pattern.matcher(ipString).matches():
+                return 1
+    return 0
+
+
+def getClientIntervals(probeName):
+    '''Compile IPv4 client ranges of the probe to interval set
+    str -> IpIntervalSet or None if probe ranges are not available
+    '''
+    if not probeName:
+        return None
+    try:
+        probeRanges = DomainScopeManager.getProbeRanges(probeName, None) or []
+    except:
+        logger.debugException('Failed to get ranges of probe %s' % probeName)
+        return None
+    intervals = []
+    for probeRange in probeRanges:
+        if probeRange and (probeRange.getType().equals(RangeType.CLIENT) or probeRange.getType().equals('Client')):
+            first = ipv4ToLong(probeRange.getFirstIp().toString())
+            last = ipv4ToLong(probeRange.getLastIp().toString())
+            if first is not None and last is not None:
+                intervals.append((first, last))
+    return IpIntervalSet(intervals)
 
 def getProbeRanges(selectedRangeList, probeName, Framework, includeIPv4=True, includeIPv6=False):
     # get probe ranges if selectedRangeList specified - only overlap ranges will be returned
@@ -53,22 +211,18 @@ def pingIPsInRange(Framework, client, probeRange, virtualMode, netAddress=None,
     logger.debug("=====>Start working on range ", probeRange.toRangeString())
     ipForICMPList = []
     filteredIpCount = 0
-    ip = probeRange.getFirstIp()
-    endIP = probeRange.getLastIp()
     totalLiveIps = 0
     bulkSize = int(Framework.getParameter('bulkSize'))
 
-    while ip.compareTo(endIP) <= 0:
-        ipStr = ip.toString()
-        if shouldPingIp(ipStr, excludePatterns, ignoreClientType):
-            ipForICMPList.append(ipStr)
-            if len(ipForICMPList) >= bulkSize:
-                totalLiveIps += executePing(ipForICMPList, client, Framework, virtualMode, netAddress, netMask)
+    for ipStr, skippedCount in _iterRangeIps(Framework, probeRange, excludePatterns, ignoreClientType):
+        if skippedCount:
+            filteredIpCount += skippedCount
+            continue
+        ipForICMPList.append(ipStr)
+        if len(ipForICMPList) >= bulkSize:
+            totalLiveIps += executePing(ipForICMPList, client, Framework, virtualMode, netAddress, netMask)
 
-                ipForICMPList = []
-        else:
-            filteredIpCount += 1
-        ip = ip.nextIP()
+            ipForICMPList = []
     totalLiveIps += executePing(ipForICMPList, client, Framework, virtualMode, netAddress, netMask)
     logger.debug("=====>Done working on range ", probeRange.toRangeString())
     if filteredIpCount > 0:
@@ -76,6 +230,59 @@ def pingIPsInRange(Framework, client, probeRange, virtualMode, netAddress=None,
     return totalLiveIps
 
 
+def _getSkipIntervals(Framework, excludePatterns, ignoreClientType):
+    '''Compile exclude wildcards and client ranges to interval set of IPv4 addresses to skip
+    Framework, list(Pattern), bool -> IpIntervalSet, list(Pattern){to match per IP}, bool{check client type per IP}
+    '''
+    skipIntervals = IpIntervalSet()
+    patterns = excludePatterns
+    if isinstance(excludePatterns, ExcludePatterns):
+        skipIntervals.addAll(excludePatterns.intervals.getIntervals())
+        patterns = excludePatterns.ipv4Patterns
+    checkClientType = ignoreClientType == 1
+    if checkClientType:
+        clientIntervals = getClientIntervals(Framework.getDestinationAttribute('probeName'))
+        if clientIntervals is not None:
+            skipIntervals.addAll(clientIntervals.getIntervals())
+            checkClientType = 0
+    return skipIntervals, patterns, checkClientType
+
+
+def _iterRangeIps(Framework, probeRange, excludePatterns, ignoreClientType):
+    '''Iterate over range addresses, excluded spans are skipped as a whole
+    Framework, Range, list(Pattern), bool -> iterable((str{ip}, 0) or (None, int{skipped IPs count}))
+    '''
+    ip = probeRange.getFirstIp()
+    endIP = probeRange.getLastIp()
+    value = ipv4ToLong(ip.toString())
+    lastValue = ipv4ToLong(endIP.toString())
+    if value is None or lastValue is None:
+        while ip.compareTo(endIP) <= 0:
+            ipStr = ip.toString()
+            if shouldPingIp(ipStr, excludePatterns, ignoreClientType):
+                yield ipStr, 0
+            else:
+                yield None, 1
+            ip = ip.nextIP()
+        return
+
+    skipIntervals, patterns, checkClientType = _getSkipIntervals(Framework, excludePatterns, ignoreClientType)
+    logger.debug("Compiled skip intervals: ", len(skipIntervals))
+    while value <= lastValue:
+        spanEnd = skipIntervals.getSpanEnd(value)
+        if spanEnd is not None:
+            spanEnd = min(spanEnd, lastValue)
+            yield None, spanEnd - value + 1
+            value = spanEnd + 1
+            continue
+        ipStr = longToIpv4(value)
+        if _matchesAny(patterns, ipStr) or (checkClientType and isClientTypeIP(ipStr)):
+            yield None, 1
+        else:
+            yield ipStr, 0
+        value += 1
+
+
 def executePing(ipForICMPList, client, Framework, virtualMode, netAddress=None, netMask=None):
     '''Execute ping and send topology information about live IPs
     list(str{ip}), Icmp Client, Framework, bool, str, str -> int{live ip count}
@@ -142,7 +349,11 @@ def setObjectVectorByResStringArray(objectVector, ipsResult, virtualMode, netAdd
 
 
 def preparePatterns(excludePatternsList):
-    result = []
+    '''Compile exclude wildcards separated by ';'
+    str -> ExcludePatterns
+    '''
+    result = ExcludePatterns()
+    intervals = []
     if excludePatternsList:
         patternList = excludePatternsList.split(";")
 
@@ -158,6 +369,7 @@ def preparePatterns(excludePatternsList):
                 patternStr = patternStr.strip()
                 wildcardValidationMatcher = wildcardValidationPattern.matcher(String(patternStr))
                 if wildcardValidationMatcher.matches():
+                    wildcardIntervals = wildcardToIntervals(patternStr)
 
                     for (rPattern, rStr) in wildcardSubstitutions:
                         rMatcher = rPattern.matcher(String(patternStr))
@@ -166,12 +378,17 @@ def preparePatterns(excludePatternsList):
                     try:
                         pattern = Pattern.compile(patternStr)
                         result.append(pattern)
+                        if wildcardIntervals is None:
+                            result.ipv4Patterns.append(pattern)
+                        else:
+                            intervals.extend(wildcardIntervals)
                     except:
                         logger.warn("Exception '%s' when compiling pattern '%s', pattern is ignored" % (sys.exc_info()[0], patternStr))
 
                 else:
                     logger.warn("Ignoring invalid wildcard pattern '%s'" % patternStr)
 
+        result.intervals.addAll(intervals)
     return result
 
 
@@ -180,10 +397,11 @@ def shouldPingIp(ipStr, excludePatterns, ignoreClientType):
     str{ip}, list(str) -> bool
     '''
     if excludePatterns:
-        for pattern in excludePatterns:
-            matcher = pattern.matcher(String(ipStr))
-            if matcher.matches():
+        if isinstance(excludePatterns, ExcludePatterns):
+            if excludePatterns.isExcluded(ipStr):
                 return 0
+        elif _matchesAny(excludePatterns, ipStr):
+            return 0
     if (ignoreClientType == 1 and isClientTypeIP(ipStr)):
         return 0
 
@@ -48,54 +48,133 @@ class DataSource:
         raise NotImplementedError, "getColumnValue"
 
 
+def _isEmptyValue(value):
+    if isinstance(value, basestring):
+        return not bool(value.strip())
+    return not bool(value)
+
+
+class _CompiledAttributeMapping:
+    """
+    Attribute mapping with converter and Java type factory resolved once per import
+    """
+    def __init__(self, attributeName, attributeType, column, converterDescriptor, converterMethod, converterError, javaTypeFactory):
+        self.attributeName = attributeName
+        self.attributeType = attributeType
+        self.column = column
+        self.converterDescriptor = converterDescriptor
+        self.converterMethod = converterMethod
+        # error of converter resolution is reported for each row as before
+        self.converterError = converterError
+        self.javaTypeFactory = javaTypeFactory
+        self.isRootContainer = attributeName == 'root_container'
+
+
 class RowMapper:
     """
     Class maps single row of data source into ObjectStateHolder,
     it creates the OSH and sets all column values as its attributes.
+    Mapping is compiled on first use: converters and type conversions are resolved once,
+    not for each cell.
     """
+    JAVA_TYPE_FACTORIES = {
+        AppilogTypes.LONG_DEF : Long,
+        AppilogTypes.INTEGER_DEF : Integer,
+        AppilogTypes.FLOAT_DEF : Float,
+        AppilogTypes.DOUBLE_DEF : Double,
+        AppilogTypes.BOOLEAN_DEF : Boolean
+    }
+
     def __init__(self, ciMapping, skipEmptyValues = 0):
         self.ciMapping = ciMapping
         self.skipEmptyValues = skipEmptyValues
+        self.compiledMappings = None
 
-    def createCi(self, dataSource):
-        def isEmptyValue(value):
-            if isinstance(value, basestring):
-                return not bool(value.strip())
-            return not bool(value)
-
-        osh = ObjectStateHolder(self.ciMapping.getCiTypeName())
-
+    def compile(self):
+        "Resolve attribute mappings of CI mapping into list of _CompiledAttributeMapping"
+        compiledMappings = []
         iterator = self.ciMapping.iterator()
         while iterator.hasNext():
             attributeMapping = iterator.next()
             attribute = attributeMapping.getCiAttribute()
-            column = attributeMapping.getColumnAttribute()
             converterDescriptor = attributeMapping.getConverter()
-            originalValue = self.doGetValue(dataSource, column)
+            converterMethod = None
+            converterError = None
+            if converterDescriptor is not None:
+                try:
+                    converterMethod = self.getConverterMethod(converterDescriptor)
+                except JavaException, ex:
+                    msg = ex.getMessage()
+                    info = logger.prepareJavaStackTrace()
+                    logger.debug(info)
+                    converterError = self.makeConversionMessage(converterDescriptor.getName(), msg)
+                except Exception, ex:
+                    msg = str(ex)
+                    info = logger.prepareJythonStackTrace('')
+                    logger.debug(info)
+                    converterError = self.makeConversionMessage(converterDescriptor.getName(), msg)
+            javaTypeFactory = RowMapper.JAVA_TYPE_FACTORIES.get(attribute.type)
+            compiledMappings.append(_CompiledAttributeMapping(attribute.name, attribute.type, attributeMapping.getColumnAttribute(),
+                                                              converterDescriptor, converterMethod, converterError, javaTypeFactory))
+        return compiledMappings
+
+    def createCi(self, dataSource):
+        if self.compiledMappings is None:
+            self.compiledMappings = self.compile()
+
+        osh = ObjectStateHolder(self.ciMapping.getCiTypeName())
+
+        for mapping in self.compiledMappings:
+            originalValue = self.doGetValue(dataSource, mapping.column)
 
             resultValue = None
             if originalValue is None:
                 resultValue = None
-            elif isEmptyValue(originalValue):
+            elif _isEmptyValue(originalValue):
                 if self.skipEmptyValues:
                     continue
                 else:
                     resultValue = None 
-            elif converterDescriptor is not None:
-                resultValue = self.doConversion(originalValue, converterDescriptor)
+            elif mapping.converterDescriptor is not None:
+                resultValue = self.doCompiledConversion(originalValue, mapping)
             else:
                 resultValue = originalValue
                 
-            if resultValue is not None:
-                resultValue = self.getJavaValue(resultValue, attribute.type)
-            if attribute.name == 'root_container':
+            if resultValue is not None and mapping.javaTypeFactory is not None:
+                resultValue = self.doCompiledJavaValue(resultValue, mapping)
+            if mapping.isRootContainer:
                 containerOsh = modeling.createOshByCmdbIdString('configuration_item', resultValue)
                 osh.setContainer(containerOsh)
             else:
-                osh.setAttribute(AttributeStateHolder(attribute.name, resultValue, attribute.type))
+                osh.setAttribute(AttributeStateHolder(mapping.attributeName, resultValue, mapping.attributeType))
             
         return osh
 
+    def doCompiledConversion(self, value, mapping):
+        if mapping.converterError is not None:
+            raise CiImportException, mapping.converterError
+        try:
+            return mapping.converterMethod(value)
+        except JavaException, ex:
+            msg = ex.getMessage()
+            info = logger.prepareJavaStackTrace()
+            logger.debug(info)
+            raise CiImportException, self.makeConversionMessage(mapping.converterDescriptor.getName(), msg)
+        except Exception, ex:
+            msg = str(ex)
+            info = logger.prepareJythonStackTrace('')
+            logger.debug(info)
+            raise CiImportException, self.makeConversionMessage(mapping.converterDescriptor.getName(), msg)
+
+    def doCompiledJavaValue(self, value, mapping):
+        try:
+            return mapping.javaTypeFactory(value)
+        except JavaException, ex:
+            msg = ex.getMessage()
+            info = logger.prepareJavaStackTrace()
+            logger.debug(info)
+            raise CiImportException, self.makeConversionMessage('Error while converting to type %s ' % mapping.attributeType, msg)
+
     def getConverterMethod(self, converter):
         methodName = converter.getName()
         moduleName = converter.getModule()
@@ -126,44 +205,6 @@ class RowMapper:
             logger.debug(info)
             raise CiImportException, self.makeGetValueError(column.getName(), msg)
 
-    def doConversion(self, value, converter):
-        try:
-            converterMethod = self.getConverterMethod(converter)
-            return converterMethod(value)
-        except JavaException, ex:
-            msg = ex.getMessage()
-            info = logger.prepareJavaStackTrace()
-            logger.debug(info)
-            raise CiImportException, self.makeConversionMessage(converter.getName(), msg)
-        except Exception, ex:
-            msg = str(ex)
-            info = logger.prepareJythonStackTrace('')
-            logger.debug(info)
-            raise CiImportException, self.makeConversionMessage(converter.getName(), msg)
-
-    def getJavaValue(self, value, type):
-        try:
-            if type == AppilogTypes.LONG_DEF:
-                return Long(value)
-
-            if type == AppilogTypes.INTEGER_DEF:
-                return Integer(value)
-
-            if type == AppilogTypes.FLOAT_DEF:
-                return Float(value)
-            
-            if type == AppilogTypes.DOUBLE_DEF:
-                return Double(value)
-            
-            if type == AppilogTypes.BOOLEAN_DEF:
-                return Boolean(value)
-            return value
-        except JavaException, ex:
-            msg = ex.getMessage()
-            info = logger.prepareJavaStackTrace()
-            logger.debug(info)
-            raise CiImportException, self.makeConversionMessage('Error while converting to type %s ' % type, msg)
-
 
 class CiImporter:
     """
@@ -26,11 +26,17 @@ from appilog.common.utils import RangeType
 from com.hp.ucmdb.discovery.library.scope import DomainScopeManager
 
 __version__ = '2.1.9'
+import re
 import struct
 import types
+import ip_ranges
 IPV4LENGTH = 32L
 IPV6LENGTH = 128L
 
+# parsed addresses by string, address objects are immutable so they are shared
+_INTERNED_ADDRESSES = {}
+MAX_INTERNED_ADDRESSES = 10000
+
 
 def enumerate(iterable):
     return [(i, iterable[i]) for i in xrange(len(iterable))]
@@ -70,6 +76,20 @@ def IPAddress(address, version=None):
         elif version == 6:
             return IPv6Address(address)
 
+    if isinstance(address, types.StringTypes):
+        parsed = _INTERNED_ADDRESSES.get(address)
+        if parsed is None:
+            parsed = _parse_address_string(address)
+            if len(_INTERNED_ADDRESSES) >= MAX_INTERNED_ADDRESSES:
+                _INTERNED_ADDRESSES.clear()
+            _INTERNED_ADDRESSES[address] = parsed
+        return parsed
+
+    return _parse_address(address)
+
+
+def _parse_address(address):
+    """Try IPv4 then IPv6 constructors, used for non-string addresses."""
     try:
         return IPv4Address(address)
     except (AddressValueError, NetmaskValueError):
@@ -84,6 +104,39 @@ def IPAddress(address, version=None):
                      address)
 
 
+def _ipv4_int_from_string(address):
+    """Integer value of dotted decimal IPv4 string or None if it is not one."""
+    octets = address.split('.')
+    if len(octets) != 4:
+        return None
+    try:
+        o0, o1, o2, o3 = int(octets[0]), int(octets[1]), int(octets[2]), int(octets[3])
+    except ValueError:
+        return None
+    if 0 <= o0 <= 255 and 0 <= o1 <= 255 and 0 <= o2 <= 255 and 0 <= o3 <= 255:
+        return (long(o0) << 24) | (o1 << 16) | (o2 << 8) | o3
+    return None
+
+
+def _parse_address_string(address):
+    """Dispatch by content of the string instead of trying every constructor."""
+    ip_int = _ipv4_int_from_string(address)
+    if ip_int is not None:
+        # validated already, skip constructor checks
+        parsed = object.__new__(IPv4Address)
+        parsed._ip = ip_int
+        return parsed
+
+    if ':' in address:
+        try:
+            return IPv6Address(address)
+        except (AddressValueError, NetmaskValueError):
+            pass
+
+    raise ValueError('%r does not appear to be an IPv4 or IPv6 address' %
+                     address)
+
+
 def IPNetwork(address, version=None, strict=None):
     """Take an IP string/int and return an object of the correct type.
 
@@ -413,10 +466,12 @@ def get_mixed_type_key(obj):
     return NotImplemented
 
 
-class _IPAddrBase:
+class _IPAddrBase(object):
 
     """The mother class."""
 
+    __slots__ = ()
+
     def __index__(self):
         return self._ip
 
@@ -453,6 +508,8 @@ class _BaseIP(_IPAddrBase):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, address):
         if (not (_compat_has_real_bytes and isinstance(address, bytes))
             and '/' in str(address)):
@@ -1038,7 +1095,7 @@ class _BaseNet(_IPAddrBase):
     Contains = __contains__
 
 
-class _BaseV4:
+class _BaseV4(object):
 
     """Base IPv4 object.
 
@@ -1047,12 +1104,15 @@ class _BaseV4:
 
     """
 
+    __slots__ = ()
+
     # Equivalent to 255.255.255.255 or 32 bits of 1's.
     _ALL_ONES = (2 ** IPV4LENGTH) - 1
+    _version = 4
+    _max_prefixlen = IPV4LENGTH
 
     def __init__(self, address):
-        self._version = 4
-        self._max_prefixlen = IPV4LENGTH
+        pass
 
     def _explode_shorthand_ip_string(self, ip_str=None):
         if not ip_str:
@@ -1244,6 +1304,8 @@ class IPv4Address(_BaseV4, _BaseIP):
 
     """Represent and manipulate single IPv4 Addresses."""
 
+    __slots__ = ('_ip',)
+
     def __init__(self, address):
 
         """
@@ -1464,7 +1526,7 @@ class IPv4Network(_BaseV4, _BaseNet):
     IsLinkLocal = lambda self: self.is_link_local
 
 
-class _BaseV6:
+class _BaseV6(object):
 
     """Base IPv6 object.
 
@@ -1473,11 +1535,14 @@ class _BaseV6:
 
     """
 
+    __slots__ = ()
+
     _ALL_ONES = (2 ** IPV6LENGTH) - 1
+    _version = 6
+    _max_prefixlen = IPV6LENGTH
 
     def __init__(self, address):
-        self._version = 6
-        self._max_prefixlen = IPV6LENGTH
+        pass
 
     def _ip_int_from_string(self, ip_str=None):
         """Turn an IPv6 ip_str into an integer.
@@ -1894,6 +1959,8 @@ class IPv6Address(_BaseV6, _BaseIP):
     """Represent and manipulate single IPv6 Addresses.
     """
 
+    __slots__ = ('_ip',)
+
     def __init__(self, address):
         """Instantiate a new IPv6 address object.
 
@@ -2150,12 +2217,29 @@ def isValidIpAddressNotZero(ipAddr, filter_client_ip=None):
             return False
     return True
 
+def compileRangeList(ipRangeList):
+    """
+    Builds index for repeated checks by isIpAddressInRangeList
+    @param ipRangeList: A list contains either IPAddress object or IPNetwork object
+    @rtype: ip_ranges.IpRangeIndex
+    """
+    index = ip_ranges.IpRangeIndex()
+    for item in ipRangeList or []:
+        if isinstance(item, _BaseIP):
+            index.add(item._ip, item._ip, item._version)
+        elif isinstance(item, _BaseNet):
+            index.add(long(item.network), long(item.broadcast), item._version)
+    return index
+
 def isIpAddressInRangeList(ipAddr, ipRangeList):
     """
     @param ipAddr: IP Address to check
-    @param ipRangeList: A list contains either IPAddress object or IPNetwork object
+    @param ipRangeList: A list contains either IPAddress object or IPNetwork object,
+                        or index built by compileRangeList
     @return: true if the IP exists in the ip range list
     """
+    if isinstance(ipRangeList, ip_ranges.IpRangeIndex):
+        return ipRangeList.contains(long(ipAddr._ip), ipAddr._version)
     flag = False
     if ipRangeList:
         for item in ipRangeList:
@@ -2179,3 +2263,52 @@ def isValidNetmaskNotZero(netmask):
     return IPv4Network("1.1.1.1")._is_valid_netmask(netmask) and netmask.strip()!='0.0.0.0'
 
 
+def _address_candidates(lines):
+    """Tokens looking like addresses in netstat/lsof output, with and without port."""
+    candidates = []
+    for line in lines:
+        for token in re.findall(r'[0-9A-Fa-f.:]*[.:][0-9A-Fa-f.:*]*', line):
+            candidates.append(token)
+            if token.count(':') == 1 or (token.count('.') == 4 and ':' not in token):
+                candidates.append(token[:max(token.rfind(':'), token.rfind('.'))])
+    return candidates
+
+
+def benchmark(lines, rounds=5):
+    """
+    Compares parsing of addresses found in netstat/lsof output by trying
+    every constructor with parsing by content, without and with intern cache
+    @return: (seconds by constructors, seconds by content, seconds with cache, amount of tokens)
+    """
+    import time
+    candidates = _address_candidates(lines)
+
+    def parse_all(parse):
+        started = time.time()
+        for _ in xrange(rounds):
+            for candidate in candidates:
+                try:
+                    parse(candidate)
+                except ValueError:
+                    pass
+        return time.time() - started
+
+    by_constructors = parse_all(_parse_address)
+    by_content = parse_all(_parse_address_string)
+    _INTERNED_ADDRESSES.clear()
+    with_cache = parse_all(IPAddress)
+    return by_constructors, by_content, with_cache, len(candidates)
+
+
+if __name__ == '__main__':
+    import sys
+    lines = []
+    for path in sys.argv[1:]:
+        f = open(path)
+        lines.extend(f.readlines())
+        f.close()
+    by_constructors, by_content, with_cache, count = benchmark(lines)
+    print 'tokens: %d, constructors: %.3fs, by content: %.3fs, with intern cache: %.3fs' % (
+        count, by_constructors, by_content, with_cache)
+
+
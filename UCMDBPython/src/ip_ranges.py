@@ -2,6 +2,99 @@
 #!/usr/bin/env python
 
 import re
+import bisect
+
+
+def ipv4_to_long(ip):
+    octets = ip.split('.')
+    if len(octets) != 4:
+        raise ValueError('invalid octet count in IPv4')
+
+    try:
+        o0, o1, o2, o3 = map(int, octets)
+    except ValueError:
+        raise ValueError('IPv4 octet is not a number')
+
+    if not (0 <= o0 <= 255 and 0 <= o1 <= 255 and 0 <= o2 <= 255 and 0 <= o3 <= 255):
+        raise ValueError('IPv4 octet not in 0..255 range')
+
+    return (long(o0) << 24) | (o1 << 16) | (o2 << 8) | o3
+
+
+class IpRangeIndex:
+    '''
+    IP addresses as merged integer intervals per IP version,
+    membership is tested by binary search over interval starts
+    '''
+    def __init__(self):
+        self._intervals = {}
+        self._starts = {}
+        self._ends = {}
+
+    def add(self, first, last, version=4):
+        self._intervals.setdefault(version, []).append((long(first), long(last)))
+        self._starts.pop(version, None)
+
+    def _compile(self, version):
+        starts, ends = [], []
+        for first, last in sorted(self._intervals.get(version, [])):
+            if ends and first <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], last)
+            else:
+                starts.append(first)
+                ends.append(last)
+        self._starts[version] = starts
+        self._ends[version] = ends
+        return starts
+
+    def contains(self, ip, version=4):
+        starts = self._starts.get(version)
+        if starts is None:
+            starts = self._compile(version)
+        index = bisect.bisect_right(starts, ip) - 1
+        return index >= 0 and ip <= self._ends[version][index]
+
+    def __len__(self):
+        return reduce(lambda count, intervals: count + len(intervals), self._intervals.values(), 0)
+
+
+def _octet_runs(values):
+    runs = []
+    for value in values:
+        if runs and runs[-1][1] + 1 == value:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
+
+
+def _octet_set_intervals(octet_sets):
+    octet_sets = [dict.fromkeys([value for value in values if 0 <= value <= 255]).keys()
+                  for values in octet_sets]
+    for values in octet_sets:
+        values.sort()
+
+    # trailing octets matching any value form contiguous block with preceding octet
+    significant = 4
+    while significant and len(octet_sets[significant - 1]) == 256:
+        significant -= 1
+    if not significant:
+        return [(0L, 0xFFFFFFFFL)]
+
+    block_bits = 8 * (4 - significant)
+    block_mask = (1L << block_bits) - 1
+    prefixes = [0L]
+    for values in octet_sets[:significant - 1]:
+        prefixes = [(prefix << 8) | value for prefix in prefixes for value in values]
+
+    intervals = []
+    runs = _octet_runs(octet_sets[significant - 1])
+    for prefix in prefixes:
+        for first, last in runs:
+            intervals.append((((prefix << 8) | first) << block_bits,
+                              (((prefix << 8) | last) << block_bits) | block_mask))
+    return intervals
+
 
 class IpRangeTester:
     NETMASKS = {
@@ -42,6 +135,25 @@ class IpRangeTester:
 
     def __init__(self, ipranges):
         self.ipranges = self._split_ipranges(ipranges)
+        self.index = self._build_index(self.ipranges)
+
+    def _build_index(self, ipranges):
+        index = IpRangeIndex()
+        for iprange_l, subnet, isspan in ipranges:
+            if subnet is not None:
+                ip_long = long((iprange_l[0][0] << 24) | (iprange_l[1][0] << 16) | (iprange_l[2][0] << 8) | iprange_l[3][0])
+                subnet_long = long((2L ** 32) - (2L ** (32 - subnet)))
+                index.add(ip_long & subnet_long, (ip_long & subnet_long) | (0xFFFFFFFFL ^ subnet_long))
+            elif isspan:
+                ip_from = ip_to = 0L
+                for f_oct, t_oct, s_oct, r_oct in iprange_l:
+                    ip_from = (ip_from << 8) | f_oct
+                    ip_to = (ip_to << 8) | t_oct
+                index.add(ip_from, ip_to)
+            else:
+                for first, last in _octet_set_intervals(iprange_l):
+                    index.add(first, last)
+        return index
 
     def _split_ip(self, ip):
         octets = ip.split('.')
@@ -217,8 +329,7 @@ class IpRangeTester:
             if subnet is None:
                 raise ValueError('invalid network')
 
-        else:
-            return subnet
+        return subnet
 
     def _split_iprange_ip(self, iprange_ip):
         octets = iprange_ip.split('.')
@@ -310,22 +421,50 @@ class IpRangeTester:
         return 1
 
     def test(self, ip):
+        return self.index.contains(ipv4_to_long(ip))
+
+    def test_linear(self, ip):
+        '''Tries every range in turn, kept as reference for benchmark'''
         for iprange in self.ipranges:
             if self._test_iprange(ip, iprange):
                 return 1
 
         return 0
 
-if __name__ == '__main__':
+
+def benchmark(ipranges, ips, rounds=10):
+    '''Compares linear range tests with index lookup
+    -> (seconds for linear tests, seconds for index lookups, count of different results)'''
     import time
 
-    tester = IpRangeTester('192.168.*.*')
-    res = 0.0
-    for x in xrange(100000):
-        time1 = time.clock()
-        tester.test('192.166.0.0')
-        time2 = time.clock()
-        res += time2 - time1
+    tester = IpRangeTester(ipranges)
+    mismatches = len([ip for ip in ips if bool(tester.test(ip)) != bool(tester.test_linear(ip))])
+
+    started = time.time()
+    for x in xrange(rounds):
+        for ip in ips:
+            tester.test_linear(ip)
+    linear = time.time() - started
+
+    started = time.time()
+    for x in xrange(rounds):
+        for ip in ips:
+            tester.test(ip)
+    indexed = time.time() - started
+
+    return linear, indexed, mismatches
+
+if __name__ == '__main__':
+    import random
+    import sys
+
+    ipranges = len(sys.argv) > 1 and sys.argv[1] or \
+        '192.168.*.*,10.0.0.0/8,172.16.[0-31].*,192.0.2.1-192.0.2.200,{1,3,5-7}.*.*.*,' \
+        '16.59.{10-20,40}.,15.12.0.0/255.255.0.0,' + \
+        ','.join(['%d.%d.%d.0/24' % (random.randint(1, 254), random.randint(0, 255), random.randint(0, 255)) for x in xrange(200)])
+    ips = ['%d.%d.%d.%d' % (random.randint(0, 255), random.choice((0, 2, 16, 59, 168)), random.randint(0, 255), random.randint(0, 255)) for x in xrange(2000)]
+    linear, indexed, mismatches = benchmark(ipranges, ips, 3)
+    print 'linear: %.3fs, indexed: %.3fs, speedup: %.1fx, mismatches: %d' % (linear, indexed, linear / (indexed or 1e-9), mismatches)
 
 
 #r'''
@@ -4,6 +4,7 @@ Module wraps basic JMX API implemented in Java.
 
 Module provides more sophisticated API based on QueryDefinition and Provider
 Provider has options of querying MBean properties using specific QueryDefinition
+or many of them at once with Provider.executeAll
 
 QueryDefinition takes care of proper query building and used by query methods.
 @author: vvitvitskiy
@@ -11,6 +12,9 @@ QueryDefinition takes care of proper query building and used by query methods.
 
 
 from java.lang import Exception as JException
+from java.util.concurrent import Callable
+from java.util.concurrent import Executors
+from java.util.concurrent import LinkedBlockingQueue
 from com.hp.ucmdb.discovery.library.clients.agents import JMXAgent
 from javax.management import ObjectName
 import logger
@@ -162,8 +166,33 @@ class QueryNested(QueryDefinition):
                                                 self.nestedName)
 
 
+class _QueryTask(Callable):
+    '''Executes query using agent borrowed from the pool'''
+    def __init__(self, executeFn, agents, query):
+        '@types: (JmxAgent, QueryDefinition -> list), LinkedBlockingQueue, QueryDefinition'
+        self.executeFn = executeFn
+        self.agents = agents
+        self.query = query
+
+    def call(self):
+        agent = self.agents.take()
+        try:
+            try:
+                return self.executeFn(agent, self.query)
+            except (Exception, JException):
+                logger.warnException('Failed to execute %s' % self.query)
+        finally:
+            self.agents.put(agent)
+
+
 class Provider:
     '''Provides more sophisticated way to query JMX based on Java API'''
+    # minimal amount of QueryByName queries of the same MBean type
+    # to fetch them with one pattern query
+    MIN_NAMES_TO_BATCH = 5
+    # keys of ObjectName that define MBean type on different platforms
+    TYPE_KEYS = ('Type', 'type', 'j2eeType')
+
     class _ResultItem:
         '''Query result item that is filled with queried attributes
         accessed as instance attributes'''
@@ -173,8 +202,16 @@ class Provider:
     def __init__(self, agent):
         '@types: JmxAgent'
         self.__agent = agent
+        self.__additionalAgents = []
         self.__propertiesParser = PropertiesParser()
 
+    def addAgents(self, *agents):
+        '''Add connections to the same server to execute queries in parallel.
+        Provider does not own them, caller has to close them after discovery.
+        @types: list(JmxAgent) -> Provider'''
+        self.__additionalAgents.extend(filter(None, agents))
+        return self
+
     def __toListOfResultItems(self, listOfProperties, queryBuilder):
         '@types: list(map(str, str)), jmx.QueryDefinition -> list(Provider._ResultItem)'
         items = []
@@ -245,11 +282,109 @@ class Provider:
         @raise jmx.ClientConnection:
         @raise jmx.AccessDeniedException:
         '''
+        return self.__execute(self.__agent, query)
+
+    def executeAll(self, queries, parallelism=None):
+        '''Execute many queries at once.
+        QueryByName queries for MBeans of the same type are fetched by one
+        pattern query, the rest are executed in parallel, one query per
+        connection at a time (see addAgents).
+        @types: list(QueryDefinition), int -> dict(QueryDefinition, list(Provider._ResultItem))
+        @param parallelism: max amount of queries in progress, all connections are used by default
+        @return: result items by query, queries failed to execute are missing
+        '''
+        itemsByQuery = {}
+        queries = self.__executeBatchedByName(queries, itemsByQuery)
+        agents = [self.__agent] + self.__additionalAgents
+        threadsCount = min(parallelism or len(agents), len(agents), len(queries))
+        if threadsCount <= 1:
+            for query in queries:
+                try:
+                    itemsByQuery[query] = self.execute(query)
+                except (Exception, JException):
+                    logger.warnException('Failed to execute %s' % query)
+            return itemsByQuery
+
+        pool = LinkedBlockingQueue()
+        for agent in agents[:threadsCount]:
+            pool.put(agent)
+        executor = Executors.newFixedThreadPool(threadsCount)
+        try:
+            futures = [(query, executor.submit(_QueryTask(self.__execute, pool, query)))
+                       for query in queries]
+            for query, future in futures:
+                items = future.get()
+                if items is not None:
+                    itemsByQuery[query] = items
+        finally:
+            executor.shutdownNow()
+        return itemsByQuery
+
+    def __getTypePattern(self, name):
+        '''Pattern matching all MBeans of the same type as MBean with specified name
+        @types: str -> str or None'''
+        try:
+            objectName = restoreObjectName(name)
+        except JException:
+            return None
+        if objectName.isPattern():
+            return None
+        for key in self.TYPE_KEYS:
+            value = objectName.getKeyProperty(key)
+            if value:
+                return '%s:%s=%s,*' % (objectName.getDomain(), key, value)
+
+    def __executeBatchedByName(self, queries, itemsByQuery):
+        '''Execute QueryByName queries grouped by MBean type using one pattern
+        query per group, results are put to itemsByQuery
+        @types: list(QueryDefinition), dict -> list(QueryDefinition)
+        @return: queries that still have to be executed
+        '''
+        restQueries = []
+        queriesByPattern = {}
+        for query in queries:
+            pattern = (isinstance(query, QueryByName)
+                       and self.__getTypePattern(query.getQueryPart()))
+            if pattern:
+                queriesByPattern.setdefault(pattern, []).append(query)
+            else:
+                restQueries.append(query)
+
+        for pattern, patternQueries in queriesByPattern.items():
+            if len(patternQueries) < self.MIN_NAMES_TO_BATCH:
+                restQueries.extend(patternQueries)
+                continue
+            attributes = []
+            for query in patternQueries:
+                for attributeName in query.getNamesOfAttributes():
+                    if attributeName not in attributes:
+                        attributes.append(attributeName)
+            try:
+                listOfProperties = self.__agent.getMbeansByNamePattern(pattern, attributes)
+            except JException:
+                logger.debugException('Failed to query %s, names are queried one by one' % pattern)
+                restQueries.extend(patternQueries)
+                continue
+            propertiesByName = {}
+            for properties in map(self.__propertiesParser.parse, listOfProperties):
+                name = properties.get('ObjectName')
+                if name:
+                    propertiesByName[restoreObjectName(name).getCanonicalName()] = properties
+            for query in patternQueries:
+                properties = propertiesByName.get(restoreObjectName(query.getQueryPart()).getCanonicalName())
+                if properties:
+                    itemsByQuery[query] = self.__toListOfResultItems([properties], query)
+                else:
+                    restQueries.append(query)
+        return restQueries
+
+    def __execute(self, agent, query):
+        '@types: JmxAgent, QueryDefinition -> list(Provider._ResultItem)'
         # query handlers
         if isinstance(query, QueryByType):
             resultItemType = query.getQueryPart()
             attributes = query.getNamesOfAttributes()
-            method = (lambda agent=self.__agent, resultItemType=resultItemType,
+            method = (lambda agent=agent, resultItemType=resultItemType,
                       attributes=attributes:
                         agent.getMbeansByType(resultItemType, attributes))
             # filter sub-types
@@ -265,7 +400,7 @@ class Provider:
         elif isinstance(query, QueryByName):
             name = query.getQueryPart()
             attributes = query.getNamesOfAttributes()
-            method = (lambda agent=self.__agent, name=name,
+            method = (lambda agent=agent, name=name,
                       attributes=attributes:
                         agent.getMbeanByName(name, attributes))
             result = self.__executeMethodWithPropsAsResult(method, query)
@@ -273,13 +408,13 @@ class Provider:
         elif isinstance(query, QueryByPattern):
             pattern = query.getQueryPart()
             attributes = query.getNamesOfAttributes()
-            method = (lambda agent=self.__agent, pattern=pattern,
+            method = (lambda agent=agent, pattern=pattern,
                       attributes=attributes:
                         agent.getMbeansByNamePattern(pattern, attributes))
             result = self.__executeMethodWithListAsResult(method, query)
 
         elif isinstance(query, QueryNested):
-            method = (lambda agent=self.__agent,
+            method = (lambda agent=agent,
                       baseObjName=query.baseObjectName,
                       nestedName=query.nestedName,
                       attributes=query.getNamesOfAttributes():
@@ -21,6 +21,10 @@ from com.hp.ucmdb.discovery.library.communication.downloader.cfgfiles import (
 from com.hp.ucmdb.discovery.library.clients import ClientsConsts
 from com.ziclix.python.sql import PyConnection
 from java.lang import Class, Thread
+from java.lang import System
+from java.nio.channels import Selector
+from java.nio.channels import SelectionKey
+from java.nio.channels import SocketChannel
 from java.net import UnknownHostException
 from com.hp.ucmdb.discovery.library.communication.downloader import ConfigFilesManagerImpl
 from com.hp.ucmdb.discovery.library.common import CollectorsParameters
@@ -545,6 +549,113 @@ def checkTcpConnectivity(ipAddress, portNumber, timeout):
         return 0
 
 
+DEFAULT_MAX_CONCURRENT_CONNECTIONS = 100
+
+
+def checkTcpConnectivityBulk(ipAddress, portNumbers, timeout,
+                             maxConcurrentConnections=DEFAULT_MAX_CONCURRENT_CONNECTIONS,
+                             maxConnectsPerSecond=0):
+    """
+    Checks TCP connections to the given ipAddress on all the given ports
+    concurrently using non-blocking sockets, so each closed or filtered port
+    does not cost the full timeout sequentially.
+    @param ipAddress: IP address of the remote computer to check
+    @type ipAddress: String
+    @param portNumbers: port numbers to check
+    @type portNumbers: list(int)
+    @param timeout: connection timeout in millisecondes for each port
+    @type timeout: int
+    @param maxConcurrentConnections: maximal number of connections in progress
+    @type maxConcurrentConnections: int
+    @param maxConnectsPerSecond: maximal number of connections started per second, 0 - unlimited
+    @type maxConnectsPerSecond: int
+    @return: set of ports the TCP connection succeeded to
+    @rtype: set(int)
+    """
+    # list keeps ports in the given order, set is used to skip duplicates
+    pending = []
+    seen = set()
+    for portNumber in portNumbers:
+        if portNumber not in seen:
+            seen.add(portNumber)
+            pending.append(portNumber)
+    pending.reverse()
+    maxConcurrentConnections = max(1, maxConcurrentConnections)
+    connectInterval = 0
+    if maxConnectsPerSecond > 0:
+        connectInterval = 1000.0 / maxConnectsPerSecond
+    nextConnectTime = 0
+    connected = set()
+    # port -> (channel, connection deadline)
+    inProgress = {}
+
+    def closeChannel(portNumber):
+        channel = inProgress.pop(portNumber)[0]
+        try:
+            channel.close()
+        except:
+            logger.debug('Failed to close socket')
+
+    selector = Selector.open()
+    try:
+        while pending or inProgress:
+            now = System.currentTimeMillis()
+            while (pending and len(inProgress) < maxConcurrentConnections
+                   and now >= nextConnectTime):
+                portNumber = pending.pop()
+                nextConnectTime = now + connectInterval
+                channel = SocketChannel.open()
+                try:
+                    channel.configureBlocking(0)
+                    inProgress[portNumber] = (channel, now + timeout)
+                    if channel.connect(InetSocketAddress(ipAddress, portNumber)):
+                        logger.debug('Connected to port:', portNumber, ' on host by ip:', ipAddress)
+                        connected.add(portNumber)
+                        closeChannel(portNumber)
+                    else:
+                        channel.register(selector, SelectionKey.OP_CONNECT, portNumber)
+                except IOException, e:
+                    logger.debug('Failed to connect to port:', portNumber,
+                                 ' on host by ip:', ipAddress,
+                                 ' IOException(', e.getMessage(), ')')
+                    closeChannel(portNumber)
+
+            waitTime = 0
+            if inProgress:
+                waitTime = min([deadline for _, deadline in inProgress.values()]) - now
+            if pending and len(inProgress) < maxConcurrentConnections:
+                waitTime = min(waitTime or nextConnectTime - now, nextConnectTime - now)
+            selector.select(max(1, long(waitTime)))
+
+            keys = selector.selectedKeys().iterator()
+            while keys.hasNext():
+                key = keys.next()
+                keys.remove()
+                portNumber = key.attachment()
+                try:
+                    if key.channel().finishConnect():
+                        logger.debug('Connected to port:', portNumber, ' on host by ip:', ipAddress)
+                        connected.add(portNumber)
+                except IOException, e:
+                    logger.debug('Failed to connect to port:', portNumber,
+                                 ' on host by ip:', ipAddress,
+                                 ' IOException(', e.getMessage(), ')')
+                key.cancel()
+                closeChannel(portNumber)
+
+            now = System.currentTimeMillis()
+            for portNumber, (_, deadline) in inProgress.items():
+                if deadline <= now:
+                    logger.debug('Failed to connect to port:', portNumber,
+                                 ' on host by ip:', ipAddress, ' timeout')
+                    closeChannel(portNumber)
+    finally:
+        for portNumber in inProgress.keys():
+            closeChannel(portNumber)
+        selector.close()
+    return connected
+
+
 def pingIp(Framework, ipAddress, timeout):
     """
     Ping the specified device
@@ -115,6 +115,9 @@ class Configuration:
         self.pageSizeLayer2 = None
         self.pageSizeVlans = None
         self.pageSizeNodes = None
+
+        self.prefetchPages = None
+        self.maxRequestsPerService = None
         
         self.discoveryMode = None
         
@@ -139,6 +142,9 @@ class ConfigurationReader:
     PARAMETER_PAGE_SIZE_VLANS = 'pageSizeVlans'
     PARAMETER_PAGE_SIZE_NODES = 'pageSizeNodes'
 
+    PARAMETER_PREFETCH_PAGES = 'prefetchPages'
+    PARAMETER_MAX_REQUESTS_PER_SERVICE = 'maxRequestsPerService'
+
     PARAMETER_DISCOVERY_MODE = 'discoveryMode'
     
     PARAMETER_REQUEST_CUSTOM_ATTRS = 'requestCustomAttributes'
@@ -165,6 +171,9 @@ class ConfigurationReader:
         configuration.pageSizeLayer2 = self._readIntParameter(ConfigurationReader.PARAMETER_PAGE_SIZE_LAYER_2, self.defaultPageSize)
         configuration.pageSizeVlans = self._readIntParameter(ConfigurationReader.PARAMETER_PAGE_SIZE_VLANS, self.defaultPageSize)
         configuration.pageSizeNodes = self._readIntParameter(ConfigurationReader.PARAMETER_PAGE_SIZE_NODES, self.defaultPageSize)
+
+        configuration.prefetchPages = self._readIntParameter(ConfigurationReader.PARAMETER_PREFETCH_PAGES, nnmi_api.DEFAULT_PREFETCH_PAGES)
+        configuration.maxRequestsPerService = self._readIntParameter(ConfigurationReader.PARAMETER_MAX_REQUESTS_PER_SERVICE, nnmi_api.DEFAULT_MAX_REQUESTS_PER_SERVICE)
         
         configuration.discoveryMode = self._readDiscoveryModeParameter(DiscoveryMode.RELATED_TOPOLOGY_READ)
         
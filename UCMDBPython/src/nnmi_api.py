@@ -8,12 +8,15 @@ import time
 import os
 import ip_addr
 import itertools
+import threading
 
 import nnmi_filters
 
 import java.net
 from java.lang import System, String
 
+from java.util.concurrent import Callable, Executors, Semaphore, ExecutionException
+
 from com.hp.ucmdb.discovery.library.clients.recorder import ExecutionRecorderManager
 
 import com.hp.ov.nms.sdk
@@ -45,6 +48,12 @@ DEFAULT_PAGESIZE_CARD      = _DEFAULT_RELATED_TOPOLOGY_PAGESIZE
 
 NO_PAGE_SIZE = -1
 
+# Number of page requests kept in flight while iterating over fetcher pages,
+# 1 means pages are fetched sequentially
+DEFAULT_PREFETCH_PAGES = 1
+# Max number of concurrent requests to a single NNMi web service
+DEFAULT_MAX_REQUESTS_PER_SERVICE = 4
+
 
 FETCH_DELAY = 0
 
@@ -73,6 +82,34 @@ _STORE_CONFIG = None#StoreConfig(True, True, True)
 _STORE_NAMESPACE = 'default'
 
 
+_THREAD_STUBS = threading.local()
+
+_SERVICE_SEMAPHORES = {}
+_SERVICE_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _get_thread_stubs():
+    ''' -> dict of JAX-WS ports created by the current thread '''
+    stubs = getattr(_THREAD_STUBS, 'stubs', None)
+    if stubs is None:
+        stubs = {}
+        _THREAD_STUBS.stubs = stubs
+    return stubs
+
+
+def _get_service_semaphore(service_key, permits):
+    ''' str, int -> java.util.concurrent.Semaphore limiting concurrent requests to the service '''
+    _SERVICE_SEMAPHORES_LOCK.acquire()
+    try:
+        semaphore = _SERVICE_SEMAPHORES.get(service_key)
+        if semaphore is None:
+            semaphore = Semaphore(max(1, permits), True)
+            _SERVICE_SEMAPHORES[service_key] = semaphore
+        return semaphore
+    finally:
+        _SERVICE_SEMAPHORES_LOCK.release()
+
+
 def not_empty(x):
     return not((x is None) or (x == ''))
 
@@ -1065,7 +1102,12 @@ class ResultStorage:
         filePath, fullFileName = self.get_store_file_name(storage_key)
         
         if not os.path.exists(filePath):
-            os.makedirs(filePath)
+            try:
+                os.makedirs(filePath)
+            except OSError:
+                # folder may be created by concurrent page request
+                if not os.path.isdir(filePath):
+                    raise
         
         logger.debug(" -- Saving items to file '%s'" % fullFileName)
         
@@ -1084,6 +1126,68 @@ class ResultStorage:
 
 
 
+class _FetchPageTask(Callable):
+    def __init__(self, fetcher, page_index, page_size, subfilter):
+        self.fetcher = fetcher
+        self.page_index = page_index
+        self.page_size = page_size
+        self.subfilter = subfilter
+
+    def call(self):
+        return self.fetcher.fetch(page_index=self.page_index,
+                                  page_size=self.page_size,
+                                  subfilter=self.subfilter)
+
+
+class PagePrefetcher:
+    ''' Iterates over pages of the fetcher keeping up to prefetch_pages
+    requests in flight. Pages are yielded in order; the next request is
+    submitted only when a page is consumed, so not more than prefetch_pages
+    pages are held in memory. Iteration stops at the first empty page. '''
+    def __init__(self, fetcher, page_size=None, subfilter=None, prefetch_pages=DEFAULT_PREFETCH_PAGES):
+        self.fetcher = fetcher
+        self.page_size = page_size
+        self.subfilter = subfilter
+        self.prefetch_pages = max(1, prefetch_pages or 1)
+
+    def __iter__(self):
+        if self.prefetch_pages == 1:
+            return self._iter_sequentially()
+        return self._iter_prefetched()
+
+    def _iter_sequentially(self):
+        page_index = 0
+        while 1:
+            page = self.fetcher.fetch(page_index=page_index, page_size=self.page_size, subfilter=self.subfilter)
+            if page is None:
+                return
+            yield page
+            page_index += 1
+
+    def _iter_prefetched(self):
+        logger.debug(" Prefetching %s pages of %s" % (self.prefetch_pages, self.fetcher.__class__.__name__))
+        executor = Executors.newFixedThreadPool(self.prefetch_pages)
+        futures = []
+        try:
+            for page_index in xrange(self.prefetch_pages):
+                futures.append(executor.submit(_FetchPageTask(self.fetcher, page_index, self.page_size, self.subfilter)))
+            next_page_index = self.prefetch_pages
+            while futures:
+                try:
+                    page = futures.pop(0).get()
+                except ExecutionException, ex:
+                    raise ex.getCause() or ex
+                if page is None:
+                    return
+                futures.append(executor.submit(_FetchPageTask(self.fetcher, next_page_index, self.page_size, self.subfilter)))
+                next_page_index += 1
+                yield page
+        finally:
+            for future in futures:
+                future.cancel(True)
+            executor.shutdownNow()
+
+
 class BaseNmsFetcher:
     def __init__(self, api, endpoint_proto, endpoint_host, endpoint_port,
                  auth_username, auth_password, default_filter=None):
@@ -1103,6 +1207,8 @@ class BaseNmsFetcher:
             pass
 
         self._storage = ResultStorage(self)
+        self._stub_key = (self.__class__.__name__, endpoint_proto, self._connection_host,
+                          endpoint_port, auth_username)
 
     def _create_stub(self):
         service = self.stub_class(java.net.URL('%s://%s:%d%s' % (self.endpoint_proto, self._connection_host, int(self.endpoint_port), self.endpoint_path)))
@@ -1116,7 +1222,30 @@ class BaseNmsFetcher:
         return port
     
     def _get_stub(self):
-        return self._create_stub()
+        ''' Ports are not thread safe, so each thread reuses its own port '''
+        stubs = _get_thread_stubs()
+        stub = stubs.get(self._stub_key)
+        if stub is None:
+            stub = self._create_stub()
+            stubs[self._stub_key] = stub
+        return stub
+
+    def _reset_stub(self):
+        _get_thread_stubs().pop(self._stub_key, None)
+
+    def _get_live_items(self, final_filter):
+        max_requests = getattr(self.api.configuration, 'maxRequestsPerService', None) or DEFAULT_MAX_REQUESTS_PER_SERVICE
+        semaphore = _get_service_semaphore(self.endpoint_path, max_requests)
+        semaphore.acquire()
+        try:
+            try:
+                return self._get_stub_items(final_filter.nr())
+            except (java.net.SocketException, WebServiceException):
+                # port may be in broken state, create new one on retry
+                self._reset_stub()
+                raise
+        finally:
+            semaphore.release()
     
     def _get_port(self, service):
         raise NotImplemented("_get_port")    
@@ -1181,12 +1310,12 @@ class BaseNmsFetcher:
             except (StorageFileDoesNotExist, StorageOperationException), ex:
                 logger.debug("Failed to read from storage or no previous results exist")
                 if _STORE_CONFIG.fallback_to_live():
-                    items = self._get_stub_items(final_filter.nr())
+                    items = self._get_live_items(final_filter)
                     items_updated = True
                 else:
                     raise ex
         else:
-            items = self._get_stub_items(final_filter.nr())
+            items = self._get_live_items(final_filter)
             items_updated = True
             
         
@@ -1205,10 +1334,16 @@ class BaseNmsFetcher:
         
         return self.collection_class(self, result_items)
 
+    def iter_pages(self, page_size=None, subfilter=None, prefetch_pages=None):
+        ''' Iterates over pages in order, see PagePrefetcher '''
+        if prefetch_pages is None:
+            prefetch_pages = getattr(self.api.configuration, 'prefetchPages', None) or DEFAULT_PREFETCH_PAGES
+        return iter(PagePrefetcher(self, page_size, subfilter, prefetch_pages))
+
     def all(self):
         result = []
 
-        for page in self:
+        for page in self.iter_pages():
             for item in page:
                 result.append(item)
 
@@ -1761,6 +1896,12 @@ class BaseNmsRelatedTopologyPager:
 
         return result
 
+    def __iter__(self):
+        fetcher = self.api.get_fetcher(self.related_topology_class.entry_service)
+        page_size = self.page_size or fetcher.page_size
+        for collection in fetcher.iter_pages(page_size, self.sub_filter):
+            yield self.related_topology_class(collection)
+
     def fetch(self, page_index, page_size=None, subfilter=None):
         fetcher = self.api.get_fetcher(self.related_topology_class.entry_service)
 
@@ -1795,6 +1936,16 @@ class NmsL2OfflineConnectionRelatedTopologyPager(BaseNmsRelatedTopologyPager):
         BaseNmsRelatedTopologyPager.__init__(self, api, page_size, sub_filter)
         self.l2_connections = l2_connections
 
+    def __iter__(self):
+        # pages are sliced from already fetched connections
+        page_index = 0
+        while 1:
+            result = self.fetch(page_index, subfilter=self.sub_filter)
+            if result is None:
+                return
+            yield result
+            page_index += 1
+
     def fetch(self, page_index, page_size=None, subfilter=None):
 
         fetcher = self.api.get_fetcher(self.related_topology_class.entry_service)
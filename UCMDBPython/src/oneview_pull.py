@@ -3,6 +3,7 @@ import os
 import sys
 import modeling
 import logger
+import http_keep_alive
 from collections import defaultdict
 from oneview_connection_data_manager import FrameworkBasedConnectionDataManager
 from oneview_mapping_interfaces import AbstractSourceSystem, \
@@ -310,12 +311,15 @@ class SourceSystem(AbstractSourceSystem):
         def getCisByType(self, ciType):
             return self.__cache.get(ciType)
 
-    def __init__(self, connectionDataManager):
+    def __init__(self, connectionDataManager, maxConcurrentRequests=http_keep_alive.DEFAULT_MAX_CONCURRENT_REQUESTS):
         self.__connectionDataManager = connectionDataManager
         self.__client = None
         self.__linkNameToId = {}
         self.__ciCache = SourceSystem.__CiCache()
         self.__linkCache = {}
+        # query -> result, kept for the whole replication
+        self.__queryCache = {}
+        self.__maxConcurrentRequests = maxConcurrentRequests
 
     def __createClient(self):
         '''
@@ -328,6 +332,24 @@ class SourceSystem(AbstractSourceSystem):
             self.__client = ovc
         return self.__client
 
+    def __query(self, query):
+        if not self.__queryCache.has_key(query):
+            self.__queryCache[query] = self.__createClient().get(query)
+        return self.__queryCache[query]
+
+    def __queryAll(self, queries):
+        '''Queries missing in cache are sent concurrently'''
+        missing = []
+        for query in queries:
+            if not self.__queryCache.has_key(query) and query not in missing:
+                missing.append(query)
+        if missing:
+            client = self.__createClient()
+            results = http_keep_alive.callConcurrently(client.get, [(query,) for query in missing],
+                                                       self.__maxConcurrentRequests)
+            for query, result in zip(missing, results):
+                self.__queryCache[query] = result
+        return [self.__queryCache[query] for query in queries]
 
     def getCis(self, sourceCiType, ciMapping):
         logger.info('Get ci type:%s' % sourceCiType)
@@ -335,14 +357,13 @@ class SourceSystem(AbstractSourceSystem):
         ref = ciMapping.getRef()
         base = ciMapping.getBase()
         idKey = ciMapping.getIdKey()
-        client = self.__createClient()
         results = []
         if ref:
             by_type = self.__ciCache.getCisByType(ref)
             if by_type:
                 results = by_type.values()
         elif query:
-            queryResult = client.get(query)
+            queryResult = self.__query(query)
             if isinstance(queryResult, list):
                 results = queryResult
             else:
@@ -351,12 +372,14 @@ class SourceSystem(AbstractSourceSystem):
             raise Exception("No data source, need query or ref")
         cis = []
         parent = None
-        for result in results:
+        refResults = None
+        if ref and query:
+            refResults = self.__queryAll([query % refParent.getObj() for refParent in results])
+        for index, result in enumerate(results):
             if ref:
                 parent = result
                 if query:
-                    refQuery = query % parent.getObj()
-                    result = client.get(refQuery)
+                    result = refResults[index]
             if base:
                 if isinstance(result, SourceSystem.__Ci):
                     obj = result.getObj()
@@ -405,8 +428,9 @@ class SourceSystem(AbstractSourceSystem):
             raise Exception('Unrecognized reference:%s' % sourceType)
 
 
-def replicateTopologyUsingMappingFile(mappingFile, connectionDataManager, mappingFileManager):
-    sourceSystem = SourceSystem(connectionDataManager)
+def replicateTopologyUsingMappingFile(mappingFile, connectionDataManager, mappingFileManager,
+                                      maxConcurrentRequests=http_keep_alive.DEFAULT_MAX_CONCURRENT_REQUESTS):
+    sourceSystem = SourceSystem(connectionDataManager, maxConcurrentRequests)
     ucmdbSystem = UcmdbTargetSystem()
 
     mapping = mappingFileManager.getMapping(mappingFile)
@@ -426,6 +450,13 @@ def replicateTopologyFromOneview(connectionDataManager, mappingFileManager):
     return ucmdbSystem.getTopology()
 
 
+def getMaxConcurrentRequests(Framework):
+    value = Framework.getParameter('maxConcurrentRequests')
+    if value and value.strip().isdigit():
+        return int(value)
+    return http_keep_alive.DEFAULT_MAX_CONCURRENT_REQUESTS
+
+
 def getMappingFileFromFramework(Framework):
     mappingFile = Framework.getParameter('Mapping file') or ONEVIEW_MAPPING_FILE
     mappingFile = mappingFile and mappingFile.strip()
@@ -482,7 +513,8 @@ def DiscoveryMain(Framework):
         mappingFile = getMappingFileFromFramework(Framework)
         if mappingFile:
             return replicateTopologyUsingMappingFile(os.path.join(mappingFileFolder, mappingFile),
-                                                     connectionDataManager, mappingFileManager)
+                                                     connectionDataManager, mappingFileManager,
+                                                     getMaxConcurrentRequests(Framework))
         else:
             Framework.reportError('No mapping file found.')
             logger.errorException("No mapping file found.")
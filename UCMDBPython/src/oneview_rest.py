@@ -3,6 +3,7 @@ import urllib2
 import sys
 
 import logger
+import http_keep_alive
 
 
 verbose = False
@@ -60,6 +61,7 @@ except ImportError:
 class TrustAllCert:
     SSL_INITED = False
     TRUST_ALL_CONTEXT = None
+    TRUST_ALL_SOCKET_FACTORY = None
     DEFAULT_CONTEXT = None
 
     @classmethod
@@ -97,6 +99,9 @@ class TrustAllCert:
         from javax.net.ssl import SSLContext
 
         SSLContext.setDefault(TrustAllCert.TRUST_ALL_CONTEXT)
+        # single factory instance, so kept-alive connections are reused
+        if TrustAllCert.TRUST_ALL_CONTEXT and not cls.TRUST_ALL_SOCKET_FACTORY:
+            cls.TRUST_ALL_SOCKET_FACTORY = TrustAllCert.TRUST_ALL_CONTEXT.getSocketFactory()
 
 
 class RestError(Exception):
@@ -110,15 +115,6 @@ class RestError(Exception):
             int(self.code), self.reason, self.body)
 
 
-class RequestWithMethod(urllib2.Request):
-    def __init__(self, method, *args, **kwargs):
-        self._method = method
-        urllib2.Request.__init__(self, *args, **kwargs)
-
-    def get_method(self):
-        return self._method if self._method else urllib2.Request.get_method(self)
-
-
 CACHE_READ = False
 CACHE_WRITE = False
 
@@ -201,13 +197,12 @@ class RestClient(object):
     @ClientCache.use_cache
     def __request(cls, method, url, params=None, headers=None):
         headers = headers or {}
-        data = cls.fromJson(params) if params else {}
-        req = RequestWithMethod(method, url, data, headers)
+        data = cls.fromJson(params) if params else None
         if verbose:
-            print req.get_method(), req.get_full_url()
+            print method, url
         try:
-            res = urllib2.urlopen(req)
-            body = res.read()
+            # connection is kept alive for next requests
+            body = http_keep_alive.request(method, url, data, headers, TrustAllCert.TRUST_ALL_SOCKET_FACTORY)
             if verbose:
                 print body
         except urllib2.HTTPError, e:
@@ -6,8 +6,11 @@ import errorobject
 import netutils
 
 from java.util import HashSet
+from java.util import Hashtable
 from java.lang import Boolean
 from java.lang import Integer
+from java.lang import System
+from java.sql import Timestamp
 
 from com.hp.ucmdb.discovery.library.common import CollectorsParameters
 
@@ -39,8 +42,12 @@ class Process:
 
 class ProcessToProcess:
     CONTEXT = 'processTOprocess'
+    DEFAULT_FULL_RECONCILE_INTERVAL = 24
 
-    P2PSQL = '''
+    #trigger host id -> [watermark, time of the last full run], kept for the probe lifetime
+    P2P_WATERMARKS = Hashtable()
+
+    P2P_SQL_TEMPLATE = '''
             select SrcAddr, SrcPort, Prot, lpr.listen SrcListen, lpr.hostid srchid, lpr.pid srcpid, lpr.processname srcname,
                    rpr.hostid dsthid, rpr.pid dstpid, DstAddr, DstPort, rpr.listen DstListen, rpr.processname dstname
             from Agg_V5 agg
@@ -52,12 +59,19 @@ class ProcessToProcess:
                                 and rpr.port = agg.DstPort
                                 and lpr.Protocol = agg.Prot
             where agg.hostid = ? and (? or SrcAddr <> DstAddr) and ((rpr.hostid is null) or (lpr.hostid <> rpr.hostid) or (lpr.pid < rpr.pid))
+            %s
             order by srcpid
     '''
     #explanation for  where not ((lpr.hostid = rpr.hostid) and (lpr.pid > rpr.pid)):
     #we check for specific hostid (srchid),we know that all connections in table agg_v5 are symmetrical and order result by srcpid
 
-    PROCESS_SQL = '''
+    #Agg_V5.Stamp is a timestamp, Port_Process.stamp is a time in milliseconds; both are refreshed on each report
+    INCREMENTAL_CONDITION = 'and (agg.Stamp > ? or lpr.stamp > ? or rpr.stamp > ?)'
+
+    P2PSQL = P2P_SQL_TEMPLATE % ''
+    P2P_INCREMENTAL_SQL = P2P_SQL_TEMPLATE % INCREMENTAL_CONDITION
+
+    PROCESS_SQL_TEMPLATE = '''
             with p2p as ( %s )
             select hostid, pid, name, cmdline, path, params, owner, startuptime
             from processes
@@ -66,7 +80,10 @@ class ProcessToProcess:
                 union
                 select distinct dsthid hostid, dstpid pid from p2p where dsthid is not null
             )
-    ''' % P2PSQL
+    '''
+    PROCESS_SQL = PROCESS_SQL_TEMPLATE % P2PSQL
+    PROCESS_INCREMENTAL_SQL = PROCESS_SQL_TEMPLATE % P2P_INCREMENTAL_SQL
+
     def __init__(self, Framework):
         self.Framework = Framework
         self.conn = self.Framework.getProbeDatabaseConnection(ProcessToProcess.CONTEXT)
@@ -78,6 +95,48 @@ class ProcessToProcess:
         self.ignoredProcesses = HashSet()
         self.processMap = {}
         self.getProcessesToFilter()
+        self.runStartTime = System.currentTimeMillis()
+        self.watermark = self.getWatermark()
+
+    def getWatermark(self):
+        '''Incremental mode reports only connections changed since the previous run
+        for the same trigger; full run is done for the first run and each
+        p2pFullReconcileInterval hours
+        @return: time in milliseconds or None for the full run
+        '''
+        if not self.hostID or not Boolean.parseBoolean(self.Framework.getParameter('p2pIncremental')):
+            return None
+        entry = ProcessToProcess.P2P_WATERMARKS.get(self.hostID)
+        if entry is None:
+            logger.debug('No previous process to process run, running full')
+            return None
+        watermark, lastFullRunTime = entry
+        interval = self.Framework.getParameter('p2pFullReconcileInterval')
+        try:
+            interval = int(interval)
+        except:
+            interval = ProcessToProcess.DEFAULT_FULL_RECONCILE_INTERVAL
+        if interval > 0 and self.runStartTime - lastFullRunTime > interval * 3600000L:
+            logger.debug('Full reconcile interval passed, running full process to process')
+            return None
+        logger.debug('Running incremental process to process, changes since ', Timestamp(watermark))
+        return watermark
+
+    def updateWatermark(self):
+        lastFullRunTime = self.runStartTime
+        if self.watermark is not None:
+            lastFullRunTime = ProcessToProcess.P2P_WATERMARKS.get(self.hostID)[1]
+        ProcessToProcess.P2P_WATERMARKS.put(self.hostID, [self.runStartTime, lastFullRunTime])
+
+    def getP2PSql(self):
+        if self.watermark is None:
+            return ProcessToProcess.P2PSQL
+        return ProcessToProcess.P2P_INCREMENTAL_SQL
+
+    def getProcessSql(self):
+        if self.watermark is None:
+            return ProcessToProcess.PROCESS_SQL
+        return ProcessToProcess.PROCESS_INCREMENTAL_SQL
 
     def getProcessesToProcess(self):
         if not self.shouldRun():
@@ -86,7 +145,7 @@ class ProcessToProcess:
         try:
             try:
                 self.buildProcessMap()
-                st = self.getPreparedStatement(ProcessToProcess.P2PSQL)
+                st = self.getPreparedStatement(self.getP2PSql())
 
                 logger.debug(st)
                 rs = st.executeQuery()
@@ -116,6 +175,8 @@ class ProcessToProcess:
                             connString = '%s:%d %s:%d' % (srcip, srcport, dstip, dstport)
                             logger.warn('process to process topology: '
                                         'Listen endpoint is unknown, skipping %s' % connString)
+                if self.hostID:
+                    self.updateWatermark()
             except:
                 error = 'Failed to fetch processes to process communication'
                 logger.errorException(error)
@@ -131,7 +192,7 @@ class ProcessToProcess:
 
 
     def buildProcessMap(self):
-        st = self.getPreparedStatement(ProcessToProcess.PROCESS_SQL)
+        st = self.getPreparedStatement(self.getProcessSql())
         logger.debug('Build process map by SQL:', st)
         rs = None
         try:
@@ -160,6 +221,10 @@ class ProcessToProcess:
         st = self.conn.prepareStatement(sql)
         st.setString(1, self.hostID)
         st.setBoolean(2, not self.shouldIgnoreLocal)
+        if self.watermark is not None:
+            st.setTimestamp(3, Timestamp(self.watermark))
+            st.setLong(4, self.watermark)
+            st.setLong(5, self.watermark)
         return st
 
     def getProcess(self, hostid, pid):
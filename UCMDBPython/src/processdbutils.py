@@ -30,6 +30,26 @@ class Process(discoverydbutils.DiscoveryDbEntity):
  FROM new_values
  WHERE NOT EXISTS (SELECT 1 from upsert)'''
 
+    BULKSQL = '''WITH new_values (hostid, pid, name, cmdline, params, path, owner, stamp, lower_name, startuptime)
+ AS (VALUES %s),
+ upsert AS (UPDATE Processes p
+  SET name = coalesce (nv.name, p.name),
+  cmdline = coalesce (nv.cmdline, p.cmdline),
+  params = coalesce (nv.params, p.params),
+  path = coalesce (nv.path, p.path),
+  owner = coalesce (nv.owner, p.owner),
+  stamp = coalesce (nv.stamp, p.stamp),
+  startuptime = coalesce (nv.startuptime, p.startuptime)
+  FROM new_values AS nv
+  WHERE p.hostid = nv.hostid and p.pid = nv.pid
+  RETURNING p.hostid, p.pid
+ )
+ INSERT INTO Processes (hostid, pid, name, cmdline, params, path, owner, stamp, lower_name, startuptime)
+ SELECT hostid, pid, name, cmdline, params, path, owner, stamp, lower_name, startuptime
+ FROM new_values AS nv
+ WHERE NOT EXISTS (SELECT 1 from upsert u WHERE u.hostid = nv.hostid and u.pid = nv.pid)'''
+    BULKROW = '(?,?,?,?,?,?,?,?,?,?)'
+
     def __init__(self, hostid, name, pid, cmdline = None, path = None, params = None, owner = None, startuptime = None):
         self.hostid = hostid
         self.name = name
@@ -46,21 +66,36 @@ class Process(discoverydbutils.DiscoveryDbEntity):
     def getInsertSQL(self):
         return Process.PREPAREDSQL
 
-    def setValues(self, statement):
+    def getBulkInsertSQL(self, rowsCount):
+        return Process.BULKSQL % discoverydbutils.buildValuesRows(Process.BULKROW, rowsCount)
+
+    def getKey(self):
+        return (self.hostid, self.pid)
+
+    def merge(self, previous):
+        # the same as sequential upserts do: missing values are taken from the previous entity
+        for attribute in ('cmdline', 'path', 'params', 'owner'):
+            if getattr(self, attribute) is None:
+                setattr(self, attribute, getattr(previous, attribute))
+        if not self.startuptime:
+            self.startuptime = previous.startuptime
+        return self
+
+    def setValues(self, statement, offset = 0):
 #        (hostid, pid, name, cmdline, params, path, owner, stamp, lower_name, startuptime)
-        statement.setString(1, self.hostid)
-        statement.setInt(2, self.pid)
-        statement.setString(3, self.name)
-        self.setValue(statement, 4, self.cmdline)
-        self.setValue(statement, 5, self.params)
-        self.setValue(statement, 6, self.path)
-        self.setValue(statement, 7, self.owner)
-        statement.setLong(8, System.currentTimeMillis())
-        statement.setString(9, self.name.lower())
+        statement.setString(offset + 1, self.hostid)
+        statement.setInt(offset + 2, self.pid)
+        statement.setString(offset + 3, self.name)
+        self.setValue(statement, offset + 4, self.cmdline)
+        self.setValue(statement, offset + 5, self.params)
+        self.setValue(statement, offset + 6, self.path)
+        self.setValue(statement, offset + 7, self.owner)
+        statement.setLong(offset + 8, System.currentTimeMillis())
+        statement.setString(offset + 9, self.name.lower())
         if self.startuptime:
-            statement.setLong(10, self.startuptime)
+            statement.setLong(offset + 10, self.startuptime)
         else:
-            statement.setNull(10, Types.BIGINT)
+            statement.setNull(offset + 10, Types.BIGINT)
 
 class ProcessDbUtils(discoverydbutils.DiscoveryDbUtils):
 #	DELETESQL = 'delete from %s where hostid=\'%s\' and stamp < ' + str(System.currentTimeMillis() - PROCESS_EXPIRATION_PERIOD)
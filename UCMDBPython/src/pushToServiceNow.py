@@ -5,10 +5,18 @@
 ####################################
 import logger
 import random
+import threading
 
 from java.util import HashMap
+from java.util import Collections
+from java.util import LinkedHashMap
+from java.util.concurrent import Callable
+from java.util.concurrent import Executors
+from java.util.concurrent import ExecutionException
+from java.util.concurrent import TimeUnit
 from java.math import BigInteger
 from java.lang import String
+from java.lang import System
 from java.lang import Boolean
 from java.lang import Object
 from java.lang import Exception
@@ -45,6 +53,9 @@ IS_INSERT_MULTIPLE = False
 INSERT_MULTIPLE_BULK_SIZE = 100
 REQUEST_TIMEOUT = 60 #Seconds for each request
 FAIL_BULK = True # Fail whole Bulk when there is inconsistent data
+SYS_ID_CACHE_SIZE = 10000 # Max amount of cached table/name to sys_id lookups
+WORKER_THREADS = 1 # Threads sending requests, all requests to a table are sent in order by one thread
+MAX_PENDING_REQUESTS = 1000 # Requests submitted to workers before waiting for their completion
 
 ##############################################
 ##############################################
@@ -238,6 +249,7 @@ def getReferenceFieldSysId(SNConnPropMap, value, dataType):
         if len(keys) > 1:
             logger.warn('[getReferenceFieldSysId] Got <%s> sys_ids for table <%s> with name <%s>...using the first one. More than one is not normal!' % (len(keys), table_name, value))
         debugPrint(3, '[getReferenceFieldSysId] Got SN sys_id <%s> for table <%s>' % (keys[0], table_name))
+        SYS_ID_CACHE.put(table_name, value, keys[0])
         return keys[0]
     except Exception, ex:
         excInfo = logger.prepareJythonStackTrace('')
@@ -246,6 +258,190 @@ def getReferenceFieldSysId(SNConnPropMap, value, dataType):
             raise Exception('[getReferenceFieldSysId] ' + ex.getMessage())
         pass
 
+##############################################
+## Get sys_id of reference field from cache or by worker of the table
+##############################################
+def resolveReferenceFieldSysId(SNConnPropMap, value, dataType):
+    table_name = dataType[0]
+    sysId = SYS_ID_CACHE.get(table_name, value)
+    if sysId:
+        return sysId
+    return DISPATCHER.call(table_name, lambda: getReferenceFieldSysId(SNConnPropMap, value, dataType))
+
+##############################################
+## Resolve distinct reference field values of CIs in bulk
+##############################################
+def prefetchReferenceFieldSysIds(allObjectChildren, SNConnPropMap):
+    requested = {}
+    it = allObjectChildren.iterator()
+    while it.hasNext():
+        objectElement = it.next()
+        if objectElement.getAttributeValue('operation') == 'delete':
+            continue
+        fieldChildren = objectElement.getChildren('field')
+        if fieldChildren is None:
+            continue
+        iter2 = fieldChildren.iterator()
+        while iter2.hasNext():
+            fieldElement = iter2.next()
+            fieldDataType = fieldElement.getAttributeValue('datatype')
+            if (not fieldDataType or fieldDataType in ('String', 'BigInteger', 'boolean', 'datetime')
+                or fieldElement.getAttributeValue('name') == 'sys_id'):
+                continue
+            fieldValue = fieldElement.getText()
+            key = (fieldDataType, fieldValue)
+            if not requested.has_key(key) and not SYS_ID_CACHE.contains(fieldDataType, fieldValue):
+                requested[key] = 1
+                DISPATCHER.submit(fieldDataType, lambda value=fieldValue, dataType=[fieldDataType]:
+                                  getReferenceFieldSysId(SNConnPropMap, value, dataType))
+    DISPATCHER.waitAll()
+    debugPrint(1, '[prefetchReferenceFieldSysIds] Resolved <%s> reference values' % len(requested))
+
+##############################################
+## LRU cache of sys_ids found by table and name
+##############################################
+class _LruMap(LinkedHashMap):
+    def __init__(self, maxSize):
+        LinkedHashMap.__init__(self, 16, 0.75, True)
+        self.maxSize = maxSize
+
+    def removeEldestEntry(self, eldest):
+        return self.size() > self.maxSize
+
+
+class SysIdCache:
+    def __init__(self, maxSize):
+        self.map = Collections.synchronizedMap(_LruMap(maxSize))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table_name, name):
+        sysId = self.map.get('%s|%s' % (table_name, name))
+        if sysId:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return sysId
+
+    def contains(self, table_name, name):
+        # lookup for prefetching, hits and misses are not counted
+        return self.map.containsKey('%s|%s' % (table_name, name))
+
+    def put(self, table_name, name, sysId):
+        if sysId:
+            self.map.put('%s|%s' % (table_name, name), sysId)
+
+##############################################
+## Send requests on bounded amount of worker threads.
+## All requests to a table are sent by the same worker in order of submission,
+## so the stub of a table is never used concurrently.
+## With one worker requests are sent in the calling thread.
+##############################################
+class _Request(Callable):
+    def __init__(self, fn):
+        self.fn = fn
+
+    def call(self):
+        return self.fn()
+
+
+class RequestDispatcher:
+    def __init__(self, workersCount):
+        self.workers = []
+        if workersCount > 1:
+            self.workers = [Executors.newSingleThreadExecutor() for i in range(workersCount)]
+        self.workerIndexByTable = {}
+        self.pending = []
+
+    def getWorker(self, table_name):
+        index = self.workerIndexByTable.get(table_name)
+        if index is None:
+            index = len(self.workerIndexByTable) % len(self.workers)
+            self.workerIndexByTable[table_name] = index
+        return self.workers[index]
+
+    def submit(self, table_name, fn):
+        # error of the request is raised by waitAll
+        if not self.workers:
+            fn()
+            return
+        if len(self.pending) >= MAX_PENDING_REQUESTS:
+            self.waitAll()
+        self.pending.append(self.getWorker(table_name).submit(_Request(fn)))
+
+    def call(self, table_name, fn):
+        if not self.workers:
+            return fn()
+        return self.getResult(self.getWorker(table_name).submit(_Request(fn)))
+
+    def waitAll(self):
+        pending = self.pending
+        self.pending = []
+        for future in pending:
+            self.getResult(future)
+
+    def getResult(self, future):
+        try:
+            return future.get()
+        except ExecutionException, ex:
+            raise ex.getCause() or ex
+
+    def shutdown(self):
+        # let submitted requests complete so their sys_ids get to the mappings,
+        # requests still queued after the time one request may take with retries are cancelled
+        for worker in self.workers:
+            worker.shutdown()
+        timeoutSeconds = REQUEST_TIMEOUT * (RETRY_COUNT + 1) + RETRY_DELAY_SECONDS * RETRY_COUNT
+        deadline = System.currentTimeMillis() + timeoutSeconds * 1000
+        for worker in self.workers:
+            if not worker.awaitTermination(max(0, deadline - System.currentTimeMillis()), TimeUnit.MILLISECONDS):
+                cancelled = worker.shutdownNow()
+                logger.warn('[RequestDispatcher] Requests not completed in <%s> seconds, <%s> queued requests cancelled' % (timeoutSeconds, cancelled.size()))
+        self.pending = []
+
+##############################################
+## Insert record by worker of the table, response is passed to callback.
+## Record may be buffered by the stub to be sent with insertMultiple
+##############################################
+def insertRecord(stub, table_name, action, callback, errorMessage):
+    def insert():
+        try:
+            insertResponse = stub.insert(action, callback)
+        except:
+            logger.debugException('')
+            raise Exception(errorMessage)
+        if insertResponse:
+            callback(insertResponse)
+    DISPATCHER.submit(table_name, insert)
+
+##############################################
+## Time spent in phases of the push
+##############################################
+class PhaseTimer:
+    def __init__(self):
+        self.phases = []
+        self.millisByPhase = {}
+
+    def measure(self, phase, fn, *args):
+        startTime = System.currentTimeMillis()
+        try:
+            return fn(*args)
+        finally:
+            if not self.millisByPhase.has_key(phase):
+                self.phases.append(phase)
+                self.millisByPhase[phase] = 0
+            self.millisByPhase[phase] += System.currentTimeMillis() - startTime
+
+    def report(self):
+        logger.info('[DiscoveryMain] Time spent: %s' % ', '.join(['%s <%s ms>' % (phase, self.millisByPhase[phase]) for phase in self.phases]))
+
+
+SYS_ID_CACHE = SysIdCache(SYS_ID_CACHE_SIZE)
+DISPATCHER = RequestDispatcher(WORKER_THREADS)
+PHASE_TIMER = PhaseTimer()
+# guards ID mappings updated by worker threads
+MAPPINGS_LOCK = threading.Lock()
+
 ##############################################
 ## Get SN API stub
 ##############################################
@@ -350,13 +546,18 @@ def processAction(f):
 
 class Mem:
     cache = {}
+    lock = threading.Lock()
 
     @classmethod
     def memoize(cls, f):
         def memf(*args, **kwargs):
-            if args not in cls.cache:
-                cls.cache[args] = f(*args, **kwargs)
-            return cls.cache[args]
+            cls.lock.acquire()
+            try:
+                if args not in cls.cache:
+                    cls.cache[args] = f(*args, **kwargs)
+                return cls.cache[args]
+            finally:
+                cls.lock.release()
 
         return memf
 
@@ -422,6 +623,9 @@ def getAction(table_name, action, useMultiple=False):
 def getServiceNowRelTypeId(SNConnPropMap, relClass):
     try:
         table_name = 'cmdb_rel_type'
+        cachedSysId = SYS_ID_CACHE.get(table_name, relClass)
+        if cachedSysId:
+            return cachedSysId
         stub = getStub(SNConnPropMap, table_name)
         if stub == None:
             debugPrint(2, '[getServiceNowRelTypeId] Unable to get SN API stub for table <%s>' % table_name)
@@ -442,6 +646,7 @@ def getServiceNowRelTypeId(SNConnPropMap, relClass):
         if len(keys) > 1:
             logger.warn('[getServiceNowRelTypeId] Got <%s> sys_ids for relationship type <%s>...using the first one. More than one is not normal!' % (len(keys), relClass))
         debugPrint(4, '[getServiceNowRelTypeId] Got SN sys_id <%s> for SN relationship type <%s>' % (keys, relClass))
+        SYS_ID_CACHE.put(table_name, relClass, keys[0])
         return keys[0]
     except Exception, ex:
         raise Exception('[getServiceNowRelTypeId] ' + ex.getMessage())
@@ -484,7 +689,7 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
             if IS_INSERT_MULTIPLE and previous_stub != stub:
                 if previous_stub:
                     logger.debug('--InsertMultiple--:Flush previous bulk')
-                    previous_stub.flush()
+                    DISPATCHER.submit(previous_stub.tableName, previous_stub.flush)
                 previous_stub = stub
 
             if not stub:
@@ -529,11 +734,13 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
                     pass
                 else:
                     SNWebServiceAction.setSys_id(serviceNowId)
-                    try:
-                        stub.deleteRecord(SNWebServiceAction)
-                    except:
-                        raise Exception('[processCIs:delete] Error connecting to Service-Now while processing CIT <%s>' % table_name)
-                    debugPrint(1, '[processCIs] *** Deleted CI with sys_id: <%s>' % serviceNowId)
+                    def deleteCI(stub=stub, action=SNWebServiceAction, table_name=table_name, serviceNowId=serviceNowId):
+                        try:
+                            stub.deleteRecord(action)
+                        except:
+                            raise Exception('[processCIs:delete] Error connecting to Service-Now while processing CIT <%s>' % table_name)
+                        debugPrint(1, '[processCIs] *** Deleted CI with sys_id: <%s>' % serviceNowId)
+                    DISPATCHER.submit(table_name, deleteCI)
                 deleteCICount += 1
             else:
                 #Either add or update. Need to iterate the fields
@@ -564,7 +771,7 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
                                 fieldValue = dt.strftime('%Y-%m-%d %H:%M:%S')
                                 setValue(SNWebServiceAction, fieldName, fieldValue, [String])
                         elif fieldDataType:
-                            refFleidKey = getReferenceFieldSysId(SNConnPropMap, fieldValue, [fieldDataType])
+                            refFleidKey = resolveReferenceFieldSysId(SNConnPropMap, fieldValue, [fieldDataType])
                             setValue(SNWebServiceAction, fieldName, refFleidKey, [String])
 
                         if len(fieldValue.strip()) == 0:
@@ -577,9 +784,13 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
                             if serviceNowId:
                                 #Create externalId
                                 externalCIId = createExternalCiId(theId, serviceNowId)
-                                objectMappings.put(mamId, externalCIId)
-                                #We need mamId to serviceNowId map to process relationship later
-                                mamIdToSysIdMap.put(mamId, serviceNowId)
+                                MAPPINGS_LOCK.acquire()
+                                try:
+                                    objectMappings.put(mamId, externalCIId)
+                                    #We need mamId to serviceNowId map to process relationship later
+                                    mamIdToSysIdMap.put(mamId, serviceNowId)
+                                finally:
+                                    MAPPINGS_LOCK.release()
                                 logger.debug('==Add ID Mapping: %s, %s:%s'%(theId, mamId, serviceNowId))
                                 debugPrint(1, '[processCIs] *** Added CI and got SN ID: ', serviceNowId)
 
@@ -595,38 +806,39 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
                         if DRY_RUN:
                             serviceNowId = DRY_RUN_SYS_ID_PREFIX + '_' + str(dryrunindex)
                             dryrunindex = random.randint(10000, 19999)
+                            handle_serviceNowId(serviceNowId, theId, mamId)
                         else:
-                            insertResponse = None
-                            try:
-                                insertResponse = stub.insert(SNWebServiceAction, make_callback(theId, mamId))
-                            except:
-                                logger.debugException('')
-                                raise Exception('[processCIs:add] Error connecting to Service-Now while processing CIT <%s>' % table_name)
-                            if insertResponse:
-                                serviceNowId = insertResponse.getSys_id()
-                                debugPrint(3, '[processCIs] CI SN ID (from SN): ' + serviceNowId)
-
-                        handle_serviceNowId(serviceNowId, theId, mamId)
+                            #sys_id is handled by callback when the record is sent
+                            insertRecord(stub, table_name, SNWebServiceAction, make_callback(theId, mamId),
+                                         '[processCIs:add] Error connecting to Service-Now while processing CIT <%s>' % table_name)
                         addCICount += 1
                     elif operation == 'update':
-                        mamIdToSysIdMap.put(mamId, serviceNowId)
+                        MAPPINGS_LOCK.acquire()
+                        try:
+                            mamIdToSysIdMap.put(mamId, serviceNowId)
+                        finally:
+                            MAPPINGS_LOCK.release()
                         if DRY_RUN:
                             dryrunindex = random.randint(10000, 19999)
                         else:
                             SNWebServiceAction.setSys_id(serviceNowId)
-                            logger.debug('Begin do updating...')
-                            try:
-                                stub.update(SNWebServiceAction)
-                            except:
-                                # raise Exception('[processCIs:update] Error connecting to Service-Now while processing CIT <%s>' % table_name)
-                                logger.warn('[processCIs:update] Error to update Service-Now while processing CIT <%s>' % table_name)
-                            logger.debug('Done updating.')
-                            debugPrint(1, '[processCIs] *** Updated CI with SN ID: ', serviceNowId)
+                            def updateCI(stub=stub, action=SNWebServiceAction, table_name=table_name, serviceNowId=serviceNowId):
+                                logger.debug('Begin do updating...')
+                                try:
+                                    stub.update(action)
+                                except:
+                                    # raise Exception('[processCIs:update] Error connecting to Service-Now while processing CIT <%s>' % table_name)
+                                    logger.warn('[processCIs:update] Error to update Service-Now while processing CIT <%s>' % table_name)
+                                logger.debug('Done updating.')
+                                debugPrint(1, '[processCIs] *** Updated CI with SN ID: ', serviceNowId)
+                            DISPATCHER.submit(table_name, updateCI)
                         updateCICount += 1
         if IS_INSERT_MULTIPLE:
             logger.debug('--InsertMultiple--:Flush final bulk')
             for stub in Mem.cache.values():
-                stub.flush()
+                DISPATCHER.submit(stub.tableName, stub.flush)
+        #CIs have to be sent before relationships are processed
+        DISPATCHER.waitAll()
         resultCountMap.put('add_ci', addCICount)
         resultCountMap.put('update_ci', updateCICount)
         resultCountMap.put('delete_ci', deleteCICount)
@@ -643,6 +855,31 @@ def processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap,
 ##############################################
 ## Relationships
 ##############################################
+def handleRelationSysId(linkMappings, serviceNowRelInstSysId, theId, mamId, end1Id, end2Id, parentSysId, childSysId, serviceNowRelTypeId):
+    debugPrint(3, '[processRelations] Relationship Instance SN ID (from SN): ' + serviceNowRelInstSysId)
+
+    if serviceNowRelInstSysId is not None:
+        externalCiId1 = createExternalCiId(end1Id, parentSysId)
+        externalCiId2 = createExternalCiId(end2Id, childSysId)
+        #This contains both type and instance id. We keep this so deleting relation only becomes possible
+        serviceNowRelId = serviceNowRelInstSysId + ' | ' + serviceNowRelTypeId
+        #Need to keep sys_id for both relation instance and type to allow deleting relation only
+        externalRelationId = createExternalRelationId(theId, serviceNowRelId , externalCiId1, externalCiId2)
+        MAPPINGS_LOCK.acquire()
+        try:
+            linkMappings.put(mamId, externalRelationId)
+        finally:
+            MAPPINGS_LOCK.release()
+
+        debugPrint(1, '[processRelations] *** Added relationship and got SN ID instance|type: ', serviceNowRelId)
+
+def makeRelationCallback(linkMappings, theId, mamId, end1Id, end2Id, parentSysId, childSysId, serviceNowRelTypeId):
+    def callback(insertResponse):
+        if insertResponse:
+            handleRelationSysId(linkMappings, insertResponse.getSys_id(), theId, mamId, end1Id, end2Id,
+                                parentSysId, childSysId, serviceNowRelTypeId)
+    return callback
+
 def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse):
     try:
         table_name = 'cmdb_rel_ci'
@@ -678,7 +915,7 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
             debugPrint(2, '[processRelations] Relationship Operation: <%s>' % operation)
 
             SNWebServiceActionName = getSNWebServiceActionName(operation)
-            SNWebServiceAction = getAction(table_name, SNWebServiceActionName)
+            SNWebServiceAction = getAction(table_name, SNWebServiceActionName, True)
             if SNWebServiceAction == None:
                 return
 
@@ -694,11 +931,13 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
                 else:
                     #Delete the relation instance
                     SNWebServiceAction.setSys_id(serviceNowRelInstId)
-                    try:
-                        stub.deleteRecord(SNWebServiceAction)
-                    except:
-                        raise Exception('[processRelations:delete] Error connecting to Service-Now while processing CIT <%s>' % table_name)
-                    debugPrint(1, '[processRelations] *** Deleted relationship with SN ID <%s>' % serviceNowRelInstId)
+                    def deleteRelation(action=SNWebServiceAction, serviceNowRelInstId=serviceNowRelInstId):
+                        try:
+                            stub.deleteRecord(action)
+                        except:
+                            raise Exception('[processRelations:delete] Error connecting to Service-Now while processing CIT <%s>' % table_name)
+                        debugPrint(1, '[processRelations] *** Deleted relationship with SN ID <%s>' % serviceNowRelInstId)
+                    DISPATCHER.submit(table_name, deleteRelation)
                 deleteRelCount += 1
             else:
                 #Either add or update.
@@ -741,7 +980,7 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
                             serviceNowRelTypeId = DRY_RUN_SYS_ID_PREFIX + '_' + str(dryrunindex)
                             dryrunindex = random.randint(20000, 29999)
                         else:
-                            serviceNowRelTypeId = getServiceNowRelTypeId(SNConnPropMap, relClass)
+                            serviceNowRelTypeId = DISPATCHER.call('cmdb_rel_type', lambda relClass=relClass: getServiceNowRelTypeId(SNConnPropMap, relClass))
 
                         debugPrint(3, '[processRelations] Relationship Type SN ID (from SN): <%s>' % serviceNowRelTypeId)
 
@@ -750,30 +989,18 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
                             logger.error('[processRelations] Could not get sys_id of relationship type <%s> from ServiceNow...skipping!' % relClass)
                             continue
 
-                        serviceNowRelInstSysId = None
                         if DRY_RUN:
                             serviceNowRelInstSysId = DRY_RUN_SYS_ID_PREFIX + '_' + str(dryrunindex)
                             dryrunindex = random.randint(20000, 29999)
+                            handleRelationSysId(linkMappings, serviceNowRelInstSysId, theId, mamId, end1Id, end2Id,
+                                                parentSysId, childSysId, serviceNowRelTypeId)
                         else:
                             #To insert relationship instance we need sys_id of relationship type
                             SNWebServiceAction.setType(serviceNowRelTypeId)
-                            try:
-                                serviceNowRelInstSysId = stub.insert(SNWebServiceAction).getSys_id()
-                            except:
-                                raise Exception('[processRelations:add] Error connecting to Service-Now while processing CIT <%s>' % table_name)
-
-                        debugPrint(3, '[processRelations] Relationship Instance SN ID (from SN): ' + serviceNowRelInstSysId)
-
-                        if serviceNowRelInstSysId is not None:
-                            externalCiId1 = createExternalCiId(end1Id, parentSysId)
-                            externalCiId2 = createExternalCiId(end2Id, childSysId)
-                            #This contains both type and instance id. We keep this so deleting relation only becomes possible
-                            serviceNowRelId = serviceNowRelInstSysId + ' | ' + serviceNowRelTypeId
-                            #Need to keep sys_id for both relation instance and type to allow deleting relation only
-                            externalRelationId = createExternalRelationId(theId, serviceNowRelId , externalCiId1, externalCiId2)
-                            linkMappings.put(mamId, externalRelationId)
-
-                            debugPrint(1, '[processRelations] *** Added relationship and got SN ID instance|type: ', serviceNowRelId)
+                            insertRecord(stub, table_name, SNWebServiceAction,
+                                         makeRelationCallback(linkMappings, theId, mamId, end1Id, end2Id,
+                                                              parentSysId, childSysId, serviceNowRelTypeId),
+                                         '[processRelations:add] Error connecting to Service-Now while processing CIT <%s>' % table_name)
                         addRelCount += 1
                     elif operation == 'update':
                         #Update relationship only updates relationship type in ServiceNow, not relationship instance.
@@ -786,6 +1013,9 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
                             pass
                         updateRelCount += 1
 
+        if IS_INSERT_MULTIPLE:
+            DISPATCHER.submit(table_name, stub.flush)
+        DISPATCHER.waitAll()
         resultCountMap.put('add_rel', addRelCount)
         resultCountMap.put('update_rel', updateRelCount)
         resultCountMap.put('delete_rel', deleteRelCount)
@@ -802,9 +1032,12 @@ def processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMa
 ##############################################
 ##############################################
 def DiscoveryMain(Framework):
+    global SYS_ID_CACHE, DISPATCHER, PHASE_TIMER
     # Prepare the maps to store the mappings of IDs
     objectMappings = HashMap()
     linkMappings = HashMap()
+    PHASE_TIMER = PhaseTimer()
+    DISPATCHER = RequestDispatcher(1)
     try:
         ucmdbUpdateResult = None
         mamIdToSysIdMap = HashMap() #Stores mapping between UCMDB mamId to ServiceNow sys_id
@@ -833,6 +1066,10 @@ def DiscoveryMain(Framework):
         insertMultipleBulkSize = Framework.getDestinationAttribute('InsertMultipleBulkSize') or '50'
         retryCount = Framework.getDestinationAttribute('RetryCount') or '3'
         retryDelaySeconds = Framework.getDestinationAttribute('RetryDelaySeconds') or '5'
+        workerThreads = Framework.getDestinationAttribute('WorkerThreads') or str(WORKER_THREADS)
+        sysIdCacheSize = Framework.getDestinationAttribute('SysIdCacheSize') or str(SYS_ID_CACHE_SIZE)
+        SYS_ID_CACHE = SysIdCache(int(sysIdCacheSize))
+        DISPATCHER = RequestDispatcher(int(workerThreads))
         global  IS_INSERT_MULTIPLE, INSERT_MULTIPLE_BULK_SIZE, RETRY_COUNT, RETRY_DELAY_SECONDS, FAIL_BULK
         failBulk = Framework.getDestinationAttribute('FailBulk') or 'true'
         FAIL_BULK = failBulk == 'true'
@@ -842,6 +1079,7 @@ def DiscoveryMain(Framework):
         RETRY_DELAY_SECONDS = int (retryDelaySeconds)
         logger.debug('Parameters: IS_INSERT_MULTIPLE:%s, INSERT_MULTIPLE_BULK_SIZE:%s, RETRY_COUNT:%s, RETRY_DELAY_SECONDS:%s'
                      % (INSERT_MULTIPLE_BULK_SIZE, INSERT_MULTIPLE_BULK_SIZE, RETRY_COUNT, RETRY_DELAY_SECONDS))
+        logger.debug('Parameters: WORKER_THREADS:%s, SYS_ID_CACHE_SIZE:%s' % (workerThreads, sysIdCacheSize))
         debugPrint(1, '[DiscoveryMain] Service-Now URL: <%s://%s.%s:%s>, using proxy <%s:%s>' % (protocol, instance, host, port, proxyServer, proxyPort))
 
         ## Are Service Now Web Service Import Sets in use?  
@@ -877,9 +1115,9 @@ def DiscoveryMain(Framework):
         debugPrint(3, '****************************************************************')
 
         saxBuilder = SAXBuilder()
-        addXml = saxBuilder.build(StringReader(addResult))
-        updateXml = saxBuilder.build(StringReader(updateResult))
-        deleteXml = saxBuilder.build(StringReader(deleteResult))
+        addXml = PHASE_TIMER.measure('parse', saxBuilder.build, StringReader(addResult))
+        updateXml = PHASE_TIMER.measure('parse', saxBuilder.build, StringReader(updateResult))
+        deleteXml = PHASE_TIMER.measure('parse', saxBuilder.build, StringReader(deleteResult))
 
         proceedToNext = 1
 
@@ -894,11 +1132,12 @@ def DiscoveryMain(Framework):
         if addXml:
             debugPrint(1, '[DiscoveryMain] ========== Process items to add ==========')
             allObjectChildren = addXml.getRootElement().getChild('data').getChild('objects').getChildren('Object')
-            proceedToNext = processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+            PHASE_TIMER.measure('prefetch references', prefetchReferenceFieldSysIds, allObjectChildren, SNConnPropMap)
+            proceedToNext = PHASE_TIMER.measure('CIs', processCIs, allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
 
             if proceedToNext:
                 allLinkChildren = addXml.getRootElement().getChild('data').getChild('links').getChildren('link')
-                processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+                PHASE_TIMER.measure('relationships', processRelations, allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
             else:
                 Framework.reportError('[DiscoveryMain] Error adding CIs...please check probe logs!')
                 return ucmdbUpdateResult
@@ -909,20 +1148,21 @@ def DiscoveryMain(Framework):
             if updateXml:
                 debugPrint(1, '[DiscoveryMain] ========== Process updated items ==========')
                 allObjectChildren = updateXml.getRootElement().getChild('data').getChild('objects').getChildren('Object')
-                processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+                PHASE_TIMER.measure('prefetch references', prefetchReferenceFieldSysIds, allObjectChildren, SNConnPropMap)
+                PHASE_TIMER.measure('CIs', processCIs, allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
 
                 allLinkChildren = updateXml.getRootElement().getChild('data').getChild('links').getChildren('link')
-                processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+                PHASE_TIMER.measure('relationships', processRelations, allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
             else:
                 logger.info("[DiscoveryMain] No data to update")
 
             if deleteXml:
                 debugPrint(1, '[DiscoveryMain] ========== Process deleted items ==========')
                 allObjectChildren = deleteXml.getRootElement().getChild('data').getChild('objects').getChildren('Object')
-                processCIs(allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+                PHASE_TIMER.measure('CIs', processCIs, allObjectChildren, SNConnPropMap, objectMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
 
                 allLinkChildren = deleteXml.getRootElement().getChild('data').getChild('links').getChildren('link')
-                processRelations(allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
+                PHASE_TIMER.measure('relationships', processRelations, allLinkChildren, SNConnPropMap, linkMappings, resultCountMap, mamIdToSysIdMap, importSetUse)
             else:
                 logger.info("[DiscoveryMain] No data to delete")
 
@@ -939,5 +1179,9 @@ def DiscoveryMain(Framework):
         logger.warn('[DiscoveryMain] Exception: <%s>' % excInfo)
         logger.reportError('[DiscoveryMain] Exception: <%s>' % excInfo)
         debugPrint(5, '[DiscoveryMain] MAPPING after exception: CIs: ', objectMappings, ', links: ', linkMappings)
+    finally:
+        DISPATCHER.shutdown()
+        PHASE_TIMER.report()
+        logger.info('[DiscoveryMain] sys_id cache hits <%s>, misses <%s>' % (SYS_ID_CACHE.hits, SYS_ID_CACHE.misses))
 
     return DataPushResultsFactory.createDataPushResults(objectMappings, linkMappings)
\ No newline at end of file
@@ -2,13 +2,11 @@
 # script: pushToXml.py
 # author: CMS CORD
 ####################################
-from __future__ import with_statement
-
-import re
-import codecs
 import logger
-from java.io import File, BufferedWriter, FileWriter
+from java.io import File, BufferedWriter, FileOutputStream, OutputStreamWriter, StringReader
+from java.lang import Boolean
 from java.util import Calendar
+from javax.xml.stream import XMLInputFactory, XMLOutputFactory, XMLStreamConstants
 
 ##############################################
 ########      VARIABLES             ##########
@@ -23,32 +21,167 @@ TIMESTAMP   = "%d%d%d%d%d%d%d" % (Calendar.getInstance().get(Calendar.YEAR)-2000
                                   Calendar.getInstance().get(Calendar.MILLISECOND)
                                   )
 
-def replace(str):
-    
-    # replace mode=""
-    str = re.sub("mode=\"\w+\"\s+", "", str)
-    
-    # replace mamId with ucmdb_id
-    str = re.sub("\smamId=\"", " ucmdb_id=\"", str)
-    
-    # replace empty attributes
-    str = re.sub("[\n|\s|\r]*<field name=\"\w+\" datatype=\"\w+\" />", "", str)
-    
-    # replace targetRelationshipClass with name
-    str = re.sub("\stargetRelationshipClass=\"", " name=\"", str)
-    
-    # replace Object with object
-    str = re.sub("<Object operation=\"", "<object operation=\"", str)
-    str = re.sub("<Object name=\"", "<object name=\"", str)
-    str = re.sub("</Object>", "</object>", str)
-    
-    # replace field to attribute
-    str = re.sub("<field name=\"", "<attribute name=\"", str)
-    str = re.sub("</field>", "</attribute>", str)
-    
-    logger.debug("String = %s" % str)
-    
-    return str
+# elements and attributes renamed in exported XML
+ELEMENT_NAMES = {'Object': 'object', 'field': 'attribute'}
+ATTRIBUTE_NAMES = {'mamId': 'ucmdb_id', 'targetRelationshipClass': 'name'}
+DROPPED_ATTRIBUTES = ('mode',)
+# field without value and with these attributes only is dropped
+EMPTY_FIELD_ATTRIBUTES = ('name', 'datatype')
+# output may continue in the next file after these elements
+SPLIT_ELEMENTS = ('Object', 'link')
+# amount of written objects and links between checks of file size
+SIZE_CHECK_INTERVAL = 500
+
+
+class ResultWriter:
+    """Writes XML to files of limited size, each file is a well-formed document.
+    When the limit is exceeded elements open at that moment are closed
+    and opened again in the next file.
+    The last file of the last chunk is marked as end of data on close.
+    """
+    def __init__(self, basePath, maxFileSize=0, isLastChunk=0):
+        self.basePath = basePath
+        self.maxFileSize = maxFileSize
+        self.isLastChunk = isLastChunk
+        self.fileNames = []
+        self.openElements = []
+        self.itemsCount = 0
+        self.__open()
+
+    def __open(self):
+        partSuffix = ""
+        if self.fileNames:
+            partSuffix = "-part%d" % (len(self.fileNames) + 1)
+        fileName = "%s%s.xml" % (self.basePath, partSuffix)
+        self.fileNames.append(fileName)
+        self.stream = FileOutputStream(fileName)
+        self.writer = BufferedWriter(OutputStreamWriter(self.stream, "UTF-8"))
+        self.xmlWriter = XMLOutputFactory.newInstance().createXMLStreamWriter(self.writer)
+        self.xmlWriter.writeStartDocument("UTF-8", "1.0")
+        for name, attributes in self.openElements:
+            self.__writeStartElement(self.xmlWriter.writeStartElement, name, attributes)
+
+    def __writeStartElement(self, writeFn, name, attributes):
+        writeFn(name)
+        for attrName, attrValue in attributes:
+            self.xmlWriter.writeAttribute(attrName, attrValue)
+
+    def startElement(self, name, attributes):
+        self.__writeStartElement(self.xmlWriter.writeStartElement, name, attributes)
+        self.openElements.append((name, attributes))
+
+    def emptyElement(self, name, attributes):
+        self.__writeStartElement(self.xmlWriter.writeEmptyElement, name, attributes)
+
+    def endElement(self):
+        self.xmlWriter.writeEndElement()
+        self.openElements.pop()
+
+    def characters(self, text):
+        self.xmlWriter.writeCharacters(text)
+
+    def cdata(self, text):
+        self.xmlWriter.writeCData(text)
+
+    def comment(self, text):
+        self.xmlWriter.writeComment(text)
+
+    def itemWritten(self):
+        """Continue in the next file if the current one exceeds the size limit"""
+        self.itemsCount += 1
+        if self.maxFileSize and not self.itemsCount % SIZE_CHECK_INTERVAL:
+            self.xmlWriter.flush()
+            self.writer.flush()
+            if self.stream.getChannel().position() >= self.maxFileSize:
+                for element in self.openElements:
+                    self.xmlWriter.writeEndElement()
+                self.__close()
+                self.__open()
+
+    def __close(self):
+        self.xmlWriter.writeEndDocument()
+        self.xmlWriter.close()
+        self.writer.close()
+
+    def close(self):
+        """@return: names of written files"""
+        self.__close()
+        if self.isLastChunk:
+            # the last file is known only when all data is written
+            lastFileName = self.fileNames[-1]
+            endOfDataFileName = "%s-EOD.xml" % lastFileName[:-len(".xml")]
+            if not File(lastFileName).renameTo(File(endOfDataFileName)):
+                raise Exception("Failed to mark end of data in %s" % lastFileName)
+            self.fileNames[-1] = endOfDataFileName
+        return self.fileNames
+
+    def abort(self):
+        """Close current file after failed write without marking end of data,
+        errors are only logged so they do not hide the failure
+        """
+        for closeable in (self.xmlWriter, self.writer):
+            try:
+                closeable.close()
+            except:
+                logger.debugException("Failed to close %s" % self.fileNames[-1])
+
+
+def transform(xml, resultWriter):
+    """Rename elements and attributes and drop empty fields in one pass over result XML"""
+    inputFactory = XMLInputFactory.newInstance()
+    inputFactory.setProperty(XMLInputFactory.SUPPORT_DTD, Boolean.FALSE)
+    inputFactory.setProperty(XMLInputFactory.IS_COALESCING, Boolean.TRUE)
+    reader = inputFactory.createXMLStreamReader(StringReader(xml))
+    # whitespace is written only when it does not precede dropped field
+    pendingWhitespace = []
+    try:
+        event = reader.next()
+        while event != XMLStreamConstants.END_DOCUMENT:
+            if event == XMLStreamConstants.CHARACTERS and reader.isWhiteSpace():
+                pendingWhitespace.append(reader.getText())
+                event = reader.next()
+                continue
+            if event == XMLStreamConstants.START_ELEMENT:
+                name = reader.getLocalName()
+                attributes = []
+                for index in range(reader.getAttributeCount()):
+                    attrName = reader.getAttributeLocalName(index)
+                    if attrName not in DROPPED_ATTRIBUTES:
+                        attributes.append((ATTRIBUTE_NAMES.get(attrName, attrName), reader.getAttributeValue(index)))
+                event = reader.next()
+                isEmptyElement = event == XMLStreamConstants.END_ELEMENT
+                if (isEmptyElement and name == 'field'
+                    and not [attr for attr, value in attributes if attr not in EMPTY_FIELD_ATTRIBUTES]):
+                    pendingWhitespace = []
+                    event = reader.next()
+                    continue
+                if pendingWhitespace:
+                    resultWriter.characters(''.join(pendingWhitespace))
+                    pendingWhitespace = []
+                if isEmptyElement:
+                    resultWriter.emptyElement(ELEMENT_NAMES.get(name, name), attributes)
+                    if name in SPLIT_ELEMENTS:
+                        resultWriter.itemWritten()
+                    event = reader.next()
+                else:
+                    resultWriter.startElement(ELEMENT_NAMES.get(name, name), attributes)
+                continue
+            if pendingWhitespace:
+                resultWriter.characters(''.join(pendingWhitespace))
+                pendingWhitespace = []
+            if event == XMLStreamConstants.END_ELEMENT:
+                resultWriter.endElement()
+                if reader.getLocalName() in SPLIT_ELEMENTS:
+                    resultWriter.itemWritten()
+            elif event == XMLStreamConstants.CHARACTERS or event == XMLStreamConstants.SPACE:
+                resultWriter.characters(reader.getText())
+            elif event == XMLStreamConstants.CDATA:
+                resultWriter.cdata(reader.getText())
+            elif event == XMLStreamConstants.COMMENT:
+                resultWriter.comment(reader.getText())
+            event = reader.next()
+    finally:
+        reader.close()
 
 
 def validateDirectory(Framework):
@@ -64,13 +197,11 @@ def isEmpty(xml, type = ""):
     objectsEmpty = 0
     linksEmpty = 0
     
-    m = re.findall("<objects />", xml)
-    if m:
+    if xml.find("<objects />") != -1:
         logger.debug("\t[%s] No objects found" % type)
         objectsEmpty = 1
         
-    m = re.findall("<links />", xml)
-    if m:
+    if xml.find("<links />") != -1:
         logger.debug("\t[%s] No links found" % type)
         linksEmpty = 1
         
@@ -79,16 +210,16 @@ def isEmpty(xml, type = ""):
     return 0
 
 
-def writeFile(expDirPath, queryName, type, result, isLastChunk):
-    endOfData = ""
-    if isLastChunk.lower() == 'true':
-        endOfData = "-EOD"
-    fileName = "%s/%s-%s-%s%s.xml" % (expDirPath, queryName, type, TIMESTAMP, endOfData)
-    with codecs.open(fileName, "w", "UTF-8") as file:
-        file.write(result)
-#    writer = BufferedWriter(FileWriter("%s/%s-%s-%s%s.xml" % (expDirPath, queryName, type, TIMESTAMP, endOfData)))
-#    writer.write(result)
-#    writer.close()
+def writeFile(expDirPath, queryName, type, result, isLastChunk, maxFileSize=0):
+    basePath = "%s/%s-%s-%s" % (expDirPath, queryName, type, TIMESTAMP)
+    resultWriter = ResultWriter(basePath, maxFileSize, (isLastChunk or '').lower() == 'true')
+    try:
+        transform(result, resultWriter)
+    except:
+        resultWriter.abort()
+        raise
+    fileNames = resultWriter.close()
+    logger.debug("\t[%s] Written to %d file(s)" % (type, len(fileNames)))
 
 
 
@@ -133,27 +264,27 @@ def DiscoveryMain(Framework):
     updateRefResult = Framework.getTriggerCIData('referencedUpdateResult')
     deleteRefResult = Framework.getTriggerCIData('referencedDeleteResult')
     queryName = Framework.getTriggerCIData('queryname')
+    # maximum size of single output file, 0 - no limit
+    maxFileSize = 0
+    try:
+        maxFileSize = int(Framework.getTriggerCIData('maxFileSizeMB') or 0) * 1024 * 1024
+    except:
+        logger.debug('maxFileSizeMB is not set, output files are not split')
 
-    logger.debug('addResult: ')
-    logger.debug(addResult)
-    logger.debug('updateResult: ')
-    logger.debug(updateResult)
-    logger.debug('deleteResult: ')
-    logger.debug(deleteResult)
+    logger.debug('addResult length: %d' % len(addResult or ''))
+    logger.debug('updateResult length: %d' % len(updateResult or ''))
+    logger.debug('deleteResult length: %d' % len(deleteResult or ''))
     
     # clean up XML
     empty = isEmpty(addResult, "addResult")
     if not empty:
-        addResult = replace(addResult)
-        writeFile(expDirPath, queryName, "addResult", addResult, isLastChunk)
+        writeFile(expDirPath, queryName, "addResult", addResult, isLastChunk, maxFileSize)
 
     empty = isEmpty(updateResult, "updateResult")
     if not empty:
-        updateResult = replace(updateResult)
-        writeFile(expDirPath, queryName, "updateResult", updateResult, isLastChunk)
+        writeFile(expDirPath, queryName, "updateResult", updateResult, isLastChunk, maxFileSize)
 
     empty = isEmpty(deleteResult, "deleteResult")
     if not empty:
-        deleteResult = replace(deleteResult)
-        writeFile(expDirPath, queryName, "deleteResult", deleteResult, isLastChunk)
+        writeFile(expDirPath, queryName, "deleteResult", deleteResult, isLastChunk, maxFileSize)
 
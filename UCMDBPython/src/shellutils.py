@@ -7,12 +7,13 @@ It is initialized with a Shell Client, and then uses the client to run commands
 from com.hp.ucmdb.discovery.probe.services.dynamic.core import DynamicServiceFrameworkImpl
 from com.hp.ucmdb.discovery.library.communication.downloader.cfgfiles import GeneralSettingsConfigFile
 from java.io import File
-from java.util import Properties, WeakHashMap
+from java.util import Properties, LinkedHashMap, UUID
 from java.util import Locale
 from java.nio.charset import Charset
 from java.nio import ByteBuffer
 from java.nio.charset import CodingErrorAction
 from java.lang import Exception as JavaException
+from java.lang import System
 from com.hp.ucmdb.discovery.library.common import CollectorsParameters
 from com.hp.ucmdb.discovery.library.clients.agents import NTCmdSessionAgent
 from com.hp.ucmdb.discovery.library.clients.agents.ssh import SSHAgent
@@ -34,6 +35,8 @@ import re
 import string
 import sys
 import codecs
+import copy
+import threading
 
 
 DDM_LINK_SYSTEM32_LOCATION = "%SystemDrive%"
@@ -67,6 +70,106 @@ class Command:
         return self.line
 
 
+class CommandCache:
+    '''Bounded LRU cache of executed commands with optional time to live.
+    Entries are keyed by command line, sudo mode and credential id.
+    Cache belongs to the shell instance, so all discoverers working with the same
+    shell share it; it also can be passed to another shell with Shell.setCommandCache
+    '''
+    DEFAULT_MAX_SIZE = 256
+    # time to live in seconds, 0 - entries never expire
+    DEFAULT_TTL = 0
+
+    def __init__(self, maxSize=None, ttl=None):
+        '''@types: int, int -> None
+        @param maxSize: maximal number of entries, defaults to shellCommandCacheSize global setting
+        @param ttl: time to live in seconds, defaults to shellCommandCacheTtl global setting
+        '''
+        if maxSize is None or ttl is None:
+            globalSettings = GeneralSettingsConfigFile.getInstance()
+            if maxSize is None:
+                maxSize = globalSettings.getPropertyIntegerValue('shellCommandCacheSize', CommandCache.DEFAULT_MAX_SIZE)
+            if ttl is None:
+                ttl = globalSettings.getPropertyIntegerValue('shellCommandCacheTtl', CommandCache.DEFAULT_TTL)
+        self.__maxSize = maxSize
+        self.__ttl = ttl * 1000L
+        # access-ordered map, eldest entry is the least recently used one
+        self.__entries = LinkedHashMap(16, 0.75, 1)
+        self.__lock = threading.RLock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __makeKey(self, cmdLine, useSudo, preserveSudoContext, credentialId):
+        '@types: str, bool, bool, str -> str'
+        return '%d|%d|%s|%s' % (useSudo and 1 or 0, preserveSudoContext and 1 or 0, credentialId or '', cmdLine)
+
+    def get(self, cmdLine, useSudo=1, preserveSudoContext=0, credentialId=None):
+        '''Get cached command or None if there is no entry or entry is expired
+        @types: str, bool, bool, str -> Command or None
+        '''
+        key = self.__makeKey(cmdLine, useSudo, preserveSudoContext, credentialId)
+        self.__lock.acquire()
+        try:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                command, timestamp = entry
+                if not self.__ttl or System.currentTimeMillis() - timestamp <= self.__ttl:
+                    self.__hits += 1
+                    return command
+                self.__entries.remove(key)
+            self.__misses += 1
+            return None
+        finally:
+            self.__lock.release()
+
+    def put(self, command, credentialId=None):
+        '''Cache executed command evicting least recently used entries over the limit
+        @types: Command, str -> None
+        '''
+        if self.__maxSize <= 0:
+            return
+        key = self.__makeKey(command.cmd, command.useSudo, command.preserveSudoContext, credentialId or command.cred_id)
+        self.__lock.acquire()
+        try:
+            self.__entries.put(key, (command, System.currentTimeMillis()))
+            while self.__entries.size() > self.__maxSize:
+                iterator = self.__entries.keySet().iterator()
+                iterator.next()
+                iterator.remove()
+                self.__evictions += 1
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        'Remove all entries, counters are preserved'
+        self.__lock.acquire()
+        try:
+            self.__entries.clear()
+        finally:
+            self.__lock.release()
+
+    def size(self):
+        '@types: -> int'
+        return self.__entries.size()
+
+    def getHits(self):
+        '@types: -> int'
+        return self.__hits
+
+    def getMisses(self):
+        '@types: -> int'
+        return self.__misses
+
+    def getEvictions(self):
+        '@types: -> int'
+        return self.__evictions
+
+    def __repr__(self):
+        return 'CommandCache(size=%s, maxSize=%s, hits=%s, misses=%s, evictions=%s)' % (
+                    self.size(), self.__maxSize, self.__hits, self.__misses, self.__evictions)
+
+
 class Language:
     r'''Language describes localized system configuration: locale, character sets,
     code pages etc'''
@@ -558,7 +661,8 @@ class Shell:
 
     def __init__(self, client):
         '@types: Client'
-        self.cmdCache = WeakHashMap()
+        #@deprecated: will be removed from public access, use getCommandCache instead
+        self.cmdCache = CommandCache()
         # class instance data members
         self.__client = client                # keep client connection object
         #@deprecated: will be removed from public access
@@ -568,6 +672,7 @@ class Shell:
         self.__lastCmdReturnCode = None       # terminate status of the last command executed
         self.__alternateCmdList = []        # list of alternative command
         self.__shellCmdSeparator = None
+        self.__cacheCredentialId = None
 
         #@deprecated: will be removed from public access
         self.winOs = self.isWinOs()
@@ -813,12 +918,12 @@ class Shell:
         @return: output of the executed shell command
         @raise Exception: Command execution does not produced output nor return code
         """
-        #We should keep this cache in client class(in java part or in the jython wrapper to the client)
-        if useCache and self.cmdCache.containsKey(cmdLine):
-            command = self.cmdCache.get(cmdLine)
-            self.__lastCmdReturnCode = command.returnCode
-            self.getLastCommandOutputBytes = command.outputInBytes
-            return command.output
+        if useCache:
+            command = self.cmdCache.get(cmdLine, useSudo, preserveSudoContext, credential_id or self.__getCacheCredentialId())
+            if command:
+                self.__lastCmdReturnCode = command.returnCode
+                self.getLastCommandOutputBytes = command.outputInBytes
+                return command.output
 
         if timeout and timeout < 1000:
             timeout = timeout * self.__defaultCommandTimeout
@@ -835,9 +940,73 @@ class Shell:
         self.__lastCmdReturnCode = command.returnCode
         self.getLastCommandOutputBytes = command.outputInBytes
 
-        self.cmdCache.put(cmdLine, command)
+        self.cmdCache.put(command, credential_id or self.__getCacheCredentialId())
         return command.output
 
+    def __getCacheCredentialId(self):
+        '@types: -> str or None'
+        if self.__cacheCredentialId is None:
+            try:
+                self.__cacheCredentialId = self.getCredentialId() or ''
+            except (JavaException, Exception):
+                self.__cacheCredentialId = ''
+        return self.__cacheCredentialId
+
+    def getCommandCache(self):
+        ''' Get cache of executed commands, it can be shared with other shells
+        connected to the same destination using setCommandCache
+        @types: -> CommandCache
+        '''
+        return self.cmdCache
+
+    def setCommandCache(self, commandCache):
+        '@types: CommandCache -> None'
+        self.cmdCache = commandCache
+
+    def execCmdBatch(self, commands, timeout=0, waitForTimeout=0, useSudo=1, checkErrCode=1, useCache=0, preserveSudoContext=0):
+        """ Executes several shell commands in one round trip to the destination.
+        Every command is followed by an echo of its exit status prefixed with a
+        unique per-command marker, so the combined output can be split back
+        into per-command results. Shells that cannot pipeline commands
+        execute them one by one.
+        @types: list(str or Command), int, int, bool, bool, bool, bool -> list(Command)
+        @param commands: command lines or prepared Command objects, in execution order
+        @param timeout: time in ms per command or if < 1ms treated as coefficient for predefined timeout
+        @return: Command objects with output and returnCode set, in the same order
+        @raise Exception: Command execution does not produced output nor return code
+        """
+        if timeout and timeout < 1000:
+            timeout = timeout * self.__defaultCommandTimeout
+
+        result = []
+        toExecute = []
+        for cmd in commands:
+            if isinstance(cmd, Command):
+                command = cmd
+            else:
+                command = Command(cmd)
+                command.executionTimeout = timeout
+                command.waitForTimeout = waitForTimeout
+                command.useSudo = useSudo
+                command.checkErrCode = checkErrCode
+                command.preserveSudoContext = preserveSudoContext
+            cachedCommand = useCache and self.cmdCache.get(command.cmd, command.useSudo, command.preserveSudoContext, command.cred_id or self.__getCacheCredentialId())
+            if cachedCommand:
+                command = cachedCommand
+            else:
+                toExecute.append(command)
+            result.append(command)
+
+        if toExecute:
+            for command in self._executeBatch(toExecute):
+                self.cmdCache.put(command, command.cred_id or self.__getCacheCredentialId())
+
+        if result:
+            lastCommand = result[-1]
+            self.__lastCmdReturnCode = lastCommand.returnCode
+            self.getLastCommandOutputBytes = lastCommand.outputInBytes
+        return result
+
     def _execute(self, command):
         ''' Template method for derived shells for exact command execution
         @types: Command -> Command
@@ -847,6 +1016,23 @@ class Shell:
         '''
         raise NotImplemented
 
+    def _executeBatch(self, commands):
+        ''' Template method for derived shells for pipelined execution of
+        several commands. By default commands are executed one by one.
+        @types: list(Command) -> list(Command)
+        @raise Exception
+        '''
+        return [self._execute(command) for command in commands]
+
+    def _getBatchTimeout(self, commands):
+        ''' Timeout for the whole batch is the sum of per-command timeouts
+        @types: list(Command) -> int
+        '''
+        timeout = 0
+        for command in commands:
+            timeout += command.executionTimeout or self.getDefaultCommandTimeout()
+        return timeout
+
     def execCmdAsBytes(self, cmdLine, timeout=0, waitForTimeout=0, useSudo=1):
         ''' Get raw data as list of bytes.
         @types: str, int, int, bool -> list(byte)'''
@@ -958,6 +1144,7 @@ class Shell:
 
     def closeClient(self):
         '''Perform cleaning of temporary data on destination system and close the client'''
+        logger.debug('Shell command cache statistics: %s' % self.cmdCache)
         self.__removeCopiedData()
         self.__client and self.__client.close()
 
@@ -1112,6 +1299,8 @@ class WinShell(Shell):
     DEFAULT_ENGLISH_CODEPAGE = 437
     DEFAULT_WIN_SHARE = 'admin$\\system32\\drivers\etc'
     __DEFAULT_COMMAND_SEPARATOR = '&'
+    # cmd.exe command line length limit is 8191 characters
+    __MAX_BATCH_LINE_LENGTH = 8000
     SHELL_COMMAND_PATTERN = '%%SystemRoot%%\\sysnative\\cmd.exe /c "echo . | powershell -EncodedCommand %s"'
     SHELL_COMMAND_PATTERN_SYSTEM32 = '%%SystemRoot%%\\system32\\cmd.exe /c "echo . | powershell -EncodedCommand %s"'
     ENCODED_COMMAND_PATTERN = 'powershell.exe -EncodedCommand %s'
@@ -1257,6 +1446,50 @@ class WinShell(Shell):
         cmd.output = output
         return cmd
 
+    def _executeBatch(self, commands):
+        '''Pipeline commands in one round trip. %ERRORLEVEL% is expanded by cmd.exe
+        when the whole line is parsed, so status is echoed through 'call' with
+        escaped variable to get it expanded after each command.
+        Marker is split by caret so echoed command line is not confused with the command output.
+        Commands are sent in chunks not exceeding cmd.exe command line length limit.
+        @types: list(Command) -> list(Command)
+        '''
+        for command in commands:
+            if command.cred_id and command.protocol_attrs:
+                return Shell._executeBatch(self, commands)
+        separator = self.getShellCmdSeperator()
+        statusVar = self.getShellStatusVar()
+        markers = _createBatchMarkers(len(commands))
+        cmdLines = []
+        for command, marker in zip(commands, markers):
+            if statusVar == '%ERRORLEVEL%':
+                echoStatus = 'call echo %s^%s%%^ERRORLEVEL%%' % (marker[:3], marker[3:])
+            else:
+                echoStatus = "echo '%s''%s'%s" % (marker[:3], marker[3:], statusVar)
+            cmdLines.append('%s %s %s' % (command.line, separator, echoStatus))
+
+        chunkStart = 0
+        while chunkStart < len(commands):
+            chunkEnd = chunkStart + 1
+            lineLength = len(cmdLines[chunkStart])
+            while (chunkEnd < len(commands)
+                   and lineLength + len(cmdLines[chunkEnd]) + 3 < WinShell.__MAX_BATCH_LINE_LENGTH):
+                lineLength += len(cmdLines[chunkEnd]) + 3
+                chunkEnd += 1
+            chunk = commands[chunkStart:chunkEnd]
+            batchLine = (' %s ' % separator).join(cmdLines[chunkStart:chunkEnd])
+            buff = self.__client.executeCmd(batchLine, self._getBatchTimeout(chunk), max([c.waitForTimeout for c in chunk]))
+            for command, (output, status) in zip(chunk, _splitBatchOutput(buff, markers[chunkStart:chunkEnd])):
+                try:
+                    command.returnCode = int(status)
+                    command.output = output
+                    command.outputInBytes = _encodeBatchOutput(output, self.getCharsetName())
+                except (TypeError, ValueError):
+                    logger.debug("Status of pipelined command '%s' is lost, executing it separately" % command.cmd)
+                    self._execute(command)
+            chunkStart = chunkEnd
+        return commands
+
     def deleteDirectoryViaShellCommand(self, dirPath):
         """ Delete directory
         @types: str
@@ -1708,12 +1941,8 @@ class PowerShell(WinShell):
         '''
 
         # PowershellConnector writes its output with utf8 encoding
-        isConsoleCommand = self.__isConsoleCommand(cmdLine)
-        if isConsoleCommand:
-            cmdLine = self.__makePowerShellCompatible(cmdLine)
-        elif pipeToOutString:
-            cmdLine = self.__pipeToOutString(cmdLine, lineWidth)
-        cmdLine = self.__makePowerShellCompatibleWmicQuery(cmdLine)
+        cmdLine, isConsoleCommand = self.__prepareCmdLine(cmdLine, lineWidth,
+                                                          pipeToOutString)
         cmdLine = PowerShell.__INVOKE_COMMAND_SCRIPT_BLOCK % cmdLine
         output = Shell.execCmd(self, cmdLine, timeout, waitForTimeout, useSudo,
                                checkErrCode, useCache)
@@ -1722,6 +1951,60 @@ class PowerShell(WinShell):
                                         self.__consoleCharsetName, output)
         return output
 
+    def __prepareCmdLine(self, cmdLine, lineWidth, pipeToOutString):
+        '''Make command line executable in the powershell script block
+        @types: str, int, bool -> str, bool
+        @return: prepared command line and whether it is a console command
+        '''
+        isConsoleCommand = self.__isConsoleCommand(cmdLine)
+        if isConsoleCommand:
+            cmdLine = self.__makePowerShellCompatible(cmdLine)
+        elif pipeToOutString:
+            cmdLine = self.__pipeToOutString(cmdLine, lineWidth)
+        cmdLine = self.__makePowerShellCompatibleWmicQuery(cmdLine)
+        return cmdLine, isConsoleCommand
+
+    def execCmdBatch(self, commands, timeout=0, waitForTimeout=0, useSudo=1,
+                     checkErrCode=1, useCache=0, lineWidth=80,
+                     pipeToOutString=1):
+        ''' Execute several commands in one Invoke-Command script block.
+        Commands are prepared the same way as in execCmd
+        @types: list(str), int, int, bool, bool, bool, int, bool -> list(Command)
+        @see: Shell.execCmdBatch, PowerShell.execCmd
+        '''
+        if timeout and timeout < 1000:
+            timeout = timeout * self.getDefaultCommandTimeout()
+        preparedCommands = []
+        consoleCommands = {}
+        for cmdLine in commands:
+            cmdLine, isConsoleCommand = self.__prepareCmdLine(cmdLine,
+                                                              lineWidth,
+                                                              pipeToOutString)
+            # cached under the script block line as in execCmd, while the
+            # line itself is joined with others into one script block
+            command = Command(PowerShell.__INVOKE_COMMAND_SCRIPT_BLOCK % cmdLine)
+            command.line = cmdLine
+            command.executionTimeout = timeout
+            command.waitForTimeout = waitForTimeout
+            command.useSudo = useSudo
+            command.checkErrCode = checkErrCode
+            preparedCommands.append(command)
+            if isConsoleCommand:
+                consoleCommands[command.cmd] = 1
+        result = []
+        for command in Shell.execCmdBatch(self, preparedCommands, timeout,
+                                          waitForTimeout, useSudo,
+                                          checkErrCode, useCache):
+            if consoleCommands.has_key(command.cmd) and command.output:
+                # cached command keeps the original output, as in execCmd
+                command = copy.copy(command)
+                command.output = self.__fixEncoding(
+                                        self.__powershellConsoleCharsetName,
+                                        self.__consoleCharsetName,
+                                        command.output)
+            result.append(command)
+        return result
+
     def execLocalScript(self, path, timeout=0, waitForTimeout=0, useSudo=1,
                         checkErrCode=1, useCache=0):
         ''' Execute script on the probe
@@ -1766,6 +2049,36 @@ class PowerShell(WinShell):
         cmd.output = self.__outputHandler.cleanOutput(output, cmd.returnCode)
         return cmd
 
+    def _executeBatch(self, commands):
+        '''Execute commands in one script block. Status of each command is
+        stored right after its execution and written with per-command marker.
+        Marker is concatenated from two parts so echoed script block is not
+        confused with the command output.
+        @types: list(Command) -> list(Command)
+        '''
+        markers = _createBatchMarkers(len(commands))
+        cmdLines = []
+        for command, marker in zip(commands, markers):
+            cmdLines.append("%s ;$ddmBatchStatus = $? ;'%s' + '%s' + $ddmBatchStatus"
+                            % (command.line, marker[:3], marker[3:]))
+        batchLine = PowerShell.__INVOKE_COMMAND_SCRIPT_BLOCK % ' ;'.join(cmdLines)
+        buff = self.__client.executeCmd(batchLine,
+                                        self._getBatchTimeout(commands),
+                                        max([c.waitForTimeout for c in commands]))
+        for command, (output, status) in zip(commands, _splitBatchOutput(buff, markers)):
+            if status == PowerShellOutputHandler.POWERSHELL_CMD_SUCCESS:
+                command.returnCode = 0
+            elif status == PowerShellOutputHandler.POWERSHELL_CMD_FAILED:
+                command.returnCode = 1
+            else:
+                logger.debug("Status of pipelined command '%s' is lost, executing it separately" % command.cmd)
+                command.line = PowerShell.__INVOKE_COMMAND_SCRIPT_BLOCK % command.line
+                self._execute(command)
+                continue
+            command.output = output.strip()
+            command.outputInBytes = _encodeBatchOutput(command.output, self.getCharsetName())
+        return commands
+
     def __fixEncoding(self, fromEncoding, toEncoding, targetStr):
         '''Method is intended to fix string encoding. The root problem comes
         from execution of console commands through the powershell.
@@ -2126,6 +2439,68 @@ class UnixShell(Shell):
 
         return self.__executeCommand(command)
 
+    def _executeBatch(self, commands):
+        '''Pipeline commands in one round trip. Each command is followed by
+        echo of its exit status prefixed with per-command marker. Marker is
+        split by quotes in the command line, so echoed command line is not
+        confused with the command output.
+        Commands requiring su or generic privileged mode switch the session
+        state, in this case (and for shells with limited command length) all
+        commands are executed one by one to keep execution order.
+        @types: list(Command) -> list(Command)
+        '''
+        if self.__isLimitedCommandLength():
+            return Shell._executeBatch(self, commands)
+        sudoSuPolicy = self.__getSudoSuPolicy()
+        useCustomMode = self.__shouldUseCustomPrivilegedModeExecutionPolicy()
+        # commands are not changed till it is known they are pipelined
+        sudoLines = {}
+        retryWithSudo = []
+        for command in commands:
+            cmd = command.line
+            if useCustomMode and self.__shouldRunInPrivMode(command):
+                return Shell._executeBatch(self, commands)
+            if command.useSudo:
+                if self.__client.supportsSudo() and sudoSuPolicy != UnixShell.ONLY_SU_POLICY and self.__canUseSudo(cmd):
+                    if self.__sudoListCommandsSuccess:
+                        sudoLines[command] = self.__prepareCmdForSudo(cmd, command.preserveSudoContext)
+                    else:
+                        retryWithSudo.append(command)
+                elif sudoSuPolicy != UnixShell.ONLY_SUDO_POLICY and self.__canUseSu(cmd):
+                    return Shell._executeBatch(self, commands)
+        for command, sudoLine in sudoLines.items():
+            command.line = sudoLine
+
+        separator = self.getShellCmdSeperator()
+        statusVar = self.getShellStatusVar()
+        markers = _createBatchMarkers(len(commands))
+        cmdLines = []
+        for command, marker in zip(commands, markers):
+            echoMarker = "'%s''%s'" % (marker[:3], marker[3:])
+            cmdLines.append('%s %s echo %s%s' % (command.line, separator, echoMarker, statusVar))
+        batchLine = (' %s ' % separator).join(cmdLines)
+
+        buff = self.__client.executeCmd(batchLine, self._getBatchTimeout(commands), max([c.waitForTimeout for c in commands]))
+        for command, (output, status) in zip(commands, _splitBatchOutput(buff, markers)):
+            if status is None:
+                logger.debug("Status of pipelined command '%s' is lost, executing it separately" % command.cmd)
+                self.__executeCommand(command)
+                continue
+            command.output = output
+            command.outputInBytes = _encodeBatchOutput(output, self.getCharsetName())
+            try:
+                command.returnCode = int(status)
+            except ValueError:
+                logger.debug("Failed to process errorcode value: %s" % status)
+                command.returnCode = Shell.NO_CMD_RETURN_CODE_ERR_NUMBER
+
+        # in case sudo -l failed commands are tried both without and with sudo prefix
+        for command in retryWithSudo:
+            if command.returnCode != 0:
+                command.line = self.__prepareCmdForSudo(command.cmd, command.preserveSudoContext)
+                self.__executeCommand(command)
+        return commands
+
     def __retrieveSudoDetails(self):
         '''Get information about sudo paths and sudo enabled commands'''
         sudoPaths = self.__client.getSudoPaths()
@@ -2353,6 +2728,56 @@ def _extractCommandOutputAndReturnCode(buffer):
     raise ValueError("No return code information found")
 
 
+BATCH_MARKER_PREFIX = 'DDM_BATCH_'
+
+
+def _createBatchMarkers(count):
+    r''' Create unique per-command markers for pipelined command execution.
+    Markers share random token so output of previous batches or files
+    containing marker-like strings cannot be confused with current batch
+    @types: int -> list(str)
+    '''
+    token = str(UUID.randomUUID()).replace('-', '')[:12]
+    return ['%s%s_%d:' % (BATCH_MARKER_PREFIX, token, index)
+            for index in range(count)]
+
+
+def _splitBatchOutput(buffer, markers):
+    r''' Split output of pipelined commands by per-command markers.
+    Each marker is expected to be followed by the command status on the
+    same line. Status is None for commands whose marker is not found
+    (for instance output was truncated by timeout)
+    @types: str, list(str) -> list((str or None, str or None))
+    '''
+    results = []
+    position = 0
+    buffer = buffer or ''
+    for marker in markers:
+        markerIndex = buffer.find(marker, position)
+        if markerIndex == -1:
+            results.append((None, None))
+            continue
+        output = buffer[position:markerIndex]
+        statusStart = markerIndex + len(marker)
+        lineEnd = buffer.find('\n', statusStart)
+        if lineEnd == -1:
+            lineEnd = len(buffer)
+        status = buffer[statusStart:lineEnd].strip()
+        position = lineEnd + 1
+        results.append((output, status))
+    return results
+
+
+def _encodeBatchOutput(output, charsetName):
+    r''' Bytes of the command output split from pipelined output. Client returns
+    bytes of the whole batch only, so output is encoded back by the shell charset
+    @types: str, str or None -> array(byte)
+    '''
+    if charsetName:
+        return String(output).getBytes(charsetName)
+    return String(output).getBytes()
+
+
 class MacShell(UnixShell):
     def getAvailableEngLocale(self):
         return "C"
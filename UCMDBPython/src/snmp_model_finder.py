@@ -900,6 +900,92 @@ class ModelTypeHelper(SnmpHelper):
             return re.search(pattern, target)
 
 
+class OidPrefixTrie(object):
+    """
+    A character trie of sys object id prefixes to find the longest prefix an oid starts with
+    """
+
+    def __init__(self, prefixToTypes=None):
+        super(OidPrefixTrie, self).__init__()
+        self.__root = {}
+        if prefixToTypes:
+            for prefixes, types in prefixToTypes.items():
+                if isinstance(prefixes, str):
+                    prefixes = (prefixes,)
+                for prefix in prefixes:
+                    self.add(prefix, types)
+
+    def add(self, prefix, types):
+        node = self.__root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = types
+
+    def longestPrefixTypes(self, oid):
+        node = self.__root
+        types = node.get(None)
+        for char in oid:
+            node = node.get(char)
+            if node is None:
+                break
+            types = node.get(None, types)
+        return types
+
+
+class DescRegexMatcher(object):
+    """
+    Combines description regexes to single regex, so a description is scanned once.
+    Longer patterns go first as more specific ones
+    """
+
+    def __init__(self, patternToTypes):
+        super(DescRegexMatcher, self).__init__()
+        self.__groupTypes = []
+        groups = []
+        patterns = patternToTypes.keys()
+        patterns.sort(lambda x, y: cmp(len(y), len(x)) or cmp(x, y))
+        for index, pattern in enumerate(patterns):
+            groupName = 'p%s' % index
+            groups.append('(?P<%s>%s)' % (groupName, pattern))
+            self.__groupTypes.append((groupName, patternToTypes[pattern]))
+        self.__regex = groups and re.compile('|'.join(groups))
+
+    def match(self, desc):
+        if self.__regex and desc:
+            matchObj = self.__regex.search(desc)
+            if matchObj:
+                for groupName, types in self.__groupTypes:
+                    if matchObj.group(groupName) is not None:
+                        return types
+        return None
+
+
+OID_PREFIX_TRIE = OidPrefixTrie(OID_START_WITH_TO_MODEL)
+DESC_REGEX_MATCHER = DescRegexMatcher(DESC_REGEX_TO_MODEL)
+
+# memoized results of table lookups per (sysOid, desc), special case handlers are not cached as they query the device
+_STATIC_MATCH_CACHE = {}
+STATIC_MATCH_CACHE_MAX_SIZE = 10000
+
+
+def getStaticModelTypes(sysOid, desc):
+    """
+    Match oid and description against model tables
+    -> (oid equal types, oid start with types, desc equal types, desc regex types)
+    """
+    key = (sysOid, desc)
+    result = _STATIC_MATCH_CACHE.get(key)
+    if result is None:
+        result = (sysOid and OID_TO_MODEL.get(sysOid),
+                  sysOid and OID_PREFIX_TRIE.longestPrefixTypes(sysOid),
+                  desc and DESC_TO_MODEL.get(desc),
+                  desc and DESC_REGEX_MATCHER.match(desc))
+        if len(_STATIC_MATCH_CACHE) >= STATIC_MATCH_CACHE_MAX_SIZE:
+            _STATIC_MATCH_CACHE.clear()
+        _STATIC_MATCH_CACHE[key] = result
+    return result
+
+
 class ModelTypeMatcher(ModelTypeHelper):
     """
     A class to try get model types of a host from snmp by trying different solutions,
@@ -909,10 +995,13 @@ class ModelTypeMatcher(ModelTypeHelper):
     def __init__(self, stateHolder, snmpQueryHelper):
         super(ModelTypeMatcher, self).__init__(stateHolder, snmpQueryHelper)
 
+    def _getStaticModelTypes(self):
+        return getStaticModelTypes(self.snmpStateHolder.sysOid, self.snmpStateHolder.desc)
+
     def _match_oid_equal(self):
         logger.debug('execute match oid by equal')
         if self.snmpStateHolder.sysOid:
-            return OID_TO_MODEL.get(self.snmpStateHolder.sysOid)
+            return self._getStaticModelTypes()[0]
 
     def _addToModel(self, types):
         if types:
@@ -938,33 +1027,22 @@ class ModelTypeMatcher(ModelTypeHelper):
     def _match_desc_equal(self):
         logger.debug('execute match desc by equal')
         if self.snmpStateHolder.desc:
-            return DESC_TO_MODEL.get(self.snmpStateHolder.desc)
+            return self._getStaticModelTypes()[2]
 
     def _match_oid_start_with(self):
         logger.debug('execute match oid by start with')
         if not self.snmpStateHolder.sysOid:
             return None
-        matches = OID_START_WITH_TO_MODEL
-        for oidKey, types in matches.items():
-            oids = []
-            if isinstance(oidKey, str):
-                oids = [oidKey]
-            elif isinstance(oidKey, tuple):
-                oids = oidKey
-
-            if self._s(*oids):
-                return types
+        types = self._getStaticModelTypes()[1]
+        if types:
+            return types
         return ExtraOidStartWithSpecialCaseHandler(self).handle()
 
     def _match_desc_regex(self):
         logger.debug('execute match desc by regex')
         if not self.snmpStateHolder.desc:
             return None
-        matches = DESC_REGEX_TO_MODEL
-        for pattern, types in matches.items():
-            if self._r(pattern):
-                return types
-        return None
+        return self._getStaticModelTypes()[3]
 
     def _extra_patterns(self):
         return CustomSpecialCaseHandler(self).handle()
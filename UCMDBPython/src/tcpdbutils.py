@@ -36,6 +36,28 @@ class PortToProcess(discoverydbutils.DiscoveryDbEntity):
 	FROM new_values
 	WHERE NOT EXISTS (SELECT 1 FROM upsert)'''
 
+	BULKSQL  = '''
+	WITH new_values(hostid, ipaddress, port, pid, Protocol, listen, ProcessName, stamp)
+	AS (VALUES %s),
+	upsert AS (UPDATE Port_Process p
+			SET hostid = nv.hostid,
+			listen = nv.listen,
+			ProcessName = nv.ProcessName,
+			stamp = nv.stamp,
+			pid = CASE WHEN nv.pid > 0 THEN nv.pid else p.pid END
+			FROM new_values AS nv
+			WHERE p.ipaddress = nv.ipaddress AND p.port = nv.port
+			AND p.pid = nv.pid AND p.protocol = nv.protocol AND p.listen = nv.listen
+			RETURNING p.ipaddress, p.port, p.pid, p.protocol, p.listen
+	)
+	INSERT INTO Port_Process(hostid, ipaddress, port, pid, Protocol, listen, ProcessName, stamp)
+	SELECT hostid, ipaddress, port, pid, Protocol, listen, ProcessName, stamp
+	FROM new_values AS nv
+	WHERE NOT EXISTS (SELECT 1 FROM upsert u
+			WHERE u.ipaddress = nv.ipaddress AND u.port = nv.port
+			AND u.pid = nv.pid AND u.protocol = nv.protocol AND u.listen = nv.listen)'''
+	BULKROW = '(?,?,?,?,?,?,?,?)'
+
 	def __init__(self, hostid, ip, port, pid, protocol, listen, ProcessName):
 		self.hostid = hostid
 		self.ip = ip
@@ -51,15 +73,21 @@ class PortToProcess(discoverydbutils.DiscoveryDbEntity):
 	def getInsertSQL(self):
 		return PortToProcess.PREPAREDSQL
 
-	def setValues(self, statement):
-		statement.setString(1, self.hostid)
-		statement.setString(2, self.ip)
-		statement.setInt(3, self.port)
-		statement.setInt(4, self.pid)
-		statement.setInt(5, self.protocol)
-		statement.setBoolean(6, self.listen)
-		statement.setString(7, self.ProcessName)
-		statement.setLong(8, System.currentTimeMillis())
+	def getBulkInsertSQL(self, rowsCount):
+		return PortToProcess.BULKSQL % discoverydbutils.buildValuesRows(PortToProcess.BULKROW, rowsCount)
+
+	def getKey(self):
+		return (self.ip, self.port, self.pid, self.protocol, self.listen)
+
+	def setValues(self, statement, offset = 0):
+		statement.setString(offset + 1, self.hostid)
+		statement.setString(offset + 2, self.ip)
+		statement.setInt(offset + 3, self.port)
+		statement.setInt(offset + 4, self.pid)
+		statement.setInt(offset + 5, self.protocol)
+		statement.setBoolean(offset + 6, self.listen)
+		statement.setString(offset + 7, self.ProcessName)
+		statement.setLong(offset + 8, System.currentTimeMillis())
 
 class TcpConnection(discoverydbutils.DiscoveryDbEntity):
 	DELETESQL = 'delete from %s where hostid=\'%s\' and stamp < NOW() - INTERVAL \'%s hours\''
@@ -83,6 +111,27 @@ class TcpConnection(discoverydbutils.DiscoveryDbEntity):
 	FROM new_values
 	WHERE NOT EXISTS (SELECT 1 from upsert)
 	'''
+
+	BULKSQL  = '''
+	WITH new_values (RouterIP, SysUptime, SrcAddr, DstAddr, SrcPort, DstPort, Tcp_Flags, Prot, Stamp, hostid)
+	AS (VALUES %s),
+	upsert AS (UPDATE Agg_V5 p
+	SET Stamp=now(),
+	SysUptime = nv.SysUptime
+	FROM new_values as nv
+	WHERE p.srcaddr = nv.srcaddr AND p.dstaddr = nv.dstaddr
+		AND p.srcport = nv.srcport AND p.dstport = nv.dstport AND p.prot = nv.prot
+	RETURNING p.srcaddr, p.dstaddr, p.srcport, p.dstport, p.prot
+	)
+	INSERT INTO Agg_V5 (RouterIP, SysUptime, SrcAddr, DstAddr, SrcPort, DstPort, Tcp_Flags, Prot, Stamp, hostid)
+	SELECT RouterIP, SysUptime, SrcAddr, DstAddr, SrcPort, DstPort, Tcp_Flags, Prot, Stamp, hostid
+	FROM new_values as nv
+	WHERE NOT EXISTS (SELECT 1 from upsert u
+		WHERE u.srcaddr = nv.srcaddr AND u.dstaddr = nv.dstaddr
+		AND u.srcport = nv.srcport AND u.dstport = nv.dstport AND u.prot = nv.prot)
+	'''
+	BULKROW = "('TCP_Discoverer', ?, ?, ?, ?, ?, 16, 6, now(), ?)"
+
 	def __init__(self, hostid, srcAddr, dstAddr, srcPort, dstPort):
 		self.hostid = hostid
 		self.srcAddr = srcAddr
@@ -96,13 +145,19 @@ class TcpConnection(discoverydbutils.DiscoveryDbEntity):
 	def getInsertSQL(self):
 		return TcpConnection.PREPAREDSQL
 
-	def setValues(self, statement):
-		statement.setLong(1, System.currentTimeMillis())
-		statement.setString(2, self.srcAddr)
-		statement.setString(3, self.dstAddr)
-		statement.setInt(4, self.srcPort)
-		statement.setInt(5, self.dstPort)
-		statement.setString(6, self.hostid)
+	def getBulkInsertSQL(self, rowsCount):
+		return TcpConnection.BULKSQL % discoverydbutils.buildValuesRows(TcpConnection.BULKROW, rowsCount)
+
+	def getKey(self):
+		return (self.srcAddr, self.dstAddr, self.srcPort, self.dstPort)
+
+	def setValues(self, statement, offset = 0):
+		statement.setLong(offset + 1, System.currentTimeMillis())
+		statement.setString(offset + 2, self.srcAddr)
+		statement.setString(offset + 3, self.dstAddr)
+		statement.setInt(offset + 4, self.srcPort)
+		statement.setInt(offset + 5, self.dstPort)
+		statement.setString(offset + 6, self.hostid)
 
 
 class TcpDbUtils(discoverydbutils.DiscoveryDbUtils):
@@ -490,6 +490,8 @@ def DiscoveryMain(Framework):
 
     if not isDiscoverySuccess or OSHVResult.size() == 0:
         Framework.reportError('Failed to discover Apache Tomcat. See logs')
+    elif discoverer.fileMonitor is not None and discoverer.fileMonitor.contentFingerprints is not None:
+        discoverer.fileMonitor.sendResults(OSHVResult)
 
     return OSHVResult
 
@@ -1,8 +1,9 @@
 __author__ = 'gongze'
+import threading
 import time
-import urllib2
 
 import logger
+import http_keep_alive
 from ucs_base import Request, Response, UCSError
 
 
@@ -11,15 +12,6 @@ CACHE_READ = False
 CACHE_WRITE = False
 
 
-class RequestWithMethod(urllib2.Request):
-    def __init__(self, method, *args, **kwargs):
-        self._method = method
-        urllib2.Request.__init__(self, *args, **kwargs)
-
-    def get_method(self):
-        return self._method if self._method else urllib2.Request.get_method(self)
-
-
 class UCSCache():
     @classmethod
     def get_key(cls, req):
@@ -85,8 +77,9 @@ class UCSCache():
 class TrustAllCert:
     SSL_INITED = False
     TRUST_ALL_CONTEXT = None
+    TRUST_ALL_SOCKET_FACTORY = None
     DEFAULT_CONTEXT = None
-    trustAllCertificates = False
+    TRUST_ALL_ENABLED = False
 
     @classmethod
     def initSSL(cls):
@@ -119,35 +112,20 @@ class TrustAllCert:
         # Keep a static reference to the JVM's default SSLContext for restoring at a later time
         cls.DEFAULT_CONTEXT = SSLContext.getDefault()
         cls.TRUST_ALL_CONTEXT = TRUST_ALL_CONTEXT
+        # single factory instance, so kept-alive connections are reused
+        cls.TRUST_ALL_SOCKET_FACTORY = TRUST_ALL_CONTEXT.getSocketFactory()
         cls.SSL_INITED = True
 
     @classmethod
-    def enableTrustAllCertificates(cls, enable=True):
-        cls.trustAllCertificates = enable
-
-    @classmethod
-    def _enableTrustAllCertificates(cls, enable=True):
-        logger.info('Enable trust all certs')
-        cls.initSSL()
-        from javax.net.ssl import SSLContext
-
-        if enable and TrustAllCert.TRUST_ALL_CONTEXT:
-            SSLContext.setDefault(TrustAllCert.TRUST_ALL_CONTEXT)
-        elif TrustAllCert.DEFAULT_CONTEXT:
-            SSLContext.setDefault(TrustAllCert.DEFAULT_CONTEXT)
+    def getSocketFactory(cls):
+        '''Socket factory trusting all certificates if it is enabled, otherwise None'''
+        if cls.TRUST_ALL_ENABLED:
+            cls.initSSL()
+            return cls.TRUST_ALL_SOCKET_FACTORY
 
     @classmethod
-    def trustAllCertificates(cls, f):
-        def wrapper(*args):
-            try:
-                if cls.trustAllCertificates:
-                    cls._enableTrustAllCertificates(True)
-                return f(*args)
-            finally:
-                if cls.trustAllCertificates:
-                    cls._enableTrustAllCertificates(False)
-
-        return wrapper
+    def enableTrustAllCertificates(cls, enable=True):
+        cls.TRUST_ALL_ENABLED = enable
 
 
 class XmlClient(object):
@@ -157,26 +135,16 @@ class XmlClient(object):
 
     @classmethod
     @UCSCache.ucs_cache
-    @TrustAllCert.trustAllCertificates
     def request(cls, method, url, request=None, headers=None):
         headers = headers or {}
         data = request.toXml()
-        req = RequestWithMethod(method, url, data, headers)
         if VERBOSE:
-            print req.get_method(), req.get_full_url(), request.name
-        try:
-            class NoRedirect(urllib2.HTTPRedirectHandler):
-                def redirect_request(self, req, fp, code, msg, hdrs, newurl):
-                    pass
-
-            opener = urllib2.build_opener(NoRedirect)
-            urllib2.install_opener(opener)
-            res = urllib2.urlopen(req)
-            body = res.read()
-            if VERBOSE:
-                print body
-        except urllib2.HTTPError, e:
-            raise e
+            print method, url, request.name
+        # connection is kept alive for next requests, redirects are not followed
+        body = http_keep_alive.request(method, url, data, headers,
+                                       TrustAllCert.getSocketFactory(), followRedirects=False)
+        if VERBOSE:
+            print body
 
         if body:
             body = body.strip()
@@ -190,6 +158,7 @@ class UCSClient(object):
         self.cookie = None
         self.expireTime = 0
         self.alivePeriod = 600
+        self.__keepAliveLock = threading.Lock()
         if trustAllCerts:
             self.trustAllCerts = True
         else:
@@ -198,8 +167,13 @@ class UCSClient(object):
 
     def keepClientAlive(self, request):
         if self.cookie and request.name != 'aaaKeepAlive':
-            if self.expireTime - time.time() < 10:  # send keep alive request 10 seconds before expiration
-                self.keepAlive()
+            # requests may be sent from several threads, session is refreshed once
+            self.__keepAliveLock.acquire()
+            try:
+                if self.expireTime - time.time() < 10:  # send keep alive request 10 seconds before expiration
+                    self.keepAlive()
+            finally:
+                self.__keepAliveLock.release()
 
     def toResponse(self, content):
         response = Response()
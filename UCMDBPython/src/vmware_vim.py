@@ -62,6 +62,18 @@ class GlobalConfig:
     Parameter 'reportBasicTopology':
         - default value is false
         - when enabled, only physical to virtual realations are reported, which includes ESX, VM and links between them
+
+    Parameter 'retrieveInventoryInBulk':
+        - default value is false
+        - when enabled, datacenters, compute resources, hosts, resource pools and VMs are retrieved
+        with one container view per type in pages of 'bulkRetrievalPageSize' objects (API 4.1 and later)
+
+    Parameter 'syncTopologyIncrementally':
+        - default value is false
+        - when enabled, only entities changed since previous run are reported, changes are found by
+        comparing tracked properties (VM config.changeVersion, power state, parents etc.) with values
+        kept from previous run, full sync is made every 'fullSyncIntervalHours' hours (default 24)
+        or when compute resources are added or removed (API 4.1 and later)
     """
 
     PATTERN_PARAM_REPORT_POWEREDOFF_VMS = 'reportPoweredOffVMs'
@@ -70,6 +82,16 @@ class GlobalConfig:
 
     PATTERN_PARAM_REPORT_LAYER2_CONNECTION = 'reportLayer2connection'
 
+    PATTERN_PARAM_RETRIEVE_INVENTORY_IN_BULK = 'retrieveInventoryInBulk'
+
+    PATTERN_PARAM_BULK_RETRIEVAL_PAGE_SIZE = 'bulkRetrievalPageSize'
+
+    PATTERN_PARAM_SYNC_TOPOLOGY_INCREMENTALLY = 'syncTopologyIncrementally'
+
+    PATTERN_PARAM_FULL_SYNC_INTERVAL_HOURS = 'fullSyncIntervalHours'
+
+    DEFAULT_FULL_SYNC_INTERVAL_HOURS = 24
+
     def __init__(self, framework):
         
         self._reportPoweredOffVms = self._parseBoolean(framework.getParameter(GlobalConfig.PATTERN_PARAM_REPORT_POWEREDOFF_VMS), 0)
@@ -83,6 +105,18 @@ class GlobalConfig:
         self._reportlayer2connection = self._parseBoolean(framework.getParameter(GlobalConfig.PATTERN_PARAM_REPORT_LAYER2_CONNECTION), 0)
         if self._reportlayer2connection:
             logger.debug("report reportLayer2connection")
+
+        self._retrieveInventoryInBulk = self._parseBoolean(framework.getParameter(GlobalConfig.PATTERN_PARAM_RETRIEVE_INVENTORY_IN_BULK), 0)
+        if self._retrieveInventoryInBulk:
+            logger.debug("Inventory will be retrieved in bulk")
+
+        self._bulkRetrievalPageSize = self._parseInt(framework.getParameter(GlobalConfig.PATTERN_PARAM_BULK_RETRIEVAL_PAGE_SIZE), None)
+
+        self._syncTopologyIncrementally = self._parseBoolean(framework.getParameter(GlobalConfig.PATTERN_PARAM_SYNC_TOPOLOGY_INCREMENTALLY), 0)
+        if self._syncTopologyIncrementally:
+            logger.debug("Topology will be synchronized incrementally")
+
+        self._fullSyncIntervalHours = self._parseInt(framework.getParameter(GlobalConfig.PATTERN_PARAM_FULL_SYNC_INTERVAL_HOURS), GlobalConfig.DEFAULT_FULL_SYNC_INTERVAL_HOURS)
     
     def _parseBoolean(self, value, defaultValue):
         if value is not None:
@@ -92,6 +126,14 @@ class GlobalConfig:
                 return 0
         return defaultValue
 
+    def _parseInt(self, value, defaultValue):
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                logger.warn("Invalid integer value '%s', default is used" % value)
+        return defaultValue
+
     def reportPoweredOffVms(self):
         return self._reportPoweredOffVms
     
@@ -101,6 +143,18 @@ class GlobalConfig:
     def reportlayer2connection(self):
         return self._reportlayer2connection
 
+    def retrieveInventoryInBulk(self):
+        return self._retrieveInventoryInBulk
+
+    def getBulkRetrievalPageSize(self):
+        return self._bulkRetrievalPageSize
+
+    def syncTopologyIncrementally(self):
+        return self._syncTopologyIncrementally
+
+    def getFullSyncIntervalHours(self):
+        return self._fullSyncIntervalHours
+
 
 class ClientFactory:
     """
@@ -32,6 +32,7 @@ def discoverVcenterTopology(context, framework):
     
     topologyDiscoverer = module.getTopologyDiscoverer(agent, apiType, ccHelper, framework, config)
     topologyDiscoverer.setLicensingDiscoverer(licensingDiscoverer)
+    topologyDiscoverer.setUpdateStateKey("%s|%s" % (context.urlString, context.credentialsId))
     
     topologyReporter = module.getTopologyReporter(apiType, ccHelper, framework, config)
     topologyReporter.setLicensingReporter(licensingReporter)
@@ -1289,11 +1289,15 @@ class ApplicationDiscovererByJmx(HasPlatformTraitOfVersionAboveV8,
             applicationName = objectName.getKeyProperty('ApplicationRuntime')
             if applicationName == application.getName():
                 modules.append(module)
-                try:
-                    for entry in self.findEntriesForEjbModule(module):
-                        module.addEntry(entry)
-                except (Exception, JException):
-                    logger.warnException("Failed to find entries for: %s" % module)
+        # entries of all modules are queried in one batch
+        queries = map(self._buildEjbEntriesQuery, modules)
+        itemsByQuery = self._getProvider().executeAll(queries)
+        for module, query in zip(modules, queries):
+            if itemsByQuery.has_key(query):
+                for entry in self._parseEjbEntries(module, itemsByQuery[query]):
+                    module.addEntry(entry)
+            else:
+                logger.warn("Failed to find entries for: %s" % module)
         return modules
 
     def discoverModulesForApp(self, application):
@@ -1482,12 +1486,21 @@ class ApplicationDiscovererByJmx(HasPlatformTraitOfVersionAboveV8,
         @raise jmx.AccessDeniedException:
         @raise jmx.ClientException:
         '''
+        query = self._buildEjbEntriesQuery(module)
+        return self._parseEjbEntries(module, self._getProvider().execute(query))
+
+    def _buildEjbEntriesQuery(self, module):
+        '@types: jee.EjbModule -> jmx.QueryNested'
+        query = jmx.QueryNested(module.getObjectName(), 'EJBRuntimes')
+        query.addAttributes(self._attributeNameFor('Name'), self._attributeNameFor('Type'))
+        return query
+
+    def _parseEjbEntries(self, module, items):
+        '@types: jee.EjbModule, list(jmx.Provider._ResultItem) -> list(jee.EjbEntry)'
         nameAttr = self._attributeNameFor('Name')
         typeAttr = self._attributeNameFor('Type')
-        query = jmx.QueryNested(module.getObjectName(), 'EJBRuntimes')
-        query.addAttributes(nameAttr, typeAttr)
         entries = []
-        for item in self._getProvider().execute(query):
+        for item in items:
             name = getattr(item, nameAttr)
             itemType = getattr(item, typeAttr)
 
@@ -188,6 +188,10 @@ from xml.dom.minidom import Node
 from xml.dom import minidom
 DOM = 'DOM'
 
+#-- JDK SAX parsing shared with [xmlutils]
+import xmlutils
+SAX = 'SAX'
+
 #-- Support expat parsing for ExpatFactory (if possible)
 try:
     import xml.parsers.expat
@@ -218,7 +222,10 @@ class _XO_:
 #-- Class interface to module functionality
 class XML_Objectify:
     """Factory object class for 'objectify XML document'"""
-    def __init__(self, file=None, parser=DOM):
+    def __init__(self, file=None, parser=SAX):
+        # literal XML of containers is available only from DOM
+        if parser == SAX and KEEP_CONTAINERS > MAYBE:
+            parser = DOM
         self._parser = parser
         if type(file) == StringType:
             self._fh = open(file)
@@ -235,30 +242,50 @@ class XML_Objectify:
             self.__class__.__bases__ = (ExpatFactory,)
             ExpatFactory.__init__(self)
 
-        # Second parsing option: DOM (keeps _dom)
-        elif self._parser == DOM:
-            self._dom = minidom.parseString(self._fh.read())
-            self._processing_instruction = {}
+        # Second parsing option: SAX (keeps compact element tree)
+        elif self._parser == SAX:
+            content = self._fh.read()
+            handler = xmlutils.parseElementTree(content)
+            if handler.requiresDom:
+                # literal _XML of mixed content and CDATA children are made by DOM only
+                self._parser = DOM
+                self._parse_dom(content)
+            else:
+                self._processing_instruction = handler.processingInstructions
+                self._root = handler.rootName
+                self._rootElement = handler.root
 
-            for child in self._dom.childNodes:
-                if child.nodeType == Node.PROCESSING_INSTRUCTION_NODE:
-                    self._processing_instruction[child.nodeName] = child.nodeValue
-                elif child.nodeType == Node.ELEMENT_NODE:
-                    self._root = child.nodeName
-            self._PyObject = pyobj_from_dom(self._dom)
+        # Third parsing option: DOM (keeps _dom)
+        elif self._parser == DOM:
+            self._parse_dom(self._fh.read())
 
         else:
             raise ValueError, \
                   "An invalid parser was specified: %s" % self._parser
 
+    def _parse_dom(self, content):
+        self._dom = minidom.parseString(content)
+        self._processing_instruction = {}
+
+        for child in self._dom.childNodes:
+            if child.nodeType == Node.PROCESSING_INSTRUCTION_NODE:
+                self._processing_instruction[child.nodeName] = child.nodeValue
+            elif child.nodeType == Node.ELEMENT_NODE:
+                self._root = child.nodeName
+        self._PyObject = pyobj_from_dom(self._dom)
+
     def make_instance(self):
         if self._parser == EXPAT:
             return self.ParseFile(self._fh)
+        elif self._parser == SAX:
+            return _ELEMENT_TREE_BUILDER.build(self._rootElement)
         elif self._parser == DOM:
             return copy.deepcopy(getattr(self._PyObject, self._root))
         else:
             return None
 
+_ELEMENT_TREE_BUILDER = xmlutils.ElementTreeToPyObjBuilder(_XO_, globals())
+
 #-- expat based stream-oriented parser/objectifier
 class ExpatFactory:
     def __init__(self, encoding="UTF-8", nspace_sep=" "):
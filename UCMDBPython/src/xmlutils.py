@@ -28,10 +28,20 @@ from types import *
 from cStringIO import StringIO
 import copy, string
 
+from java.io import ByteArrayInputStream
+from java.io import StringReader
+from java.lang import String
+from java.lang import System
+from javax.xml.parsers import SAXParserFactory
+from org.xml.sax import InputSource
+from org.xml.sax.ext import DefaultHandler2
+
 #-- Node types are now class constants defined in class Node.
 from xml.dom.minidom import Node
 from xml.dom import minidom
 DOM = 'DOM'
+#-- JDK SAX parser, python objects are built only on makeInstance()
+SAX = 'SAX'
 
 #-- Support expat parsing for ExpatFactory (if possible)
 try:
@@ -246,12 +256,24 @@ Usage:
 #           tag name now becomes double-underscore as a pyObj
 #           attribute name (import for [xml2sql]).
 #"""
-    def __init__(self, content, parser=DOM):
+    def __init__(self, content, parser=SAX):
         self._parser = parser
         if not content:
             raise ValueError, \
                   "Objectifier must be initialized with content of xml file to objectify"
 
+        # First parsing option: SAX (keeps compact element tree)
+        if self._parser == SAX:
+            handler = parseElementTree(content)
+            if handler.requiresDom:
+                # literal _XML of mixed content and CDATA children are made by DOM only
+                logger.debug('XML has mixed content or CDATA sections, DOM parser is used')
+                self._parser = DOM
+            else:
+                self._processing_instruction = handler.processingInstructions
+                self._root = handler.rootName
+                self._rootElement = handler.root
+
         # Second parsing option: DOM (keeps _dom)
         if self._parser == DOM:
             self._dom = minidom.parseString(content)
@@ -263,12 +285,14 @@ Usage:
                 elif child.nodeType == Node.ELEMENT_NODE:
                     self._root = child.nodeName
             self._PyObject = domToPyObj(self._dom)
-        else:
+        elif self._parser != SAX:
             raise ValueError, \
                   "An invalid parser was specified: %s" % self._parser
 
     def makeInstance(self):
-        if self._parser == DOM:
+        if self._parser == SAX:
+            return _ELEMENT_TREE_BUILDER.build(self._rootElement)
+        elif self._parser == DOM:
             return copy.deepcopy(getattr(self._PyObject, self._root))
         else:
             return None
@@ -422,6 +446,150 @@ def domToPyObj(domNode, keepContainers = 0, objPattern = None, objParentClass =
 
     return pyObj
 
+
+class _ParsedElement(object):
+    """Compact record of XML element collected by SAX parsing"""
+    __slots__ = ('name', 'attributes', 'children', 'PCDATA')
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.children = []
+        self.PCDATA = None
+
+
+class _ElementTreeHandler(DefaultHandler2):
+    """Collects SAX events to the tree of _ParsedElement records.
+    Text is accumulated by the rules of domToPyObj: whitespace is skipped
+    until element gets PCDATA, afterwards all the text is appended.
+    No '_comment' children are created. Tree cannot represent elements
+    with both PCDATA and child nodes (domToPyObj keeps their literal _XML)
+    and CDATA sections, requiresDom is set when content has them.
+    """
+    def __init__(self):
+        self.root = None
+        self.rootName = None
+        self.processingInstructions = {}
+        self.requiresDom = 0
+        self._stack = []
+        self._hasChildNodes = []
+        self._text = []
+
+    def startElement(self, uri, localName, qName, attributes):
+        self._flushText()
+        self._markChildNode()
+        attrs = []
+        for index in range(attributes.getLength()):
+            attrs.append((py_name(attributes.getQName(index)), attributes.getValue(index)))
+        element = _ParsedElement(py_name(qName), attrs)
+        if self._stack:
+            self._stack[-1].children.append(element)
+        else:
+            self.root = element
+            self.rootName = qName
+        self._stack.append(element)
+        self._hasChildNodes.append(0)
+
+    def endElement(self, uri, localName, qName):
+        self._flushText()
+        element = self._stack.pop()
+        if self._hasChildNodes.pop() and element.PCDATA is not None:
+            self.requiresDom = 1
+
+    def characters(self, ch, start, length):
+        if self._stack:
+            self._text.append(String.valueOf(ch, start, length))
+
+    def processingInstruction(self, target, data):
+        if not self._stack:
+            self.processingInstructions[target] = data
+
+    def comment(self, ch, start, length):
+        self._flushText()
+        self._markChildNode()
+
+    def startCDATA(self):
+        if self._stack:
+            self.requiresDom = 1
+
+    def _markChildNode(self):
+        if self._hasChildNodes:
+            self._hasChildNodes[-1] = 1
+
+    def _flushText(self):
+        if self._text:
+            text = ''.join(self._text)
+            self._text = []
+            element = self._stack[-1]
+            if element.PCDATA is not None:
+                element.PCDATA += text
+            elif text.strip():
+                element.PCDATA = text
+
+
+def parseElementTree(content):
+    """Parses XML content with JDK SAX parser, external DTDs are not loaded
+    @types: str -> _ElementTreeHandler
+    """
+    factory = SAXParserFactory.newInstance()
+    factory.setNamespaceAware(0)
+    factory.setValidating(0)
+    try:
+        factory.setFeature('http://apache.org/xml/features/nonvalidating/load-external-dtd', 0)
+    except:
+        logger.debug('SAX parser does not allow to skip external DTD')
+    if isinstance(content, unicode):
+        source = InputSource(StringReader(content))
+    else:
+        # keep raw bytes so the parser applies encoding from XML declaration
+        source = InputSource(ByteArrayInputStream(String(content).getBytes('ISO-8859-1')))
+    handler = _ElementTreeHandler()
+    parser = factory.newSAXParser()
+    parser.setProperty('http://xml.org/sax/properties/lexical-handler', handler)
+    parser.parse(source, handler)
+    return handler
+
+
+class ElementTreeToPyObjBuilder:
+    """Converts element tree collected by parseElementTree to a Python object,
+    classes of objects are named the same way as in DomToPyObjBuilder.
+    Class defined in namespace (module globals) under that name is used as DOM
+    builders do, e.g. xml_objectify._XO_Eggs = otherscope.Eggs, other classes are created
+    """
+    def __init__(self, baseClass = None, namespace = None):
+        self._baseClass = baseClass or _XO_
+        if namespace is None:
+            namespace = globals()
+        self._namespace = namespace
+        self._classByName = {}
+
+    def buildPyObjInstance(self, name):
+        className = self._baseClass.__name__ + name
+        klass = self._namespace.get(className) or self._classByName.get(className)
+        if klass is None:
+            klass = ClassType(className, (self._baseClass,), {})
+            self._classByName[className] = klass
+        return klass()
+
+    def build(self, element):
+        pyObj = self.buildPyObjInstance(element.name)
+        members = pyObj.__dict__
+        for attrName, attrValue in element.attributes:
+            members[attrName] = attrValue
+        if element.PCDATA is not None:
+            members['PCDATA'] = element.PCDATA
+        for child in element.children:
+            childObj = self.build(child)
+            if not members.has_key(child.name):
+                members[child.name] = childObj
+            elif type(members[child.name]) is ListType:
+                members[child.name].append(childObj)
+            else:
+                members[child.name] = [members[child.name], childObj]
+        return pyObj
+
+_ELEMENT_TREE_BUILDER = ElementTreeToPyObjBuilder()
+
 def py_name(name):
     name = string.replace(name, '#', '_')
     name = string.replace(name, ':', '_')
@@ -466,14 +634,45 @@ def pyobj_printer(pyObj, level=0):
     return descript
 
 
-#-- Module self-test
+def _isSameTree(left, right, ignoredNames = ('_comment',)):
+    """Compares objects made by different parsers, DOM only members are ignored"""
+    if type(left) is ListType or type(right) is ListType:
+        return (type(left) is type(right) and len(left) == len(right)
+                and not filter(lambda pair: not _isSameTree(pair[0], pair[1]), zip(left, right)))
+    if type(left) is InstanceType and type(right) is InstanceType:
+        leftNames = [name for name in left.__dict__.keys() if name not in ignoredNames]
+        rightNames = [name for name in right.__dict__.keys() if name not in ignoredNames]
+        leftNames.sort()
+        rightNames.sort()
+        return (left.__class__.__name__ == right.__class__.__name__ and leftNames == rightNames
+                and not filter(lambda name: not _isSameTree(left.__dict__[name], right.__dict__[name]), leftNames))
+    return left == right
+
+def benchmark(content, rounds = 10):
+    """Measures DOM and SAX objectifying of the same content
+    @types: str, int -> (float, float, bool)
+    @return: average milliseconds for DOM, for SAX and whether results are equal
+    """
+    results = []
+    for parser in (DOM, SAX):
+        startTime = System.currentTimeMillis()
+        for i in range(rounds):
+            pyObj = Objectifier(content, parser).makeInstance()
+        results.append(((System.currentTimeMillis() - startTime) / float(rounds), pyObj))
+    (domTime, domObj), (saxTime, saxObj) = results
+    return domTime, saxTime, _isSameTree(domObj, saxObj)
+
+
+#-- Module self-test and benchmark, e.g. for config/tcpDiscoveryDescriptor.xml
 if __name__ == '__main__':
     import sys
     if len(sys.argv) > 1:
         for filename in sys.argv[1:]:
-            xml_obj = Objectifier(filename)
-            pyObj = xml_obj.makeInstance()
-            print pyobj_printer(pyObj).encode('UTF-8')
+            xmlFile = open(filename)
+            content = xmlFile.read()
+            xmlFile.close()
+            domTime, saxTime, isSame = benchmark(content)
+            print '%s: DOM %.1f ms, SAX %.1f ms, same objects: %s' % (filename, domTime, saxTime, isSame)
     else:
         print "Please specify one or more XML files to Objectify."
 #